@@ -0,0 +1,6 @@
+"""
+Benchmarks do SGHSS Backend
+
+Executar a partir de sghss-backend/, por exemplo:
+    python -m benchmarks.booking
+"""
@@ -0,0 +1,109 @@
+"""
+Benchmark da busca de horários livres
+
+Cria N profissionais de uma mesma especialidade (padrão 500), cada um
+com agenda semanal e consultas marcadas, e mede GET /api/availability
+para uma semana inteira da especialidade.
+
+Uso:
+    python -m benchmarks.availability [--professionals 500] [--requests 20]
+"""
+from datetime import datetime, timedelta, date
+import argparse
+import random
+import time
+from benchmarks.common import make_app, percentiles, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+WEEK_SCHEDULE = {
+    day: [['08:00', '12:00'], ['13:00', '17:00']]
+    for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday')
+}
+
+
+def seed(app, professionals: int, booked_per_professional: int, start_day: date):
+    from src.models import db, User, UserRole, Patient, Professional, Appointment
+    from src.models.appointment import AppointmentType, AppointmentStatus
+    
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        
+        users = [User(email=f'pro{i}@bench.local', role=UserRole.PROFESSIONAL, password_hash='!')
+                 for i in range(professionals)]
+        patient_users = [User(email=f'p{i}@bench.local', role=UserRole.PATIENT, password_hash='!')
+                         for i in range(professionals)]
+        db.session.add_all(users + patient_users)
+        db.session.flush()
+        
+        pros = [Professional(user_id=u.id, full_name=f'Profissional {i}', professional_id=f'CRM-{i}',
+                             specialty='Cardiologia', work_schedule=WEEK_SCHEDULE) for i, u in enumerate(users)]
+        patients = [Patient(user_id=u.id, full_name=f'Paciente {i}', cpf=make_cpf(i), birth_date=date(1980, 1, 1))
+                    for i, u in enumerate(patient_users)]
+        db.session.add_all(pros + patients)
+        db.session.flush()
+        
+        # Consultas em horários aleatórios da semana pesquisada (um paciente por profissional)
+        rng = random.Random(42)
+        now = datetime.utcnow()
+        rows = []
+        for pro, patient in zip(pros, patients):
+            slots = set()
+            while len(slots) < booked_per_professional:
+                day = start_day + timedelta(days=rng.randrange(5))
+                slots.add(datetime(day.year, day.month, day.day, rng.choice([8, 9, 10, 11, 13, 14, 15, 16]),
+                                   rng.choice([0, 30])))
+            rows.extend({
+                'patient_id': patient.id,
+                'professional_id': pro.id,
+                'appointment_date': slot,
+                'appointment_type': AppointmentType.PRESENCIAL.name,
+                'status': AppointmentStatus.AGENDADA.name,
+                'created_at': now,
+                'updated_at': now
+            } for slot in slots)
+        
+        db.session.execute(Appointment.__table__.insert(), rows)
+        db.session.commit()
+
+
+def run(professionals: int, requests: int, booked: int):
+    app = make_app()
+    today = date.today()
+    start_day = today + timedelta(days=7 - today.weekday())  # próxima segunda-feira
+    end_day = start_day + timedelta(days=6)
+    seed(app, professionals, booked, start_day)
+    
+    client = app.test_client()
+    headers = auth_header(client, 'admin@bench.local', PASSWORD)
+    url = f'/api/availability?specialty=Cardiologia&start={start_day.isoformat()}&end={end_day.isoformat()}'
+    
+    samples = []
+    slots = 0
+    for i in range(requests):
+        t0 = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append(time.perf_counter() - t0)
+        assert response.status_code == 200, response.get_json()
+        if i == 0:
+            slots = sum(len(p['slots']) for p in response.get_json()['professionals'])
+    
+    print(f"Professionals: {professionals}, booked per professional: {booked}, range: {start_day} .. {end_day}")
+    print(f"Free slots returned: {slots}")
+    print(f"First request (cold schedule cache): {samples[0] * 1000:.1f} ms")
+    print(f"Latency (ms, warm): {percentiles(samples[1:] or samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--professionals', type=int, default=500, help='Profissionais da especialidade')
+    parser.add_argument('--booked', type=int, default=20, help='Consultas marcadas por profissional na semana')
+    parser.add_argument('--requests', type=int, default=20, help='Buscas medidas')
+    args = parser.parse_args()
+    run(args.professionals, args.requests, args.booked)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark de agendamento de consultas
+
+Cria um profissional com N consultas já agendadas (padrão 10.000), mede a
+vazão de POST /api/appointments, o plano de execução da checagem de
+conflito e verifica que reservas concorrentes do mesmo horário resultam
+em exatamente uma consulta criada.
+
+Uso:
+    python -m benchmarks.booking [--existing 10000] [--bookings 500] [--threads 8]
+"""
+from datetime import datetime, timedelta, date
+import argparse
+import threading
+import time
+from benchmarks.common import make_app, percentiles, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+
+def seed(app, existing: int, patients: int):
+    """Cria admin, profissional, pacientes e consultas existentes"""
+    from src.models import db, User, UserRole, Patient, Professional, Appointment
+    from src.models.appointment import AppointmentType, AppointmentStatus
+    
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        pro_user = User(email='pro@bench.local', role=UserRole.PROFESSIONAL, password_hash='!')
+        db.session.add_all([admin, pro_user])
+        db.session.flush()
+        
+        professional = Professional(user_id=pro_user.id, full_name='Dra. Bench', professional_id='CRM-1',
+                                    specialty='Clínica Geral', work_schedule={})
+        db.session.add(professional)
+        
+        users = [User(email=f'p{i}@bench.local', role=UserRole.PATIENT, password_hash='!') for i in range(patients)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all([
+            Patient(user_id=u.id, full_name=f'Paciente {i}', cpf=make_cpf(i), birth_date=date(1980, 1, 1))
+            for i, u in enumerate(users)
+        ])
+        db.session.flush()
+        patient_ids = [p.id for p in Patient.query.with_entities(Patient.id)]
+        
+        # Consultas existentes já realizadas, uma por slot, terminando antes de hoje
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=existing // 48 + 1)
+        now = datetime.utcnow()
+        db.session.execute(Appointment.__table__.insert(), [
+            {
+                'patient_id': patient_ids[i % len(patient_ids)],
+                'professional_id': professional.id,
+                'appointment_date': start + timedelta(minutes=30 * i),
+                'appointment_type': AppointmentType.PRESENCIAL.name,
+                'status': AppointmentStatus.REALIZADA.name,
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(existing)
+        ])
+        db.session.commit()
+        return professional.id, patient_ids
+
+
+def explain_conflict_query(app, professional_id: int):
+    """Retorna o plano de execução da checagem de conflito do profissional"""
+    from src.models import db
+    from sqlalchemy import text
+    
+    with app.app_context():
+        rows = db.session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM appointments "
+            "WHERE professional_id = :pid AND appointment_date > :a AND appointment_date < :b "
+            "AND status != 'CANCELADA' LIMIT 1"
+        ), {'pid': professional_id, 'a': datetime.utcnow(), 'b': datetime.utcnow()}).fetchall()
+        return [row[-1] for row in rows]
+
+
+def run(existing: int, bookings: int, threads: int):
+    app = make_app()
+    professional_id, patient_ids = seed(app, existing, max(bookings, threads) + 1)
+    client = app.test_client()
+    headers = auth_header(client, 'admin@bench.local', PASSWORD)
+    
+    first_slot = (datetime.utcnow() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+    
+    # Vazão sequencial: cada reserva em um horário livre, paciente distinto
+    samples = []
+    started = time.perf_counter()
+    for i in range(bookings):
+        slot = first_slot + timedelta(minutes=30 * i)
+        t0 = time.perf_counter()
+        response = client.post('/api/appointments', headers=headers, json={
+            'patient_id': patient_ids[i],
+            'professional_id': professional_id,
+            'appointment_date': slot.isoformat(),
+            'appointment_type': 'presencial'
+        })
+        samples.append(time.perf_counter() - t0)
+        assert response.status_code == 201, response.get_json()
+    elapsed = time.perf_counter() - started
+    
+    # Conflito detectado pela consulta indexada
+    t0 = time.perf_counter()
+    response = client.post('/api/appointments', headers=headers, json={
+        'patient_id': patient_ids[-1],
+        'professional_id': professional_id,
+        'appointment_date': first_slot.isoformat(),
+        'appointment_type': 'presencial'
+    })
+    conflict_ms = (time.perf_counter() - t0) * 1000
+    assert response.status_code == 409, response.get_json()
+    
+    # Reservas concorrentes do mesmo horário: exatamente uma deve vencer
+    contested = first_slot + timedelta(days=30)
+    statuses = []
+    barrier = threading.Barrier(threads)
+    
+    def book(patient_id):
+        thread_client = app.test_client()
+        barrier.wait()
+        r = thread_client.post('/api/appointments', headers=headers, json={
+            'patient_id': patient_id,
+            'professional_id': professional_id,
+            'appointment_date': contested.isoformat(),
+            'appointment_type': 'presencial'
+        })
+        statuses.append(r.status_code)
+    
+    workers = [threading.Thread(target=book, args=(patient_ids[i],)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    print(f"Existing appointments for professional: {existing}")
+    print(f"Bookings: {bookings} in {elapsed:.2f}s -> {bookings / elapsed:.1f} req/s")
+    print(f"Booking latency (ms): {percentiles(samples)}")
+    print(f"Conflict rejection: {conflict_ms:.2f} ms")
+    print(f"Conflict query plan: {explain_conflict_query(app, professional_id)}")
+    print(f"Concurrent same-slot bookings ({threads} threads): "
+          f"{statuses.count(201)} created, {statuses.count(409)} conflicts, other={sorted(s for s in statuses if s not in (201, 409))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--existing', type=int, default=10000, help='Consultas existentes do profissional')
+    parser.add_argument('--bookings', type=int, default=500, help='Reservas medidas')
+    parser.add_argument('--threads', type=int, default=8, help='Threads disputando o mesmo horário')
+    args = parser.parse_args()
+    run(args.existing, args.bookings, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Utilitários compartilhados pelos benchmarks
+"""
+from typing import Dict, List, Optional
+import atexit
+import os
+import tempfile
+
+# Benchmarks rodam com a configuração de testes e logs silenciosos
+os.environ.setdefault('FLASK_ENV', 'testing')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+
+def make_app(database_uri: Optional[str] = None, **overrides):
+    """
+    Cria uma aplicação isolada para benchmark
+    
+    Args:
+        database_uri (Optional[str]): URI do banco (padrão: arquivo SQLite temporário)
+        **overrides: Valores de configuração adicionais
+    
+    Returns:
+        Flask: Aplicação configurada com as tabelas criadas
+    """
+    from src.config import config, TestingConfig
+    from src.main import create_app
+    
+    if database_uri is None:
+        fd, path = tempfile.mkstemp(prefix='sghss-bench-', suffix='.db')
+        os.close(fd)
+        atexit.register(os.remove, path)
+        database_uri = f'sqlite:///{path}'
+    
+    attrs = {'SQLALCHEMY_DATABASE_URI': database_uri}
+    attrs.update(overrides)
+    config['benchmark'] = type('BenchmarkConfig', (TestingConfig,), attrs)
+    return create_app('benchmark')
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Calcula p50/p95/p99 (em milissegundos) de amostras em segundos
+    
+    Args:
+        samples (List[float]): Durações em segundos
+    
+    Returns:
+        Dict[str, float]: Percentis em milissegundos
+    """
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000
+    return {'p50': round(pick(0.50), 3), 'p95': round(pick(0.95), 3), 'p99': round(pick(0.99), 3)}
+
+
+def auth_header(client, email: str, password: str) -> Dict[str, str]:
+    """Faz login e retorna o cabeçalho Authorization"""
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def make_cpf(seed: int) -> str:
+    """Gera um CPF válido (com dígitos verificadores) a partir de um inteiro"""
+    digits = [int(d) for d in f'{(seed * 7919 + 100000000) % 1000000000:09d}']
+    for weight in (10, 11):
+        total = sum(d * (weight - i) for i, d in enumerate(digits))
+        remainder = total % 11
+        digits.append(0 if remainder < 2 else 11 - remainder)
+    return ''.join(map(str, digits))
@@ -0,0 +1,106 @@
+"""
+Benchmark da compressão de respostas
+
+Obtém pela API uma página de GET /api/patients (padrão 100 linhas) e o
+index.html do SPA e mede, para cada codificação e nível, os bytes
+economizados e o custo de CPU por resposta. Em seguida confere a
+negociação ponta a ponta (Accept-Encoding) e o cache de estáticos
+pré-comprimidos.
+
+Uso:
+    python -m benchmarks.compression [--rows 100] [--iterations 200]
+"""
+import argparse
+import gzip
+import time
+from benchmarks.common import make_app, auth_header
+from benchmarks.serialization import seed
+
+PASSWORD = 'Bench@12345'
+
+
+def cpu_ms(fn, iterations: int) -> float:
+    """Tempo médio de CPU (thread) por chamada, em milissegundos"""
+    fn()
+    started = time.thread_time()
+    for _ in range(iterations):
+        fn()
+    return (time.thread_time() - started) * 1000 / iterations
+
+
+def measure(label: str, data: bytes, iterations: int):
+    from src.utils.compression import compress, brotli
+    
+    settings = [('gzip', level) for level in (1, 6, 9)]
+    if brotli is not None:
+        settings += [('br', quality) for quality in (1, 4, 11)]
+    
+    print(f"\n{label}: {len(data):,} bytes")
+    for encoding, level in settings:
+        body = compress(data, encoding, level)
+        ms = cpu_ms(lambda: compress(data, encoding, level), iterations)
+        saved = len(data) - len(body)
+        print(f"  {encoding:4s} level {level:2d}  {len(body):9,} bytes  saved {saved:9,} ({saved / len(data):6.1%})  "
+              f"cpu {ms:7.3f} ms/response")
+
+
+def run(rows: int, iterations: int):
+    from src.models import db, User, UserRole
+    from src.utils import response_compressor
+    
+    app = make_app()
+    seed(app, rows)
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+    
+    client = app.test_client()
+    headers = auth_header(client, 'admin@bench.local', PASSWORD)
+    url = f'/api/patients?per_page={rows}'
+    
+    identity = client.get(url, headers=dict(headers, **{'Accept-Encoding': 'identity'}))
+    assert identity.status_code == 200 and 'Content-Encoding' not in identity.headers
+    measure(f"GET /api/patients ({rows} rows)", identity.get_data(), iterations)
+    
+    index = client.get('/', headers={'Accept-Encoding': 'identity'})
+    index_html = index.get_data()
+    index.close()
+    measure("index.html", index_html, max(iterations // 10, 1))
+    
+    # Negociação ponta a ponta
+    print("\nNegotiation:")
+    for accept in ('gzip', 'br, gzip', 'gzip;q=0, identity'):
+        response = client.get(url, headers=dict(headers, **{'Accept-Encoding': accept}))
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        body = response.get_data()
+        if encoding == 'gzip':
+            assert gzip.decompress(body) == identity.get_data()
+        print(f"  list  Accept-Encoding: {accept:20s} -> {encoding:8s} {len(body):9,} bytes")
+        
+        response = client.get('/', headers={'Accept-Encoding': accept})
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        print(f"  index Accept-Encoding: {accept:20s} -> {encoding:8s} {len(response.get_data()):9,} bytes")
+        response.close()
+    
+    # Custo por requisição: estático servido do cache vs. compressão dinâmica
+    static_ms = cpu_ms(lambda: client.get('/', headers={'Accept-Encoding': 'gzip'}).close(), iterations)
+    dynamic_ms = cpu_ms(lambda: client.get(url, headers=dict(headers, **{'Accept-Encoding': 'gzip'})), iterations)
+    identity_ms = cpu_ms(lambda: client.get(url, headers=dict(headers, **{'Accept-Encoding': 'identity'})), iterations)
+    print(f"\nindex.html (precompressed cache)      {static_ms:7.3f} ms cpu/request")
+    print(f"list page, gzip level {app.config['COMPRESSION_GZIP_LEVEL']}              {dynamic_ms:7.3f} ms cpu/request")
+    print(f"list page, identity                   {identity_ms:7.3f} ms cpu/request")
+    print(f"\nCompressor stats: {response_compressor.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100, help='Linhas da página de pacientes')
+    parser.add_argument('--iterations', type=int, default=200, help='Repetições de cada medição')
+    args = parser.parse_args()
+    run(args.rows, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+"""
+Teste de carga ponta a ponta com gate de regressão
+
+Executa cenários com N threads concorrentes contra a aplicação em processo
+(Flask test client, banco SQLite temporário) ou contra um servidor em
+execução (``--url``), e reporta p50/p95/p99 e req/s por cenário:
+
+    - register:         POST /api/auth/register (contas novas)
+    - login_storm:      POST /api/auth/login alternando entre as contas
+    - auth_me:          GET /api/auth/me
+    - patients_offset:  GET /api/patients nas últimas páginas (OFFSET profundo)
+    - patients_cursor:  GET /api/patients com cursores das últimas páginas
+    - update_profile:   PUT /api/patients/me concorrente, sem If-Match (a última
+                        escrita prevalece; um 412 aqui é regressão)
+
+Os dados sintéticos são criados pela própria API (admin, pacientes com
+login e carga em lote via /api/patients/import), com um prefixo por
+execução, de modo que o mesmo servidor pode ser medido várias vezes.
+
+Baseline e gate:
+    --save-baseline grava os resultados em benchmarks/baselines/loadtest.json;
+    --check compara com o baseline e termina com código 1 se algum cenário
+    teve erros, se o p95 subiu ou se o req/s caiu além de --threshold.
+    Baselines só são comparáveis na mesma máquina e com as mesmas opções.
+
+Uso:
+    python -m benchmarks.loadtest [--url http://127.0.0.1:5000] [--requests 400]
+        [--concurrency 8] [--patients 2000] [--accounts 16]
+        [--scenarios login_storm,auth_me] [--save-baseline | --check] [--threshold 0.25]
+"""
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import make_app, percentiles, make_cpf
+
+PASSWORD = 'Load@12345'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'loadtest.json')
+
+# (método, caminho, cabeçalhos, corpo JSON ou bytes)
+Request = Tuple[str, str, Dict[str, str], Any]
+
+
+class TestClientTransport:
+    """Requisições pela aplicação em processo (um test client por thread)"""
+    
+    label = 'test-client'
+    
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+    
+    def request(self, method: str, path: str, headers: Dict[str, str], body: Any = None) -> Tuple[int, Any]:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        kwargs = {'json': body} if isinstance(body, (dict, list)) else {'data': body}
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HTTPTransport:
+    """Requisições HTTP a um servidor em execução (conexão keep-alive por thread)"""
+    
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.label = base_url
+        self.scheme = parsed.scheme or 'http'
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port
+        self.prefix = parsed.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            connection = self._local.connection = cls(self.host, self.port, timeout=self.timeout)
+        return connection
+    
+    def request(self, method: str, path: str, headers: Dict[str, str], body: Any = None) -> Tuple[int, Any]:
+        headers = dict(headers)
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        for attempt in (1, 2):
+            connection = self._connection()
+            try:
+                connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Conexão keep-alive encerrada pelo servidor: reabre uma vez
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+        try:
+            data = json.loads(payload) if payload else None
+        except ValueError:
+            data = None
+        return response.status, data
+
+
+class Scenario:
+    """Cenário de carga: gera a i-ésima requisição e os status aceitos"""
+    
+    def __init__(self, name: str, build: Callable[[int], Request], expected: Tuple[int, ...] = (200,)):
+        self.name = name
+        self.build = build
+        self.expected = expected
+
+
+def _bearer(token: str) -> Dict[str, str]:
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _expect(status: int, data: Any, expected: int, what: str) -> Any:
+    if status != expected:
+        raise RuntimeError(f"{what} failed with HTTP {status}: {data}")
+    return data
+
+
+def seed(transport, run_id: str, patients: int, accounts: int, cpf_base: int) -> Dict[str, Any]:
+    """
+    Cria os dados sintéticos pela API
+    
+    Args:
+        transport: Transporte usado nas requisições
+        run_id (str): Prefixo único desta execução
+        patients (int): Pacientes carregados em lote (páginas profundas)
+        accounts (int): Pacientes com login (login, /me e PUT /patients/me)
+        cpf_base (int): Semente inicial dos CPFs
+    
+    Returns:
+        Dict[str, Any]: Tokens e contas criadas
+    """
+    admin_email = f'lt-{run_id}-admin@load.local'
+    body = {'email': admin_email, 'password': PASSWORD, 'role': 'admin'}
+    _expect(*transport.request('POST', '/api/auth/register', {}, body), 201, 'Admin registration')
+    admin = _expect(*transport.request('POST', '/api/auth/login', {},
+                                       {'email': admin_email, 'password': PASSWORD}), 200, 'Admin login')
+    admin_headers = _bearer(admin['access_token'])
+    
+    emails, tokens = [], []
+    for i in range(accounts):
+        email = f'lt-{run_id}-p{i}@load.local'
+        body = {'email': email, 'password': PASSWORD, 'role': 'patient'}
+        _expect(*transport.request('POST', '/api/auth/register', {}, body), 201, 'Patient registration')
+        login = _expect(*transport.request('POST', '/api/auth/login', {},
+                                           {'email': email, 'password': PASSWORD}), 200, 'Patient login')
+        profile = {'full_name': f'Paciente Carga {i}', 'cpf': make_cpf(cpf_base + i),
+                   'birth_date': '1980-01-01', 'phone': '11987654321'}
+        _expect(*transport.request('POST', '/api/patients', _bearer(login['access_token']), profile),
+                201, 'Patient profile creation')
+        emails.append(email)
+        tokens.append(login['access_token'])
+    
+    if patients > 0:
+        rows = (
+            json.dumps({'email': f'lt-{run_id}-bulk{i}@load.local', 'full_name': f'Paciente Lote {i}',
+                        'cpf': make_cpf(cpf_base + accounts + i), 'birth_date': '1975-06-15'})
+            for i in range(patients)
+        )
+        headers = dict(admin_headers, **{'Content-Type': 'application/x-ndjson'})
+        result = _expect(*transport.request('POST', '/api/patients/import', headers,
+                                            '\n'.join(rows).encode('utf-8')), 201, 'Bulk import')
+        if result.get('imported') != patients:
+            raise RuntimeError(f"Bulk import incomplete: {result}")
+    
+    return {'admin_headers': admin_headers, 'emails': emails, 'tokens': tokens}
+
+
+def deep_cursors(transport, admin_headers: Dict[str, str], per_page: int, keep: int) -> List[str]:
+    """Percorre a listagem por cursor e guarda os cursores das últimas páginas"""
+    cursors, cursor = [], ''
+    while cursor is not None:
+        status, data = transport.request('GET', f'/api/patients?per_page={per_page}&cursor={cursor}', admin_headers)
+        _expect(status, data, 200, 'Cursor walk')
+        cursor = data['pagination']['next_cursor']
+        if cursor:
+            cursors.append(cursor)
+    return cursors[-keep:]
+
+
+def build_scenarios(transport, data: Dict[str, Any], run_id: str, per_page: int) -> List[Scenario]:
+    admin_headers, emails, tokens = data['admin_headers'], data['emails'], data['tokens']
+    
+    status, page = transport.request('GET', f'/api/patients?per_page={per_page}', admin_headers)
+    pages = _expect(status, page, 200, 'First page')['pagination']['pages']
+    deep_pages = list(range(max(1, pages - 9), pages + 1))
+    cursors = deep_cursors(transport, admin_headers, per_page, keep=10) or ['']
+    
+    def register(i):
+        return 'POST', '/api/auth/register', {}, {
+            'email': f'lt-{run_id}-reg{i}@load.local', 'password': PASSWORD, 'role': 'patient'
+        }
+    
+    def login(i):
+        return 'POST', '/api/auth/login', {}, {'email': emails[i % len(emails)], 'password': PASSWORD}
+    
+    def me(i):
+        return 'GET', '/api/auth/me', _bearer(tokens[i % len(tokens)]), None
+    
+    def offset_page(i):
+        return 'GET', f'/api/patients?per_page={per_page}&page={deep_pages[i % len(deep_pages)]}', admin_headers, None
+    
+    def cursor_page(i):
+        return 'GET', f'/api/patients?per_page={per_page}&cursor={cursors[i % len(cursors)]}', admin_headers, None
+    
+    def update(i):
+        # Sem If-Match: só PUTs condicionais podem receber 412
+        return 'PUT', '/api/patients/me', _bearer(tokens[i % len(tokens)]), {'phone': f'1191111{i % 10000:04d}'}
+    
+    return [
+        Scenario('register', register, expected=(201,)),
+        Scenario('login_storm', login),
+        Scenario('auth_me', me),
+        Scenario('patients_offset', offset_page),
+        Scenario('patients_cursor', cursor_page),
+        Scenario('update_profile', update, expected=(200,))
+    ]
+
+
+def run_scenario(transport, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Executa um cenário com ``concurrency`` threads
+    
+    Returns:
+        Dict[str, Any]: Percentis (ms), req/s, erros e status inesperados
+    """
+    samples: List[float] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+    counter = iter(range(requests))
+    
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            method, path, headers, body = scenario.build(i)
+            t0 = time.perf_counter()
+            try:
+                status, _ = transport.request(method, path, headers, body)
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - t0
+            with lock:
+                samples.append(elapsed)
+                if status not in scenario.expected:
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+    
+    result = percentiles(samples)
+    result['rps'] = round(len(samples) / elapsed, 1) if elapsed else 0.0
+    result['requests'] = len(samples)
+    result['errors'] = sum(statuses.values())
+    if statuses:
+        result['unexpected_statuses'] = statuses
+    return result
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float, slack_ms: float) -> List[str]:
+    """
+    Lista as regressões em relação ao baseline
+    
+    Args:
+        results: Resultados desta execução por cenário
+        baseline: Resultados do baseline por cenário
+        threshold (float): Piora relativa tolerada (0.25 = 25%)
+        slack_ms (float): Folga absoluta no p95, evita falsos alarmes em latências sub-milissegundo
+    
+    Returns:
+        List[str]: Descrição de cada regressão (vazia se passou)
+    """
+    failures = []
+    for name, current in results.items():
+        if current['errors']:
+            failures.append(f"{name}: {current['errors']} failed requests {current.get('unexpected_statuses')}")
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        limit = reference['p95'] * (1 + threshold) + slack_ms
+        if current['p95'] > limit:
+            failures.append(f"{name}: p95 {current['p95']} ms > {limit:.3f} ms (baseline {reference['p95']} ms)")
+        floor = reference['rps'] * (1 - threshold)
+        if current['rps'] < floor:
+            failures.append(f"{name}: {current['rps']} req/s < {floor:.1f} req/s (baseline {reference['rps']} req/s)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Servidor em execução (padrão: aplicação em processo)')
+    parser.add_argument('--requests', type=int, default=400, help='Requisições por cenário')
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads concorrentes')
+    parser.add_argument('--patients', type=int, default=2000, help='Pacientes carregados em lote')
+    parser.add_argument('--accounts', type=int, default=16, help='Pacientes com login')
+    parser.add_argument('--per-page', type=int, default=50, help='Tamanho de página da listagem')
+    parser.add_argument('--scenarios', help='Cenários separados por vírgula (padrão: todos)')
+    parser.add_argument('--bcrypt-rounds', type=int, help='Custo do bcrypt em processo (padrão: o de testes)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Arquivo de baseline')
+    gate = parser.add_mutually_exclusive_group()
+    gate.add_argument('--save-baseline', action='store_true', help='Grava os resultados como baseline')
+    gate.add_argument('--check', action='store_true', help='Falha se houver regressão em relação ao baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Piora relativa tolerada no gate')
+    parser.add_argument('--slack-ms', type=float, default=0.5, help='Folga absoluta no p95 (ms)')
+    args = parser.parse_args()
+    
+    if args.url:
+        transport = HTTPTransport(args.url)
+    else:
+        overrides = {'BCRYPT_ROUNDS': args.bcrypt_rounds} if args.bcrypt_rounds else {}
+        transport = TestClientTransport(make_app(**overrides))
+    
+    run_id = uuid.uuid4().hex[:8]
+    cpf_base = random.randrange(10 ** 8)
+    started = time.perf_counter()
+    data = seed(transport, run_id, args.patients, args.accounts, cpf_base)
+    scenarios = build_scenarios(transport, data, run_id, args.per_page)
+    print(f"Target: {transport.label}; seeded {args.patients} + {args.accounts} patients "
+          f"in {time.perf_counter() - started:.1f}s")
+    
+    if args.scenarios:
+        selected = set(args.scenarios.split(','))
+        unknown = selected - {s.name for s in scenarios}
+        if unknown:
+            parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s.name in selected]
+    
+    results = {}
+    print(f"\n{'scenario':<17}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    for scenario in scenarios:
+        result = results[scenario.name] = run_scenario(transport, scenario, args.requests, args.concurrency)
+        print(f"{scenario.name:<17}{result['p50']:>10}{result['p95']:>10}{result['p99']:>10}"
+              f"{result['rps']:>10}{result['errors']:>8}")
+    
+    settings = {
+        'target': 'http' if args.url else 'test-client',
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'patients': args.patients,
+        'accounts': args.accounts,
+        'per_page': args.per_page,
+        'bcrypt_rounds': args.bcrypt_rounds
+    }
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        baseline = {'settings': settings, 'scenarios': results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+    
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first")
+            sys.exit(2)
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['settings'] != settings:
+            print(f"\nBaseline was recorded with different settings: {baseline['settings']}")
+            sys.exit(2)
+        failures = compare(results, baseline['scenarios'], args.threshold, args.slack_ms)
+        if failures:
+            print(f"\nRegression gate FAILED (threshold {args.threshold:.0%}):")
+            for failure in failures:
+                print(f"  - {failure}")
+            sys.exit(1)
+        print(f"\nRegression gate passed (threshold {args.threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark da busca de pacientes
+
+Cria N pacientes (padrão 1.000.000) com nomes, CPFs e telefones
+aleatórios, reconstrói o índice FTS5 e mede GET /api/patients/search para
+prefixos de nome curtos e longos, nomes compostos e fragmentos de CPF e
+de telefone.
+
+Uso:
+    python -m benchmarks.patient_search [--patients 1000000] [--requests 200]
+"""
+from datetime import datetime, date
+import argparse
+import random
+import time
+from benchmarks.common import make_app, percentiles, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+FIRST_NAMES = [
+    'Ana', 'Maria', 'José', 'João', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Pedro', 'Lucas',
+    'Luiz', 'Marcos', 'Luís', 'Gabriel', 'Rafael', 'Daniel', 'Marcelo', 'Bruno', 'Eduardo', 'Felipe',
+    'Juliana', 'Mariana', 'Fernanda', 'Patrícia', 'Aline', 'Sandra', 'Camila', 'Amanda', 'Bruna', 'Jéssica',
+    'Letícia', 'Júlia', 'Luciana', 'Vanessa', 'Mônica', 'Beatriz', 'Larissa', 'Débora', 'Cláudia', 'Renata'
+]
+SURNAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes',
+    'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa',
+    'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas',
+    'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira', 'Araújo', 'Conceição', 'Moura', 'Cavalcanti', 'Pinto'
+]
+
+
+def seed(app, patients: int, batch_size: int = 20000):
+    """Insere admin, usuários e pacientes via inserts em lote e indexa a busca"""
+    from src.models import db, User, UserRole, Patient
+    from src.utils.search import rebuild_search_index
+    
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        db.session.commit()
+        first_user_id = admin.id + 1
+        
+        for start in range(0, patients, batch_size):
+            count = min(batch_size, patients - start)
+            users, rows = [], []
+            for i in range(start, start + count):
+                users.append({'id': first_user_id + i, 'email': f'p{i}@bench.local', 'password_hash': '!',
+                              'role': UserRole.PATIENT.name, 'is_active': True,
+                              'created_at': now, 'updated_at': now})
+                name = ' '.join([rng.choice(FIRST_NAMES)] + rng.sample(SURNAMES, rng.choice((2, 3))))
+                rows.append({'user_id': first_user_id + i, 'full_name': name, 'cpf': make_cpf(i),
+                             'birth_date': date(1940 + i % 80, 1 + i % 12, 1 + i % 28),
+                             'phone': f'{rng.randint(11, 99)}9{rng.randint(10000000, 99999999)}',
+                             'allergies': [], 'current_medications': [],
+                             'created_at': now, 'updated_at': now})
+            db.session.execute(User.__table__.insert(), users)
+            db.session.execute(Patient.__table__.insert(), rows)
+            db.session.commit()
+        
+        # Carga feita fora do ORM: o índice é reconstruído de uma vez
+        started = time.perf_counter()
+        indexed = rebuild_search_index(db.engine)
+        return indexed, time.perf_counter() - started
+
+
+def run(patients: int, requests: int):
+    app = make_app()
+    t0 = time.perf_counter()
+    indexed, index_seconds = seed(app, patients)
+    print(f"Seeded {patients} patients in {time.perf_counter() - t0:.1f}s; "
+          f"search index rebuilt ({indexed} rows) in {index_seconds:.1f}s")
+    
+    client = app.test_client()
+    headers = auth_header(client, 'admin@bench.local', PASSWORD)
+    rng = random.Random(7)
+    
+    queries = {
+        'name prefix (2-3 chars)': lambda: rng.choice(FIRST_NAMES + SURNAMES)[:rng.choice((2, 3))],
+        'full first name': lambda: rng.choice(FIRST_NAMES),
+        'first name + surname prefix': lambda: f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)[:4]}",
+        'cpf fragment (formatted)': lambda: (lambda c: f"{c[:3]}.{c[3:6]}")(make_cpf(rng.randrange(patients))),
+        'phone fragment': lambda: f"({rng.randint(11, 99)}) 9{rng.randint(100, 999)}",
+        'two short prefixes': lambda: f"{rng.choice(FIRST_NAMES)[:2]} {rng.choice(SURNAMES)[:2]}"
+    }
+    
+    for label, make_query in queries.items():
+        samples = []
+        matched = 0
+        for _ in range(requests):
+            q = make_query()
+            started = time.perf_counter()
+            response = client.get('/api/patients/search', query_string={'q': q}, headers=headers)
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.get_json()
+            matched += response.get_json()['count'] > 0
+        print(f"{label:30s} {percentiles(samples)}  non-empty: {matched}/{requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=1000000, help='Pacientes cadastrados')
+    parser.add_argument('--requests', type=int, default=200, help='Buscas medidas por tipo de consulta')
+    args = parser.parse_args()
+    run(args.patients, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Guarda de número de consultas SQL por endpoint (detecta N+1)
+
+Cria pacientes sintéticos e, para cada endpoint de QUERY_BUDGETS, conta as
+instruções SQL de uma requisição com página pequena e com página grande.
+Falha (código 1) se alguma passar do orçamento ou se o número crescer com
+o tamanho da página, sinal de uma consulta por linha.
+
+Uso:
+    python -m benchmarks.query_counts [--patients 150]
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import sys
+from benchmarks.common import make_app, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+
+def seed(app, patients: int):
+    from src.models import db, User, UserRole, Patient, Professional, Appointment, MedicalRecord, Prescription
+    from src.models.appointment import AppointmentType, AppointmentStatus
+    
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        owner = User(email='owner@bench.local', role=UserRole.PATIENT)
+        owner.set_password(PASSWORD)
+        owner.patient = Patient(full_name='Paciente Dono', cpf=make_cpf(0), birth_date=date(1980, 1, 1),
+                                phone='11987654321')
+        db.session.add_all([admin, owner])
+        for i in range(1, patients + 1):
+            user = User(email=f'p{i}@bench.local', role=UserRole.PATIENT, password_hash='!')
+            user.patient = Patient(full_name=f'Paciente {i}', cpf=make_cpf(i), birth_date=date(1980, 1, 1),
+                                   phone='11987654321')
+            db.session.add(user)
+        db.session.flush()
+        
+        # Histórico clínico do paciente dono (linha do tempo): consulta, prontuário e prescrição por semana
+        pro_user = User(email='pro@bench.local', role=UserRole.PROFESSIONAL, password_hash='!')
+        pro_user.professional = Professional(full_name='Dra. Bench', professional_id='CRM-1',
+                                             specialty='Clínica Geral', work_schedule={})
+        db.session.add(pro_user)
+        db.session.flush()
+        start = datetime.utcnow().replace(microsecond=0) - timedelta(weeks=60)
+        for week in range(60):
+            appointment = Appointment(patient_id=owner.patient.id, professional_id=pro_user.professional.id,
+                                      appointment_date=start + timedelta(weeks=week),
+                                      appointment_type=AppointmentType.PRESENCIAL, status=AppointmentStatus.REALIZADA)
+            record = MedicalRecord(patient_id=owner.patient.id, professional_id=pro_user.professional.id,
+                                   appointment=appointment, created_at=appointment.appointment_date)
+            prescription = Prescription(medical_record=record, medications=['Medicamento'], created_at=record.created_at)
+            db.session.add_all([appointment, record, prescription])
+        db.session.commit()
+
+
+def run(patients: int) -> int:
+    from src.constants import QUERY_BUDGETS
+    from src.models import db
+    from src.utils.query_budget import QueryCounter
+    
+    app = make_app()
+    seed(app, patients)
+    client = app.test_client()
+    admin = auth_header(client, 'admin@bench.local', PASSWORD)
+    owner = auth_header(client, 'owner@bench.local', PASSWORD)
+    
+    # (rótulo, endpoint, cabeçalhos, caminho com página pequena, caminho com página grande)
+    cases = [
+        ('GET /api/auth/me', 'auth.get_current_user_info', owner, '/api/auth/me', None),
+        ('GET /api/patients/me', 'patient.get_my_patient_profile', owner, '/api/patients/me', None),
+        ('GET /api/patients (page)', 'patient.list_patients', admin,
+         '/api/patients?per_page=5', '/api/patients?per_page=100'),
+        ('GET /api/patients (cursor)', 'patient.list_patients', admin,
+         '/api/patients?per_page=5&cursor=&include_total=true', '/api/patients?per_page=100&cursor=&include_total=true'),
+        ('GET /api/patients/search', 'patient.search_patients', admin,
+         '/api/patients/search?q=Paciente&limit=5', '/api/patients/search?q=Paciente&limit=50'),
+        ('GET /api/patients/me/timeline', 'patient.get_patient_timeline', owner,
+         '/api/patients/me/timeline?per_page=5', '/api/patients/me/timeline?per_page=100'),
+    ]
+    
+    with app.app_context():
+        engines = list(db.engines.values())
+    
+    def count(path, headers):
+        with QueryCounter(engines) as counter:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, (path, response.status_code, response.get_json())
+        return counter
+    
+    failures = 0
+    print(f"{'request':<30}{'small':>7}{'large':>7}{'budget':>8}")
+    for label, endpoint, headers, small_path, large_path in cases:
+        budget = QUERY_BUDGETS[endpoint]
+        # Aquece caches (identidade do usuário, contagem) antes de medir
+        client.get(small_path, headers=headers)
+        small = count(small_path, headers)
+        large = count(large_path, headers) if large_path else small
+        
+        problems = []
+        if max(small.count, large.count) > budget:
+            problems.append('over budget')
+        if large.count > small.count:
+            problems.append('grows with page size (N+1)')
+        print(f"{label:<30}{small.count:>7}{large.count:>7}{budget:>8}  {', '.join(problems) or 'ok'}")
+        if problems:
+            failures += 1
+            for i, statement in enumerate(large.statements, start=1):
+                print(f"    {i}. {statement[:160]}")
+    
+    if failures:
+        print(f"\n{failures} request(s) exceeded their SQL statement budget")
+    else:
+        print(f"\nAll {len(cases)} requests within budget ({patients} patients)")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=150, help='Pacientes criados')
+    args = parser.parse_args()
+    sys.exit(1 if run(args.patients) else 0)
+
+
+if __name__ == '__main__':
+    main()
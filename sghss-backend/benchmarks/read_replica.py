@@ -0,0 +1,159 @@
+"""
+Verificação local do read/write split com dois arquivos SQLite
+
+Sobe a aplicação com um primário e uma réplica (arquivos temporários)
+mantida pelo replicador substituto com sincronização manual, e confere:
+leituras GET de outros usuários vêm da réplica (desatualizada até a
+próxima cópia), o usuário que acabou de gravar lê do primário durante a
+janela read-your-writes (também em outro worker, pelo token que o
+cliente reenvia) e volta para a réplica quando ela expira; um usuário
+desativado no primário é recusado antes da réplica ser atualizada. Por
+fim mede a latência de GET /api/patients lido da réplica.
+
+Uso:
+    python -m benchmarks.read_replica [--patients 200] [--requests 200]
+"""
+from datetime import date
+import argparse
+import atexit
+import os
+import tempfile
+import time
+from benchmarks.common import make_app, percentiles, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+WINDOW_SECONDS = 0.5
+
+
+def temp_database() -> str:
+    fd, path = tempfile.mkstemp(prefix='sghss-replica-', suffix='.db')
+    os.close(fd)
+    atexit.register(os.remove, path)
+    return f'sqlite:///{path}'
+
+
+def seed(app, patients: int):
+    from src.models import db, User, UserRole, Patient
+    
+    with app.app_context():
+        admin = User(email='admin@bench.local', role=UserRole.ADMIN)
+        admin.set_password(PASSWORD)
+        db.session.add(admin)
+        for i in range(patients):
+            user = User(email=f'p{i}@bench.local', role=UserRole.PATIENT)
+            user.set_password(PASSWORD)
+            user.patient = Patient(full_name=f'Paciente {i}', cpf=make_cpf(i), birth_date=date(1980, 1, 1),
+                                   phone='11987654321')
+            db.session.add(user)
+        db.session.commit()
+
+
+def replica_phone(app, email: str) -> str:
+    """Telefone do paciente lido diretamente da réplica"""
+    from src.models import db, User, Patient
+    from src.models.routing import REPLICA_BIND
+    
+    with app.app_context():
+        with db.engines[REPLICA_BIND].connect() as connection:
+            return connection.execute(
+                db.select(Patient.phone).join(User).where(User.email == email)
+            ).scalar()
+
+
+def run(patients: int, requests: int):
+    from src.models import db, User
+    from src.models.routing import READ_YOUR_WRITES_HEADER, read_your_writes, routing_stats
+    from src.utils import identity_cache
+    from src.utils.replication import replicator
+    
+    app = make_app(
+        database_uri=temp_database(),
+        REPLICA_DATABASE_URL=temp_database(),
+        REPLICA_SYNC_INTERVAL_SECONDS=3600,
+        READ_YOUR_WRITES_SECONDS=WINDOW_SECONDS,
+        SQLALCHEMY_ENGINE_OPTIONS={}
+    )
+    replicator.stop()
+    read_your_writes.clear()
+    seed(app, patients)
+    assert replicator.sync()
+    
+    client = app.test_client()
+    admin = auth_header(client, 'admin@bench.local', PASSWORD)
+    patient = auth_header(client, 'p0@bench.local', PASSWORD)
+    
+    # Escrita do paciente: vai para o primário; a réplica ainda não a tem
+    response = client.put('/api/patients/me', headers=patient, json={'phone': '11911112222'})
+    assert response.status_code == 200, response.get_json()
+    assert replica_phone(app, 'p0@bench.local') == '11987654321'
+    print("PUT /api/patients/me committed on primary; replica still stale")
+    
+    token = response.headers[READ_YOUR_WRITES_HEADER]
+    
+    # Read-your-writes: o próprio paciente lê do primário durante a janela
+    phone = client.get('/api/patients/me', headers=patient).get_json()['patient']['phone']
+    assert phone == '(11) 91111-2222', phone
+    print(f"  own GET within {WINDOW_SECONDS}s window -> primary: {phone}")
+    
+    # Outro worker não tem a janela do processo: vale o token (cookie ou cabeçalho)
+    read_your_writes.clear()
+    phone = client.get('/api/patients/me', headers=patient).get_json()['patient']['phone']
+    assert phone == '(11) 91111-2222', phone
+    other = app.test_client()
+    phone = other.get('/api/patients/me', headers={**patient, READ_YOUR_WRITES_HEADER: token}).get_json()
+    assert phone['patient']['phone'] == '(11) 91111-2222', phone
+    forged = other.get('/api/patients/me', headers={**patient, READ_YOUR_WRITES_HEADER: token[:-2] + 'xx'})
+    assert forged.get_json()['patient']['phone'] == '(11) 98765-4321'
+    print("  own GET on another worker (cookie or header token) -> primary; tampered token -> replica")
+    
+    # Outro usuário (admin) lê da réplica: ainda vê o valor antigo
+    def admin_view():
+        page = client.get('/api/patients?per_page=100', headers=admin).get_json()
+        return next(p['phone'] for p in page['patients'] if p['email'] == 'p0@bench.local')
+    
+    stale = admin_view()
+    assert stale == '(11) 98765-4321', stale
+    print(f"  admin GET -> replica (before sync): {stale}")
+    
+    assert replicator.sync()
+    fresh = admin_view()
+    assert fresh == '(11) 91111-2222', fresh
+    print(f"  admin GET -> replica (after sync):  {fresh}")
+    
+    # Janela expirada: o paciente volta a ler da réplica
+    time.sleep(WINDOW_SECONDS)
+    before = routing_stats()['replica']
+    client.get('/api/patients/me', headers=patient)
+    assert routing_stats()['replica'] == before + 1
+    print("  own GET after the window -> replica")
+    
+    # Identidade lida do primário: desativação vale antes da réplica copiar
+    deactivated = auth_header(client, 'p1@bench.local', PASSWORD)
+    with app.app_context():
+        User.query.filter_by(email='p1@bench.local').update({'is_active': False})
+        db.session.commit()
+    identity_cache.clear()
+    response = client.get('/api/patients/me', headers=deactivated)
+    assert response.status_code == 401, (response.status_code, response.get_json())
+    print("  GET by a user deactivated on primary (replica not synced) -> 401")
+    
+    samples = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        client.get('/api/patients?per_page=20', headers=admin)
+        samples.append(time.perf_counter() - t0)
+    print(f"\nGET /api/patients from replica ({requests} requests): {percentiles(samples)} ms")
+    print(f"Routing: {routing_stats()}")
+    print(f"Replicator: {replicator.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=200, help='Pacientes criados')
+    parser.add_argument('--requests', type=int, default=200, help='Requisições de leitura medidas')
+    args = parser.parse_args()
+    run(args.patients, args.requests)
+
+
+if __name__ == '__main__':
+    main()
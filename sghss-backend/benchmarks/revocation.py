@@ -0,0 +1,126 @@
+"""
+Benchmark da revogação de tokens (logout)
+
+Grava N revogações vigentes na tabela revoked_tokens e mede:
+
+    - a reconstrução da lista em memória a partir da tabela (início do worker);
+    - o custo por verificação: lista em memória (token não revogado e
+      revogado) contra uma consulta por jti no banco (a alternativa ingênua);
+    - GET /api/auth/me com a verificação ativa.
+
+Confere também o comportamento: após o logout o access token e o refresh
+token enviado são recusados (401), e outra lista (outro worker) passa a ver
+a revogação após uma sincronização.
+
+Uso:
+    python -m benchmarks.revocation [--revoked 50000] [--checks 100000] [--requests 500]
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import time
+import uuid
+from benchmarks.common import make_app, percentiles, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+
+def seed(app, revoked: int):
+    from src.models import db, User, UserRole, Patient, RevokedToken
+    
+    with app.app_context():
+        user = User(email='owner@bench.local', role=UserRole.PATIENT)
+        user.set_password(PASSWORD)
+        user.patient = Patient(full_name='Paciente Bench', cpf=make_cpf(0), birth_date=date(1980, 1, 1))
+        db.session.add(user)
+        expires_at = datetime.utcnow() + timedelta(hours=1)
+        db.session.execute(db.insert(RevokedToken.__table__), [
+            {'jti': str(uuid.uuid4()), 'token_type': 'access', 'user_id': None,
+             'expires_at': expires_at, 'revoked_at': datetime.utcnow()}
+            for _ in range(revoked)
+        ])
+        db.session.commit()
+
+
+def per_check(fn, keys, checks: int) -> float:
+    """Microssegundos por chamada, percorrendo as chaves em ciclo"""
+    t0 = time.perf_counter()
+    for i in range(checks):
+        fn(keys[i % len(keys)])
+    return (time.perf_counter() - t0) / checks * 1e6
+
+
+def run(revoked: int, checks: int, requests: int):
+    from flask_jwt_extended import decode_token
+    from src.models import db, RevokedToken
+    from src.utils.revocation import TokenRevocationList, revocation_list
+    
+    app = make_app()
+    seed(app, revoked)
+    client = app.test_client()
+    
+    t0 = time.perf_counter()
+    loaded = revocation_list.load()
+    rebuild_ms = (time.perf_counter() - t0) * 1000
+    assert loaded == revoked, (loaded, revoked)
+    stats = revocation_list.stats()
+    print(f"rebuild: {loaded} revoked tokens in {rebuild_ms:.1f} ms "
+          f"(filter {stats['filter_bytes'] / 1024:.0f} KiB, {stats['filter_hashes']} hashes)")
+    
+    with app.app_context():
+        revoked_jtis = [jti for (jti,) in db.session.query(RevokedToken.jti).limit(1000)]
+    fresh_jtis = [str(uuid.uuid4()) for _ in range(1000)]
+    
+    table = RevokedToken.__table__
+    lookup = db.select(table.c.id).where(table.c.jti == db.bindparam('jti'))
+    with app.app_context(), db.engines[None].connect() as connection:
+        db_check = lambda jti: connection.execute(lookup, {'jti': jti}).first() is not None
+        rows = [
+            ('in-memory, not revoked', per_check(revocation_list.is_revoked, fresh_jtis, checks)),
+            ('in-memory, revoked', per_check(revocation_list.is_revoked, revoked_jtis, checks)),
+            ('database lookup', per_check(db_check, fresh_jtis, min(checks, 20000)))
+        ]
+    print(f"\n{'check':<26}{'us/check':>10}")
+    for label, us in rows:
+        print(f"{label:<26}{us:>10.2f}")
+    assert all(revocation_list.is_revoked(jti) for jti in revoked_jtis)
+    stats = revocation_list.stats()
+    print(f"false positives: {stats['false_positives']} of {stats['checks']} checks")
+    
+    # Comportamento ponta a ponta
+    tokens = client.post('/api/auth/login', json={'email': 'owner@bench.local', 'password': PASSWORD}).get_json()
+    headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+    samples = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        client.get('/api/auth/me', headers=headers)
+        samples.append(time.perf_counter() - t0)
+    print(f"\nGET /api/auth/me with the check: {percentiles(samples)}")
+    
+    other_worker = TokenRevocationList()
+    with app.app_context():
+        other_worker.init_app(app, db)
+    
+    response = client.post('/api/auth/logout', headers=headers, json={'refresh_token': tokens['refresh_token']})
+    assert response.status_code == 200, response.get_json()
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+    refresh = client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {tokens['refresh_token']}"})
+    assert refresh.status_code == 401, refresh.get_json()
+    
+    with app.app_context():
+        jti = decode_token(tokens['access_token'])['jti']
+    assert not other_worker.is_revoked(jti)
+    assert other_worker.sync() == 2 and other_worker.is_revoked(jti)
+    print("logout: access and refresh tokens rejected (401); other worker sees the revocation after sync")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--revoked', type=int, default=50000, help='Revogações vigentes gravadas na tabela')
+    parser.add_argument('--checks', type=int, default=100000, help='Verificações medidas por caso')
+    parser.add_argument('--requests', type=int, default=500, help='Requisições GET /api/auth/me medidas')
+    args = parser.parse_args()
+    run(args.revoked, args.checks, args.requests)
+
+
+if __name__ == '__main__':
+    main()
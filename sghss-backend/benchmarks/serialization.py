@@ -0,0 +1,110 @@
+"""
+Microbenchmark da serialização de respostas
+
+Monta uma página de GET /api/patients (padrão 100 linhas) e mede, em
+linhas por segundo, a codificação com o provedor JSON padrão do Flask e
+com o FastJSONProvider (orjson). Antes de medir, confere que as duas
+saídas representam os mesmos documentos (os bytes diferem: o orjson
+escreve UTF-8 sem escapes \\uXXXX).
+
+Uso:
+    python -m benchmarks.serialization [--rows 100] [--iterations 500]
+"""
+from datetime import datetime, date
+from decimal import Decimal
+import argparse
+import json
+import time
+import uuid
+from benchmarks.common import make_app, make_cpf
+
+
+def seed(app, rows: int):
+    from src.models import db, User, UserRole, Patient
+    
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(User.__table__.insert(), [
+            {'id': i + 1, 'email': f'paciente{i}@bench.local', 'password_hash': '!',
+             'role': UserRole.PATIENT.name, 'is_active': True, 'created_at': now, 'updated_at': now}
+            for i in range(rows)
+        ])
+        db.session.execute(Patient.__table__.insert(), [
+            {'user_id': i + 1, 'full_name': f'José da Conceição Araújo {i}', 'cpf': make_cpf(i),
+             'birth_date': date(1980, 1 + i % 12, 1 + i % 28), 'phone': '11987654321',
+             'address': 'Rua das Flores, 123, São Paulo, SP', 'allergies': ['Penicilina', 'Lactose'],
+             'current_medications': ['Omeprazol 20mg'], 'medical_history': 'Gastrite crônica;   "controle" 😀',
+             'created_at': now, 'updated_at': now}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def rate(fn, rows: int, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return rows * iterations / (time.perf_counter() - started)
+
+
+def run(rows: int, iterations: int):
+    from flask.json.provider import DefaultJSONProvider
+    import orjson
+    from src.models import Patient
+    from src.routes.patient import _format_patient
+    from src.utils.json_provider import FastJSONProvider
+    
+    app = make_app()
+    seed(app, rows)
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    
+    with app.app_context():
+        patients = Patient.query.order_by(Patient.id).all()
+        emails = {p.id: p.user.email for p in patients}
+        
+        def page():
+            return {
+                'patients': [dict(_format_patient(p), email=emails[p.id]) for p in patients],
+                'pagination': {'page': 1, 'per_page': rows, 'total': rows, 'has_next': False}
+            }
+        
+        # Mesmos documentos nos dois provedores (inclusive nos casos que o orjson repassa à stdlib)
+        payload = page()
+        edge_cases = [
+            payload,
+            {'when': datetime(2025, 9, 29, 10, 30), 'day': date(2025, 9, 29), 'amount': Decimal('10.50'),
+             'id': uuid.UUID(int=1), 'floats': [0.1, 1e16, 2.5e-7, -0.0], 'text': 'ação\x7f\x00😀'},
+            {'big': 2 ** 70},
+            {1: 'non-string key', 2: 'b'}
+        ]
+        for case in edge_cases:
+            with app.test_request_context():
+                expected = json.loads(stdlib.response(case).get_data())
+                assert json.loads(fast.response(case).get_data()) == expected, case
+        
+        print(f"Encoder: orjson {orjson.__version__}")
+        print(f"Page size: {rows} rows, {len(stdlib.dumps(payload, separators=(',', ':')))} bytes (flask json); "
+              f"same documents from both providers")
+        
+        results = {
+            'encode (flask json)': rate(lambda: stdlib.dumps(payload, separators=(',', ':')), rows, iterations),
+            'encode (FastJSONProvider)': rate(lambda: fast.dumps_bytes(payload), rows, iterations),
+            'list page (flask json)': rate(lambda: stdlib.dumps(page(), separators=(',', ':')), rows, iterations),
+            'list page (FastJSONProvider)': rate(lambda: fast.dumps_bytes(page()), rows, iterations)
+        }
+        for label, value in results.items():
+            print(f"{label:36s} {value:12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100, help='Linhas por página')
+    parser.add_argument('--iterations', type=int, default=500, help='Repetições de cada medição')
+    args = parser.parse_args()
+    run(args.rows, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
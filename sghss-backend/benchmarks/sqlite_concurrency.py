@@ -0,0 +1,115 @@
+"""
+Benchmark de escrita concorrente no SQLite
+
+Executa 8 threads escritoras (um commit por inserção em audit_logs)
+enquanto 2 threads leitoras consultam a tabela, primeiro com o perfil
+antigo (journal de rollback, synchronous=FULL, sem PRAGMAs nem opções de
+pool) e depois com o perfil atual (WAL, synchronous=NORMAL, busy_timeout,
+cache e mmap). Cada perfil usa um arquivo de banco novo.
+
+Uso:
+    python -m benchmarks.sqlite_concurrency [--writers 8] [--readers 2] [--writes 200]
+"""
+from datetime import datetime
+import argparse
+import threading
+import time
+from benchmarks.common import make_app, percentiles
+
+
+def run_profile(label: str, writers: int, readers: int, writes: int, **overrides):
+    from sqlalchemy import func
+    from sqlalchemy.exc import OperationalError
+    from src.models import db, AuditLog
+    from src.utils.database import sqlite_pragmas
+    
+    app = make_app(**overrides)
+    with app.app_context():
+        pragmas = sqlite_pragmas(db.engine)
+    
+    errors = {'locked': 0, 'other': 0}
+    write_samples, read_samples = [], []
+    lock = threading.Lock()
+    done = threading.Event()
+    barrier = threading.Barrier(writers + readers)
+    
+    def writer(worker: int):
+        barrier.wait()
+        for i in range(writes):
+            t0 = time.perf_counter()
+            with app.app_context():
+                try:
+                    db.session.add(AuditLog(action='BENCH_WRITE', table_name='bench', record_id=worker * writes + i,
+                                            new_values={'worker': worker, 'i': i}, created_at=datetime.utcnow()))
+                    db.session.commit()
+                except OperationalError as e:
+                    db.session.rollback()
+                    with lock:
+                        errors['locked' if 'locked' in str(e) else 'other'] += 1
+                    continue
+            with lock:
+                write_samples.append(time.perf_counter() - t0)
+    
+    def reader():
+        barrier.wait()
+        while not done.is_set():
+            t0 = time.perf_counter()
+            with app.app_context():
+                try:
+                    db.session.query(func.count(AuditLog.id)).scalar()
+                    AuditLog.query.order_by(AuditLog.id.desc()).limit(50).all()
+                except OperationalError:
+                    with lock:
+                        errors['locked'] += 1
+                    continue
+            with lock:
+                read_samples.append(time.perf_counter() - t0)
+    
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in threads + reader_threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    
+    with app.app_context():
+        stored = db.session.query(func.count(AuditLog.id)).filter(AuditLog.action == 'BENCH_WRITE').scalar()
+    
+    print(f"\n{label}")
+    print(f"  PRAGMAs: {pragmas}")
+    print(f"  writes committed: {stored}/{writers * writes} in {elapsed:.2f}s -> {stored / elapsed:,.0f} writes/s")
+    print(f"  write latency (ms): {percentiles(write_samples)}")
+    print(f"  reads: {len(read_samples)} -> {len(read_samples) / elapsed:,.0f} reads/s, latency (ms): {percentiles(read_samples)}")
+    print(f"  'database is locked' errors: {errors['locked']}, other errors: {errors['other']}")
+    return stored / elapsed
+
+
+def main():
+    from src.config import Config
+    
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8, help='Threads escritoras')
+    parser.add_argument('--readers', type=int, default=2, help='Threads leitoras')
+    parser.add_argument('--writes', type=int, default=200, help='Commits por escritora')
+    args = parser.parse_args()
+    
+    before = run_profile(
+        "Before: default SQLite settings (rollback journal, synchronous=FULL)",
+        args.writers, args.readers, args.writes,
+        SQLITE_PRAGMAS={}, SQLALCHEMY_ENGINE_OPTIONS={}
+    )
+    after = run_profile(
+        "After: engine profile (WAL, synchronous=NORMAL, busy_timeout, cache, mmap)",
+        args.writers, args.readers, args.writes,
+        SQLITE_PRAGMAS=Config.SQLITE_PRAGMAS, SQLALCHEMY_ENGINE_OPTIONS=Config.SQLALCHEMY_ENGINE_OPTIONS
+    )
+    print(f"\nWrite throughput: {before:,.0f} -> {after:,.0f} writes/s ({after / before:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
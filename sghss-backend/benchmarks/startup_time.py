@@ -0,0 +1,76 @@
+"""
+Benchmark de inicialização do worker
+
+Cada rodada executa um processo Python novo, que mede:
+    - import: tempo de ``import src.main`` (não cria a aplicação);
+    - create_app: construção da aplicação, a frio (banco vazio, schema
+      criado e carimbado) ou a quente (carimbo coincide, create_all pulado);
+    - first request: latência de GET /api/health logo após create_app.
+
+Uso:
+    python -m benchmarks.startup_time [--runs 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks.common import percentiles
+
+PROBE = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import src.main
+t1 = time.perf_counter()
+from src.config import config, TestingConfig
+config['benchmark'] = type('BenchmarkConfig', (TestingConfig,), {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + sys.argv[1],
+    'DB_PREWARM_CONNECTIONS': int(sys.argv[2])
+})
+app = src.main.create_app('benchmark')
+t2 = time.perf_counter()
+status = app.test_client().get('/api/health').status_code
+t3 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'first_request': t3 - t2, 'status': status}))
+"""
+
+
+def probe(path: str, prewarm: int) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, FLASK_ENV='testing', LOG_LEVEL='WARNING')
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, path, str(prewarm)],
+        cwd=root, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result['status'] == 200, result
+    return result
+
+
+def report(label: str, results: list):
+    print(f"\n{label} ({len(results)} runs)")
+    for key in ('import', 'create_app', 'first_request'):
+        print(f"  {key:<14} {percentiles([r[key] for r in results])} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='Processos medidos por cenário')
+    args = parser.parse_args()
+    
+    cold, warm, no_prewarm = [], [], []
+    with tempfile.TemporaryDirectory(prefix='sghss-startup-') as directory:
+        for i in range(args.runs):
+            path = os.path.join(directory, f'cold-{i}.db')
+            cold.append(probe(path, prewarm=2))
+            warm.append(probe(path, prewarm=2))
+            no_prewarm.append(probe(path, prewarm=0))
+    
+    report("Cold start: empty database, schema created and stamped", cold)
+    report("Warm start: schema stamp matches, pool pre-warmed", warm)
+    report("Warm start without pool pre-warm", no_prewarm)
+
+
+if __name__ == '__main__':
+    main()
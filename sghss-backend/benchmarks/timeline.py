@@ -0,0 +1,127 @@
+"""
+Benchmark da linha do tempo clínica do paciente
+
+Cria dois pacientes com o mesmo profissional: um com um mês de histórico
+e outro com dez anos (consultas semanais, um prontuário por consulta e
+duas prescrições por prontuário). Confere que a paginação percorre todos
+os eventos em ordem cronológica sem repetir nenhum, que o número de
+consultas SQL por página é o mesmo para os dois históricos, e compara a
+latência da primeira página e de uma página profunda.
+
+Uso:
+    python -m benchmarks.timeline [--years 10] [--requests 200] [--per-page 20]
+"""
+from datetime import date, datetime, timedelta
+import argparse
+import time
+from benchmarks.common import make_app, percentiles, auth_header, make_cpf
+
+PASSWORD = 'Bench@12345'
+
+
+def seed(app, histories):
+    """Cria um paciente por histórico (nome -> semanas); retorna e-mail e total de eventos de cada um"""
+    from src.models import db, User, UserRole, Patient, Professional, Appointment, MedicalRecord, Prescription
+    from src.models.appointment import AppointmentType, AppointmentStatus
+    
+    with app.app_context():
+        pro_user = User(email='pro@bench.local', role=UserRole.PROFESSIONAL, password_hash='!')
+        db.session.add(pro_user)
+        db.session.flush()
+        professional = Professional(user_id=pro_user.id, full_name='Dra. Bench', professional_id='CRM-1',
+                                    specialty='Clínica Geral', work_schedule={})
+        db.session.add(professional)
+        db.session.flush()
+        
+        emails = {}
+        now = datetime.utcnow().replace(microsecond=0)
+        for n, (name, weeks) in enumerate(histories.items()):
+            user = User(email=f'{name}@bench.local', role=UserRole.PATIENT)
+            user.set_password(PASSWORD)
+            user.patient = Patient(full_name=f'Paciente {name}', cpf=make_cpf(n), birth_date=date(1970, 1, 1))
+            db.session.add(user)
+            db.session.flush()
+            
+            # Horário diferente por paciente: mesmo profissional, sem conflito de agenda
+            start = now - timedelta(weeks=weeks, hours=n)
+            appointments = [
+                Appointment(patient_id=user.patient.id, professional_id=professional.id,
+                            appointment_date=start + timedelta(weeks=w), appointment_type=AppointmentType.PRESENCIAL,
+                            status=AppointmentStatus.REALIZADA)
+                for w in range(weeks)
+            ]
+            db.session.add_all(appointments)
+            db.session.flush()
+            records = [
+                MedicalRecord(patient_id=user.patient.id, professional_id=professional.id, appointment_id=a.id,
+                              diagnosis='Rotina', created_at=a.appointment_date + timedelta(minutes=30))
+                for a in appointments
+            ]
+            db.session.add_all(records)
+            db.session.flush()
+            db.session.add_all([
+                Prescription(medical_record_id=r.id, medications=[f'Medicamento {i}'],
+                             created_at=r.created_at + timedelta(minutes=5 + i))
+                for r in records for i in range(2)
+            ])
+            db.session.commit()
+            emails[name] = (user.email, weeks * 4)
+        return emails
+
+
+def walk(client, headers, per_page):
+    """Percorre todas as páginas e retorna os eventos e os cursores"""
+    events, cursors, cursor = [], [], ''
+    while cursor is not None:
+        page = client.get(f'/api/patients/me/timeline?per_page={per_page}&cursor={cursor}', headers=headers).get_json()
+        events.extend(page['events'])
+        cursor = page['pagination']['next_cursor']
+        if cursor:
+            cursors.append(cursor)
+    return events, cursors
+
+
+def run(years: int, requests: int, per_page: int):
+    from src.models import db
+    from src.utils.query_budget import QueryCounter
+    
+    app = make_app()
+    histories = seed(app, {'month': 4, 'decade': 52 * years})
+    client = app.test_client()
+    with app.app_context():
+        engines = list(db.engines.values())
+    
+    print(f"{'history':<10}{'events':>8}{'queries':>9}  {'first page (ms)':<40}{'deep page (ms)'}")
+    for name, (email, expected) in histories.items():
+        headers = auth_header(client, email, PASSWORD)
+        
+        events, cursors = walk(client, headers, per_page)
+        keys = [(e['type'], e['data']['id']) for e in events]
+        assert len(keys) == expected == len(set(keys)), (name, len(keys), expected)
+        assert all(a['occurred_at'] >= b['occurred_at'] for a, b in zip(events, events[1:])), name
+        
+        deep = f'/api/patients/me/timeline?per_page={per_page}&cursor={cursors[-1] if cursors else ""}'
+        with QueryCounter(engines) as counter:
+            client.get(deep, headers=headers)
+        
+        samples = {'first': [], 'deep': []}
+        for _ in range(requests):
+            for label, path in (('first', f'/api/patients/me/timeline?per_page={per_page}'), ('deep', deep)):
+                t0 = time.perf_counter()
+                client.get(path, headers=headers)
+                samples[label].append(time.perf_counter() - t0)
+        print(f"{name:<10}{len(events):>8}{counter.count:>9}  {str(percentiles(samples['first'])):<40}"
+              f"{percentiles(samples['deep'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=int, default=10, help='Anos do histórico longo')
+    parser.add_argument('--requests', type=int, default=200, help='Requisições medidas por página')
+    parser.add_argument('--per-page', type=int, default=20, help='Eventos por página')
+    args = parser.parse_args()
+    run(args.years, args.requests, args.per_page)
+
+
+if __name__ == '__main__':
+    main()
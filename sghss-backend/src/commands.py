@@ -0,0 +1,127 @@
+"""
+Comandos de linha de comando (flask <comando>) do SGHSS Backend
+
+As dependências de cada comando são importadas só quando ele é executado,
+para não pesar na inicialização dos workers.
+"""
+from datetime import datetime
+import click
+
+
+@click.command('calibrate-bcrypt')
+@click.option('--target-ms', default=100.0, show_default=True,
+              help='Latência alvo de verificação de senha em milissegundos')
+@click.option('--min-rounds', default=4, show_default=True, help='Menor custo testado')
+@click.option('--max-rounds', default=16, show_default=True, help='Maior custo testado')
+@click.option('--samples', default=3, show_default=True, help='Medições por custo')
+def calibrate_bcrypt_command(target_ms, min_rounds, max_rounds, samples):
+    """Mede o bcrypt nesta máquina e recomenda BCRYPT_ROUNDS"""
+    from src.utils.hashing import calibrate_rounds
+    
+    result = calibrate_rounds(target_ms, min_rounds=min_rounds, max_rounds=max_rounds, samples=samples)
+    
+    for rounds, elapsed_ms in result['timings_ms'].items():
+        marker = ' <-' if rounds == result['recommended_rounds'] else ''
+        click.echo(f"rounds={rounds:2d}  verify={elapsed_ms:9.2f} ms{marker}")
+    
+    click.echo(f"\nRecommended: BCRYPT_ROUNDS={result['recommended_rounds']} (target {target_ms:g} ms)")
+
+
+# Paginação por cursor: o plano deve posicionar no índice (SEARCH), não percorrê-lo do início
+_SEEK_QUERIES = ('patients.list_keyset',)
+
+
+def _hot_queries():
+    """Consultas das rotas e relacionamentos mais usados, na forma em que são emitidas"""
+    from src.models import (
+        db, User, Patient, Professional, Appointment, AppointmentStatus, MedicalRecord, Prescription, AuditLog
+    )
+    # Mesmo predicado que paginate_query aplica ao cursor de list_patients
+    from src.utils.helpers import _keyset_filter
+    
+    now = datetime.utcnow()
+    active_patients = Patient.query.join(User).filter(User.is_active == db.true()).options(
+        db.contains_eager(Patient.user)
+    )
+    
+    return {
+        'patients.list_page': active_patients.order_by(Patient.created_at, Patient.id).limit(10),
+        'patients.list_keyset': active_patients.filter(
+            _keyset_filter((Patient.created_at, Patient.id), (now, 0))
+        ).order_by(Patient.created_at, Patient.id).limit(10),
+        'patients.list_count': db.session.query(db.func.count(Patient.id)).join(User).filter(User.is_active == db.true()),
+        'patients.by_user': Patient.query.filter(Patient.user_id == 1),
+        'professionals.by_user': Professional.query.filter(Professional.user_id == 1),
+        'professionals.by_specialty': Professional.query.filter(
+            Professional.specialty == 'x', Professional.is_available == True
+        ).order_by(Professional.id),
+        'appointments.by_patient': Appointment.query.filter(Appointment.patient_id == 1)
+            .order_by(Appointment.appointment_date),
+        'appointments.by_professional_range': Appointment.query.filter(
+            Appointment.professional_id == 1,
+            Appointment.appointment_date > now,
+            Appointment.appointment_date < now,
+            Appointment.status != AppointmentStatus.CANCELADA
+        ).order_by(Appointment.appointment_date),
+        'appointments.by_date': Appointment.query.filter(
+            Appointment.appointment_date >= now, Appointment.appointment_date < now
+        ).order_by(Appointment.appointment_date),
+        'medical_records.by_patient': MedicalRecord.query.filter(MedicalRecord.patient_id == 1)
+            .order_by(MedicalRecord.created_at.desc()),
+        'medical_records.by_professional': MedicalRecord.query.filter(MedicalRecord.professional_id == 1)
+            .order_by(MedicalRecord.created_at.desc()),
+        'medical_records.by_appointment': MedicalRecord.query.filter(MedicalRecord.appointment_id == 1),
+        'prescriptions.by_medical_record': Prescription.query.filter(Prescription.medical_record_id == 1),
+        'audit_logs.by_user': AuditLog.query.filter(AuditLog.user_id == 1).order_by(AuditLog.created_at.desc()),
+        'audit_logs.by_record': AuditLog.query.filter(
+            AuditLog.table_name == 'patients', AuditLog.record_id == 1
+        ).order_by(AuditLog.created_at.desc())
+    }
+
+
+@click.command('check-query-plans')
+@click.option('--verbose', is_flag=True, help='Mostra o plano completo de cada consulta')
+def check_query_plans_command(verbose):
+    """Falha se alguma consulta crítica fizer varredura completa de tabela"""
+    from src.models import db
+    from src.utils.query_plans import check_query_plans
+    
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException("check-query-plans supports SQLite only")
+    
+    report = check_query_plans(db.session, _hot_queries(), seek=_SEEK_QUERIES)
+    failures = 0
+    
+    for name, result in report.items():
+        status = 'FAIL' if result['problems'] else 'ok'
+        click.echo(f"{status:4s}  {name}")
+        if result['problems'] or verbose:
+            for step in result['plan']:
+                click.echo(f"        {step}")
+        failures += bool(result['problems'])
+    
+    if failures:
+        raise click.ClickException(f"{failures} query plan(s) regressed to full or index scans")
+    click.echo(f"\nAll {len(report)} query plans use indexes")
+
+
+@click.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Recria o índice de busca de pacientes (após cargas via SQL direto)"""
+    from src.models import db
+    from src.utils.search import rebuild_search_index
+    
+    total = rebuild_search_index(db.engine)
+    click.echo(f"Indexed {total} patients")
+
+
+def register_commands(app):
+    """
+    Registra os comandos CLI na aplicação
+    
+    Args:
+        app: Aplicação Flask
+    """
+    app.cli.add_command(calibrate_bcrypt_command)
+    app.cli.add_command(check_query_plans_command)
+    app.cli.add_command(rebuild_search_index_command)
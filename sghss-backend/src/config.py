@@ -13,6 +13,80 @@ class Config:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Cache de identidade (user_id -> role, is_active); 0 desativa. Invalidado após o commit só no
+    # processo que alterou o usuário: nos outros workers, desativação/troca de role vale em até este tempo
+    IDENTITY_CACHE_TTL_SECONDS = int(os.environ.get('IDENTITY_CACHE_TTL_SECONDS', 5))
+    
+    # Pool de processos para bcrypt; 0 workers executa na thread da requisição
+    HASH_POOL_WORKERS = int(os.environ.get('HASH_POOL_WORKERS', os.cpu_count() or 1))
+    HASH_QUEUE_SIZE = int(os.environ.get('HASH_QUEUE_SIZE', 32))
+    HASH_TIMEOUT_SECONDS = float(os.environ.get('HASH_TIMEOUT_SECONDS', 10))
+    HASH_RETRY_AFTER_SECONDS = int(os.environ.get('HASH_RETRY_AFTER_SECONDS', 2))
+    
+    # Custo do bcrypt (calibre com `flask calibrate-bcrypt`)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    
+    # Gravação em lote da auditoria (audit_logs)
+    AUDIT_ASYNC = True
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+    AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get('AUDIT_FLUSH_INTERVAL_SECONDS', 1.0))
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 10000))
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(os.environ.get('AUDIT_ENQUEUE_TIMEOUT_SECONDS', 0.05))
+    
+    # Serialização JSON das respostas: 'orjson' ou 'stdlib' (provedor padrão do Flask)
+    JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+    
+    # Compressão de respostas acima de COMPRESSION_MIN_SIZE bytes (gzip; brotli se instalado)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+    
+    # Perfil por requisição (cabeçalho Server-Timing e GET /api/admin/profiles)
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 1.0))
+    PROFILING_BUFFER_SIZE = int(os.environ.get('PROFILING_BUFFER_SIZE', 500))
+    
+    # Métricas Prometheus (GET /api/metrics); com vários workers, diretório compartilhado entre eles
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_INTERVAL_SECONDS = float(os.environ.get('METRICS_FLUSH_INTERVAL_SECONDS', 5))
+    
+    # Fuso das consultas e de work_schedule (nome IANA); vazio usa o horário local do servidor
+    CLINIC_TIMEZONE = os.environ.get('CLINIC_TIMEZONE') or None
+    
+    # Revogação de tokens no logout (ver src/utils/revocation.py)
+    REVOCATION_FILTER_CAPACITY = int(os.environ.get('REVOCATION_FILTER_CAPACITY', 100000))
+    REVOCATION_FILTER_ERROR_RATE = float(os.environ.get('REVOCATION_FILTER_ERROR_RATE', 0.01))
+    # Leitura das revogações feitas por outros workers (0 desativa; processo único)
+    REVOCATION_SYNC_INTERVAL_SECONDS = float(os.environ.get('REVOCATION_SYNC_INTERVAL_SECONDS', 2))
+    
+    # PRAGMAs aplicados a cada nova conexão SQLite (ver src/utils/database.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 268435456)),
+        'temp_store': 'MEMORY'
+    }
+    
+    # Pool de conexões (sobrescrito por ambiente)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 3600))
+    }
+    # Conexões abertas na inicialização e após cada fork de worker (0 desativa)
+    DB_PREWARM_CONNECTIONS = int(os.environ.get('DB_PREWARM_CONNECTIONS', 2))
+    
+    # Réplica de leitura (bind 'replica'); vazio desativa o roteamento
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    # Após gravar, o usuário lê do primário por este tempo (read-your-writes)
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
+    # Replicador local entre dois arquivos SQLite (0 desativa)
+    REPLICA_SYNC_INTERVAL_SECONDS = float(os.environ.get('REPLICA_SYNC_INTERVAL_SECONDS', 0))
+    
     @staticmethod
     def init_app(app):
         pass
@@ -28,11 +102,25 @@ class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT_SECONDS', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 1800)),
+        'pool_pre_ping': True
+    }
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Banco em memória usa um pool de conexão única (sem pool_size/max_overflow)
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    DB_PREWARM_CONNECTIONS = 0
+    HASH_POOL_WORKERS = 0
+    BCRYPT_ROUNDS = 4
+    AUDIT_ASYNC = False
+    REVOCATION_SYNC_INTERVAL_SECONDS = 0
 
 config = {
     'development': DevelopmentConfig,
@@ -46,6 +46,14 @@ VALID_USER_ROLES = ['patient', 'professional', 'admin']
 VALID_APPOINTMENT_TYPES = ['presencial', 'telemedicina']
 VALID_APPOINTMENT_STATUS = ['agendada', 'realizada', 'cancelada']
 
+# Agendamento de consultas
+APPOINTMENTS = {
+    'slot_minutes': 30,
+    'max_days_ahead': 365,
+    'default_search_days': 7,
+    'max_search_days': 31
+}
+
 # Configurações de auditoria
 AUDIT_ACTIONS = {
     'USER_REGISTERED': 'User registration',
@@ -56,6 +64,8 @@ AUDIT_ACTIONS = {
     'TOKEN_REFRESHED': 'Token refreshed',
     'PATIENT_PROFILE_CREATED': 'Patient profile created',
     'PATIENT_PROFILE_UPDATED': 'Patient profile updated',
+    'PATIENT_BULK_IMPORT': 'Patients bulk imported',
+    'PATIENT_EXPORT': 'Patients exported',
     'PROFESSIONAL_PROFILE_CREATED': 'Professional profile created',
     'PROFESSIONAL_PROFILE_UPDATED': 'Professional profile updated',
     'APPOINTMENT_CREATED': 'Appointment created',
@@ -71,7 +81,74 @@ AUDIT_ACTIONS = {
 PAGINATION = {
     'default_per_page': 20,
     'max_per_page': 100,
-    'min_per_page': 1
+    'min_per_page': 1,
+    'count_cache_ttl_seconds': 30
+}
+
+# Importação em massa de pacientes
+BULK_IMPORT = {
+    'chunk_size': 500,
+    'max_chunk_size': 5000,
+    'max_errors_reported': 1000
+}
+
+# Exportação de pacientes em streaming
+EXPORT = {
+    'batch_size': 1000,
+    'mimetypes': {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv'
+    }
+}
+
+# Busca de pacientes (nome, CPF, telefone)
+SEARCH = {
+    'default_limit': 20,
+    'max_limit': 100,
+    'min_token_length': 2
+}
+
+# Compressão de respostas (gzip/brotli negociados por Accept-Encoding)
+COMPRESSION = {
+    'mimetypes': [
+        'application/json',
+        'application/javascript',
+        'application/manifest+json',
+        'image/svg+xml',
+        'text/css',
+        'text/html',
+        'text/javascript',
+        'text/plain'
+    ],
+    # Arquivos estáticos são comprimidos uma vez, no nível máximo
+    'static_gzip_level': 9,
+    'static_brotli_quality': 11
+}
+
+# Manifesto de arquivos estáticos (SPA)
+STATIC_ASSETS = {
+    # Nome com hash de conteúdo gerado pelo bundler (app.3f2a9c1d.js, index-4b1c2d3e.css)
+    'hashed_name_pattern': r'[.-](?=[A-Za-z0-9_]*[0-9])[A-Za-z0-9_]{8,}\.[A-Za-z0-9]+$',
+    'immutable_max_age': 31536000,
+    # Sinal que reconstrói o manifesto (ex.: kill -HUP <pid> após um deploy)
+    'reload_signal': 'SIGHUP'
+}
+
+# Máximo de instruções SQL por requisição, por endpoint (benchmarks/query_counts.py);
+# o número não pode crescer com o tamanho da página
+QUERY_BUDGETS = {
+    'auth.get_current_user_info': 3,
+    'patient.get_my_patient_profile': 3,
+    'patient.list_patients': 3,
+    'patient.search_patients': 3,
+    'patient.get_patient_timeline': 6
+}
+
+# Métricas Prometheus (GET /api/metrics)
+METRICS = {
+    # Limites superiores (segundos) dos buckets do histograma de latência
+    'latency_buckets': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    'content_type': 'text/plain; version=0.0.4; charset=utf-8'
 }
 
 # Configurações de log
@@ -81,6 +158,15 @@ LOG_LEVELS = {
     'production': 'WARNING'
 }
 
+# Arquivo de log (JSON lines) e rotação por tamanho e tempo
+LOGGING = {
+    'dir': 'logs',
+    'file_name': 'sghss.log',
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 10,
+    'rotate_when': 'midnight'
+}
+
 # Configurações de segurança
 SECURITY = {
     'max_login_attempts': 5,
@@ -3,45 +3,90 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, Response, jsonify
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from src.models import db
 from src.routes.auth import auth_bp
 from src.routes.patient import patient_bp
+from src.routes.appointment import appointment_bp
+from src.routes.admin import admin_bp
 from src.config import config
-from src.utils import setup_logging, SGHSSBaseException
+from src.commands import register_commands
+from src.utils.search import enable_search_engine
+from src.utils.scheduling import set_clinic_timezone
+from src.utils.schema import ensure_schema
+from src.utils.json_provider import FastJSONProvider
+from src.utils.static_assets import static_manifest
+from src.utils.database import configure_engines, prewarm_pool
+from src.utils.replication import replicator
+from src.models.routing import REPLICA_BIND, READ_YOUR_WRITES_HEADER, read_your_writes
+from src.constants import METRICS
+from src.utils import (setup_logging, SGHSSBaseException, identity_cache, password_hasher, audit_writer,
+                       response_compressor, request_profiler, metrics_registry, revocation_list)
 import logging
 
-# Setup logging
-logger = setup_logging()
+logger = logging.getLogger('sghss')
 
 def create_app(config_name=None):
     """Application factory pattern"""
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
+    setup_logging(config_name)
+    
     app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
     
     # Load configuration
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
+    identity_cache.ttl = app.config['IDENTITY_CACHE_TTL_SECONDS']
+    set_clinic_timezone(app.config['CLINIC_TIMEZONE'])
+    password_hasher.configure(
+        workers=app.config['HASH_POOL_WORKERS'],
+        queue_size=app.config['HASH_QUEUE_SIZE'],
+        timeout=app.config['HASH_TIMEOUT_SECONDS'],
+        retry_after=app.config['HASH_RETRY_AFTER_SECONDS'],
+        rounds=app.config['BCRYPT_ROUNDS']
+    )
+    audit_writer.init_app(app)
+    if app.config['JSON_ENCODER'] != 'stdlib':
+        app.json = FastJSONProvider(app)
+    response_compressor.init_app(app)
+    static_manifest.init_app(app)
+    read_your_writes.init_app(app)
+    
+    # Read replica bind: GET requests read from it (see src/models/routing.py)
+    if app.config['REPLICA_DATABASE_URL']:
+        app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {},
+                                              **{REPLICA_BIND: app.config['REPLICA_DATABASE_URL']})
     
     # Initialize extensions
     db.init_app(app)
+    configure_engines(app, db)
+    request_profiler.init_app(app, db)
+    metrics_registry.init_app(app, db)
     jwt = JWTManager(app)
-    CORS(app, origins="*")  # Allow all origins for development - change in production
+    CORS(app, origins="*", expose_headers=["ETag", READ_YOUR_WRITES_HEADER])  # Allow all origins for development - change in production
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(patient_bp, url_prefix='/api')
+    app.register_blueprint(appointment_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api')
+    
+    # Register CLI commands
+    register_commands(app)
     
     # Register error handlers
     @app.errorhandler(SGHSSBaseException)
     def handle_custom_exception(error):
         """Handle custom SGHSS exceptions"""
         logger.error(f"Custom exception: {error.message}")
-        return jsonify({'error': error.message}), error.status_code
+        headers = {}
+        if getattr(error, 'retry_after', None):
+            headers['Retry-After'] = str(error.retry_after)
+        return jsonify({'error': error.message}), error.status_code, headers
     
     @app.errorhandler(400)
     def handle_bad_request(error):
@@ -82,55 +127,90 @@ def create_app(config_name=None):
     # JWT error handlers
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
+        metrics_registry.inc('sghss_auth_failures_total', status=401, reason='expired_token')
         return jsonify({'error': 'Token has expired'}), 401
     
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
+        metrics_registry.inc('sghss_auth_failures_total', status=401, reason='invalid_token')
         return jsonify({'error': 'Invalid token'}), 401
     
     @jwt.unauthorized_loader
     def missing_token_callback(error):
+        metrics_registry.inc('sghss_auth_failures_total', status=401, reason='missing_token')
         return jsonify({'error': 'Authorization token is required'}), 401
     
+    # Logout revocation: in-memory check, no database round trip per request
+    @jwt.token_in_blocklist_loader
+    def token_in_blocklist_callback(jwt_header, jwt_payload):
+        return revocation_list.is_revoked(jwt_payload['jti'])
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        metrics_registry.inc('sghss_auth_failures_total', status=401, reason='revoked_token')
+        return jsonify({'error': 'Token has been revoked'}), 401
+    
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve(path):
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        if app.static_folder is None:
             return "Static folder not configured", 404
-
-        if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                return "index.html not found", 404
+        
+        # Existing asset or SPA fallback, resolved from the in-memory manifest
+        entry = (path and static_manifest.get(path)) or static_manifest.get('index.html')
+        if entry is None:
+            return "index.html not found", 404
+        return static_manifest.response(entry)
 
     @app.route('/api/health', methods=['GET'])
     def health_check():
         """Health check endpoint"""
         return {'status': 'healthy', 'message': 'SGHSS API is running'}, 200
     
-    # Create database tables
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus metrics aggregated across the worker processes on this host"""
+        return Response(metrics_registry.render(), content_type=METRICS['content_type'])
+    
+    # Create database tables (skipped when the schema stamp matches)
     with app.app_context():
-        # Ensure database directory exists
-        db_dir = os.path.join(os.path.dirname(__file__), 'database')
-        if not os.path.exists(db_dir):
-            os.makedirs(db_dir)
-        
         try:
-            db.create_all()
-            logger.info("Database tables created successfully")
+            ensure_schema(db, os.path.join(os.path.dirname(__file__), 'database'))
         except Exception as e:
             logger.error(f"Failed to create database tables: {e}")
             raise
+        
+        # Revoked tokens (logout) rebuilt from the database before serving requests
+        revocation_list.init_app(app, db)
+        
+        # Local stand-in replication (two SQLite files); the copy brings the search table along
+        replicator.init_app(app, db)
+        if REPLICA_BIND in db.engines:
+            enable_search_engine(db.engines[REPLICA_BIND])
+    
+    # Open pool connections now, and in each forked worker on its first request
+    prewarm_pool(app, db)
     
     return app
 
-# Create app instance
-app = create_app()
+
+_app = None
+
+
+def __getattr__(name):
+    """
+    Lazy ``app`` for WSGI servers and ``flask --app src.main``
+    
+    Importing this module no longer builds the application; it is created
+    on first access to ``src.main.app`` (e.g. by gunicorn in each worker).
+    """
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    create_app().run(host='0.0.0.0', port=5000, debug=True)
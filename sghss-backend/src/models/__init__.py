@@ -5,10 +5,11 @@ from .appointment import Appointment, AppointmentType, AppointmentStatus
 from .medical_record import MedicalRecord
 from .prescription import Prescription
 from .audit_log import AuditLog
+from .revoked_token import RevokedToken
 
 __all__ = [
     'db', 'User', 'UserRole', 'Patient', 'Professional', 
     'Appointment', 'AppointmentType', 'AppointmentStatus',
-    'MedicalRecord', 'Prescription', 'AuditLog'
+    'MedicalRecord', 'Prescription', 'AuditLog', 'RevokedToken'
 ]
 
@@ -13,6 +13,26 @@ class AppointmentStatus(enum.Enum):
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
+    __table_args__ = (
+        # Range lookups for double-booking detection
+        db.Index('ix_appointments_professional_date', 'professional_id', 'appointment_date'),
+        db.Index('ix_appointments_patient_date', 'patient_id', 'appointment_date'),
+        # Daily agenda across all professionals
+        db.Index('ix_appointments_date', 'appointment_date'),
+        # One active booking per slot start, enforced by the database under concurrency
+        db.Index(
+            'uq_appointments_professional_slot', 'professional_id', 'appointment_date',
+            unique=True,
+            sqlite_where=db.text("status != 'CANCELADA'"),
+            postgresql_where=db.text("status != 'CANCELADA'")
+        ),
+        db.Index(
+            'uq_appointments_patient_slot', 'patient_id', 'appointment_date',
+            unique=True,
+            sqlite_where=db.text("status != 'CANCELADA'"),
+            postgresql_where=db.text("status != 'CANCELADA'")
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
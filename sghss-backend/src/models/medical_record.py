@@ -3,6 +3,12 @@ from datetime import datetime
 
 class MedicalRecord(db.Model):
     __tablename__ = 'medical_records'
+    __table_args__ = (
+        # Patient and professional histories, newest first
+        db.Index('ix_medical_records_patient_created', 'patient_id', 'created_at'),
+        db.Index('ix_medical_records_professional_created', 'professional_id', 'created_at'),
+        db.Index('ix_medical_records_appointment_id', 'appointment_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
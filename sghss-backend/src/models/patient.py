@@ -4,6 +4,11 @@ import json
 
 class Patient(db.Model):
     __tablename__ = 'patients'
+    __table_args__ = (
+        # Supports keyset pagination ordered by (created_at, id)
+        db.Index('ix_patients_created_at_id', 'created_at', 'id'),
+        db.Index('ix_patients_user_id', 'user_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
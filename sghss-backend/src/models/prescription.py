@@ -3,6 +3,9 @@ from datetime import datetime
 
 class Prescription(db.Model):
     __tablename__ = 'prescriptions'
+    __table_args__ = (
+        db.Index('ix_prescriptions_medical_record_id', 'medical_record_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     medical_record_id = db.Column(db.Integer, db.ForeignKey('medical_records.id'), nullable=False)
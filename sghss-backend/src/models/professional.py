@@ -3,6 +3,10 @@ from datetime import datetime
 
 class Professional(db.Model):
     __tablename__ = 'professionals'
+    __table_args__ = (
+        db.Index('ix_professionals_user_id', 'user_id'),
+        db.Index('ix_professionals_specialty', 'specialty'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -0,0 +1,189 @@
+"""
+Roteamento de leituras para a réplica (read/write split)
+
+Quando há um bind ``replica`` configurado, a sessão envia as consultas de
+requisições somente leitura (GET/HEAD) para o engine da réplica e todo o
+resto para o primário: escritas (flush, INSERT/UPDATE/DELETE), requisições
+que alteram dados, comandos CLI e threads de fundo.
+
+Read-your-writes: após um commit com alterações, o usuário autenticado lê
+do primário por READ_YOUR_WRITES_SECONDS, tempo suficiente para a réplica
+alcançá-lo. A janela é marcada no processo que atendeu a escrita e também
+vai com o cliente: a resposta leva um token assinado (usuário e fim da
+janela) no cookie ``sghss_ryw`` e no cabeçalho ``X-Read-Your-Writes``. A
+próxima leitura, em qualquer worker, lê do primário enquanto o token
+(reenviado pelo cookie ou pelo cabeçalho) for válido.
+"""
+from typing import Any, Dict, Optional, Tuple
+import math
+import threading
+import time
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+READ_ONLY_METHODS = frozenset(('GET', 'HEAD'))
+READ_YOUR_WRITES_COOKIE = 'sghss_ryw'
+READ_YOUR_WRITES_HEADER = 'X-Read-Your-Writes'
+
+
+class ReadYourWritesWindow:
+    """Usuários que gravaram recentemente e devem ler do primário"""
+    
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+    
+    def init_app(self, app) -> None:
+        """
+        Registra o envio do token da janela nas respostas
+        
+        Args:
+            app: Aplicação Flask
+        """
+        app.after_request(self._issue_token)
+    
+    def mark(self, user_id: int, seconds: float) -> None:
+        """Abre (ou estende) a janela do usuário"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_size:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+            self._until[user_id] = now + seconds
+    
+    def active(self, user_id: int) -> bool:
+        """Indica se o usuário ainda está na janela (deste processo ou do token da requisição)"""
+        until = self._until.get(user_id)
+        if until is not None and until > time.monotonic():
+            return True
+        return has_request_context() and self._token_active(user_id)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+    
+    @staticmethod
+    def _signer() -> Signer:
+        return Signer(current_app.config['SECRET_KEY'], salt='read-your-writes')
+    
+    def _token_active(self, user_id: int) -> bool:
+        token = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+        if not token:
+            return False
+        try:
+            owner, _, until = self._signer().unsign(token).decode('ascii').partition(':')
+            return int(owner) == user_id and float(until) > time.time()
+        except (BadSignature, UnicodeDecodeError, ValueError):
+            return False
+    
+    def _issue_token(self, response):
+        pending: Optional[Tuple[int, float]] = g.pop('read_your_writes', None)
+        if pending is None:
+            return response
+        
+        user_id, seconds = pending
+        # Hora de parede: o token é conferido por outros processos
+        token = self._signer().sign(f'{user_id}:{time.time() + seconds:.3f}').decode('ascii')
+        response.headers[READ_YOUR_WRITES_HEADER] = token
+        response.set_cookie(READ_YOUR_WRITES_COOKIE, token, max_age=math.ceil(seconds), path='/api',
+                            secure=request.is_secure, httponly=True, samesite='Lax')
+        return response
+
+
+read_your_writes = ReadYourWritesWindow()
+
+_route_counts = {'primary': 0, 'replica': 0}
+_route_lock = threading.Lock()
+
+
+def _request_user_id() -> Optional[int]:
+    """ID do usuário do JWT já verificado na requisição (sem decodificar de novo)"""
+    try:
+        return int(get_jwt_identity())
+    except (RuntimeError, TypeError, ValueError):
+        # Rota sem @jwt_required (ex.: login) ou identidade inválida
+        return None
+
+
+def _use_replica() -> bool:
+    """Decide (uma vez por requisição) se as leituras vão para a réplica"""
+    if not has_request_context():
+        return False
+    
+    route = g.get('db_route')
+    if route is None:
+        route = 'primary'
+        if request.method in READ_ONLY_METHODS:
+            user_id = _request_user_id()
+            if user_id is None or not read_your_writes.active(user_id):
+                route = 'replica'
+        g.db_route = route
+        with _route_lock:
+            _route_counts[route] += 1
+    return route == 'replica'
+
+
+class RoutingSession(Session):
+    """
+    Sessão do Flask-SQLAlchemy com leituras roteadas para a réplica
+    
+    Sem bind ``replica`` configurado, comporta-se como a sessão padrão.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or self._flushing or isinstance(clause, sa.sql.dml.UpdateBase):
+            return engine
+        
+        engines = self._db.engines
+        replica = engines.get(REPLICA_BIND)
+        if replica is not None and engine is engines.get(None) and _use_replica():
+            return replica
+        return engine
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_dirty(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_dml(orm_execute_state):
+    # INSERT/UPDATE/DELETE via session.execute() não passam pelo flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _open_read_your_writes(session):
+    if not session.info.pop('wrote', False) or not has_request_context():
+        return
+    
+    # O restante desta requisição também lê do primário
+    g.db_route = 'primary'
+    user_id = _request_user_id()
+    if user_id is not None:
+        seconds = current_app.config['READ_YOUR_WRITES_SECONDS']
+        read_your_writes.mark(user_id, seconds)
+        g.read_your_writes = (user_id, seconds)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _clear_dirty(session):
+    session.info.pop('wrote', None)
+
+
+def routing_stats() -> Dict[str, Any]:
+    """
+    Requisições roteadas para cada engine
+    
+    Returns:
+        Dict[str, Any]: Contadores por destino
+    """
+    with _route_lock:
+        return dict(_route_counts)
@@ -1,9 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from src.models.routing import RoutingSession
 from datetime import datetime
-import bcrypt
 import enum
 
-db = SQLAlchemy()
+# Leituras de requisições GET vão para a réplica quando configurada (ver routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class UserRole(enum.Enum):
     PATIENT = "patient"
@@ -12,6 +13,14 @@ class UserRole(enum.Enum):
 
 class User(db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Active-account joins (list_patients, export, counts) read only this index
+        db.Index(
+            'ix_users_active_id', 'id',
+            sqlite_where=db.text('is_active = 1'),
+            postgresql_where=db.text('is_active')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(255), unique=True, nullable=False)
@@ -38,6 +47,7 @@ class User(db.Model):
             
         Raises:
             ValueError: If password doesn't meet requirements
+            ServiceUnavailableError: If the hashing pool is saturated
         """
         if not password or not isinstance(password, str):
             raise ValueError("Password is required and must be a string")
@@ -48,9 +58,10 @@ class User(db.Model):
         if len(password) > 128:
             raise ValueError("Password cannot exceed 128 characters")
         
-        # Generate salt and hash password
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        # Generate salt and hash password in the dedicated hashing pool
+        # (imported here: src.utils depends on this module)
+        from src.utils.hashing import password_hasher
+        self.password_hash = password_hasher.hash_password(password)
 
     def check_password(self, password: str) -> bool:
         """
@@ -61,6 +72,9 @@ class User(db.Model):
             
         Returns:
             bool: True if password matches, False otherwise
+            
+        Raises:
+            ServiceUnavailableError: If the hashing pool is saturated
         """
         if not password or not isinstance(password, str):
             return False
@@ -68,12 +82,15 @@ class User(db.Model):
         if not self.password_hash:
             return False
         
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
-        except (ValueError, TypeError):
-            # Handle any bcrypt errors gracefully
-            return False
+        # Verify in the dedicated hashing pool (bcrypt errors yield False)
+        from src.utils.hashing import password_hasher
+        return password_hasher.check_password(password, self.password_hash)
 
+    def needs_rehash(self) -> bool:
+        """Check if password hash was generated with a different bcrypt cost than configured"""
+        from src.utils.hashing import password_hasher
+        return password_hasher.needs_rehash(self.password_hash)
+    
     def is_patient(self) -> bool:
         """Check if user is a patient"""
         return self.role == UserRole.PATIENT
@@ -0,0 +1,49 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from src.models.routing import routing_stats
+from src.utils import (
+    identity_cache,
+    password_hasher,
+    audit_writer,
+    response_compressor,
+    request_profiler,
+    metrics_registry,
+    revocation_list,
+    require_role,
+    create_response
+)
+from src.utils.static_assets import static_manifest
+from src.utils.replication import replicator
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/admin/stats', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def get_runtime_stats():
+    """State of this worker's caches, pools and background writers (admin only)"""
+    return create_response(data={
+        'identity_cache': identity_cache.stats(),
+        'password_hasher': password_hasher.stats(),
+        'audit_writer': audit_writer.stats(),
+        'compression': response_compressor.stats(),
+        'static_assets': static_manifest.stats(),
+        'db_routing': routing_stats(),
+        'replicator': replicator.stats(),
+        'profiling': request_profiler.stats(),
+        'metrics': metrics_registry.stats(),
+        'revocation': revocation_list.stats()
+    })
+
+
+@admin_bp.route('/admin/profiles', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def list_request_profiles():
+    """Dump the sampled request profiles, newest first (admin only)"""
+    limit = request.args.get('limit', 100, type=int)
+    return create_response(data={
+        'profiling': request_profiler.stats(),
+        'profiles': request_profiler.samples(max(limit, 0))
+    })
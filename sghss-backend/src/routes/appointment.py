@@ -0,0 +1,341 @@
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
+from src.models.user import db, UserRole
+from src.models.patient import Patient
+from src.models.professional import Professional
+from src.models.appointment import Appointment, AppointmentType, AppointmentStatus
+from src.constants import APPOINTMENTS, VALID_APPOINTMENT_TYPES
+from src.utils import (
+    validate_appointment_datetime,
+    validate_required_fields,
+    sanitize_string,
+    create_response,
+    get_current_user,
+    require_role,
+    log_user_action,
+    ValidationError,
+    AuthenticationError,
+    AuthorizationError,
+    NotFoundError,
+    ConflictError,
+    BusinessLogicError
+)
+from src.utils.scheduling import clinic_now, get_compiled_schedule, free_slots
+from datetime import date, datetime, timedelta
+import logging
+
+appointment_bp = Blueprint('appointment', __name__)
+logger = logging.getLogger('sghss')
+
+def _parse_appointment_date(value):
+    """Validate appointment start against the configured slot grid"""
+    is_valid, appointment_date, error_msg = validate_appointment_datetime(
+        value,
+        slot_minutes=APPOINTMENTS['slot_minutes'],
+        max_days_ahead=APPOINTMENTS['max_days_ahead']
+    )
+    if not is_valid:
+        raise ValidationError(error_msg)
+    return appointment_date
+
+
+def _find_conflict(professional_id: int, patient_id: int, start, exclude_id: int = None):
+    """
+    Check for overlapping active appointments of the professional or patient
+    
+    Each check is a range query on the (professional_id, appointment_date)
+    or (patient_id, appointment_date) index, touching only the rows inside
+    one slot around ``start``.
+    
+    Returns:
+        str: 'professional' or 'patient' when a conflict exists, otherwise None
+    """
+    slot = timedelta(minutes=APPOINTMENTS['slot_minutes'])
+    
+    for owner, column, value in (
+        ('professional', Appointment.professional_id, professional_id),
+        ('patient', Appointment.patient_id, patient_id)
+    ):
+        query = db.session.query(Appointment.id).filter(
+            column == value,
+            Appointment.appointment_date > start - slot,
+            Appointment.appointment_date < start + slot,
+            Appointment.status != AppointmentStatus.CANCELADA
+        )
+        if exclude_id is not None:
+            query = query.filter(Appointment.id != exclude_id)
+        if query.first() is not None:
+            return owner
+    
+    return None
+
+
+def _raise_conflict(owner: str):
+    if owner == 'professional':
+        raise ConflictError("Professional already has an appointment at this time")
+    raise ConflictError("Patient already has an appointment at this time")
+
+
+def _get_appointment_for_user(appointment_id: int, user):
+    """Load an appointment the current user is allowed to modify"""
+    appointment = Appointment.query.get(appointment_id)
+    if not appointment:
+        raise NotFoundError("Appointment not found")
+    
+    if user.role == UserRole.PATIENT:
+        if not user.patient or appointment.patient_id != user.patient.id:
+            raise AuthorizationError("Access denied")
+    elif user.role == UserRole.PROFESSIONAL:
+        if not user.professional or appointment.professional_id != user.professional.id:
+            raise AuthorizationError("Access denied")
+    
+    return appointment
+
+
+@appointment_bp.route('/appointments', methods=['POST'])
+@jwt_required()
+@require_role('patient', 'admin')
+def create_appointment():
+    """Book an appointment, rejecting professional or patient double bookings"""
+    try:
+        user = get_current_user()
+        
+        data = request.get_json()
+        if not data:
+            raise ValidationError("Request body is required")
+        
+        is_valid, error_msg = validate_required_fields(data, ['professional_id', 'appointment_date', 'appointment_type'])
+        if not is_valid:
+            raise ValidationError(error_msg)
+        
+        # Patients book for themselves; admins must name the patient
+        if user.role == UserRole.PATIENT:
+            if not user.patient:
+                raise BusinessLogicError("Patient profile required to book appointments")
+            patient_id = user.patient.id
+        else:
+            if not data.get('patient_id'):
+                raise ValidationError("Missing required fields: patient_id")
+            patient = Patient.query.get(data['patient_id'])
+            if not patient:
+                raise NotFoundError("Patient not found")
+            patient_id = patient.id
+        
+        appointment_type = str(data['appointment_type']).lower()
+        if appointment_type not in VALID_APPOINTMENT_TYPES:
+            raise ValidationError("Invalid appointment type. Must be presencial or telemedicina")
+        
+        appointment_date = _parse_appointment_date(data['appointment_date'])
+        
+        professional = Professional.query.get(data['professional_id'])
+        if not professional:
+            raise NotFoundError("Professional not found")
+        if not professional.is_available:
+            raise BusinessLogicError("Professional is not available for appointments")
+        
+        conflict = _find_conflict(professional.id, patient_id, appointment_date)
+        if conflict:
+            _raise_conflict(conflict)
+        
+        appointment = Appointment(
+            patient_id=patient_id,
+            professional_id=professional.id,
+            appointment_date=appointment_date,
+            appointment_type=AppointmentType(appointment_type),
+            notes=sanitize_string(data.get('notes'), max_length=1000) if data.get('notes') else None
+        )
+        db.session.add(appointment)
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request booked the same slot between the check and the commit
+            db.session.rollback()
+            raise ConflictError("Time slot already booked")
+        
+        log_user_action(user.id, "APPOINTMENT_CREATED", f"Appointment {appointment.id} booked",
+                        record_id=appointment.id)
+        
+        return create_response(
+            message="Appointment booked successfully",
+            data={'appointment': appointment.to_dict()},
+            status_code=201
+        )
+    
+    except (ValidationError, ConflictError, NotFoundError, BusinessLogicError, AuthenticationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Create appointment error: {str(e)}")
+        db.session.rollback()
+        return create_response(error="Failed to book appointment", status_code=500)
+
+
+@appointment_bp.route('/appointments/<int:appointment_id>', methods=['PUT'])
+@jwt_required()
+@require_role('patient', 'professional', 'admin')
+def reschedule_appointment(appointment_id):
+    """Move an appointment to a new slot, rejecting double bookings"""
+    try:
+        user = get_current_user()
+        appointment = _get_appointment_for_user(appointment_id, user)
+        
+        if appointment.status != AppointmentStatus.AGENDADA:
+            raise BusinessLogicError("Only scheduled appointments can be rescheduled")
+        
+        data = request.get_json()
+        if not data:
+            raise ValidationError("Request body is required")
+        
+        is_valid, error_msg = validate_required_fields(data, ['appointment_date'])
+        if not is_valid:
+            raise ValidationError(error_msg)
+        
+        appointment_date = _parse_appointment_date(data['appointment_date'])
+        
+        conflict = _find_conflict(
+            appointment.professional_id, appointment.patient_id, appointment_date, exclude_id=appointment.id
+        )
+        if conflict:
+            _raise_conflict(conflict)
+        
+        appointment.appointment_date = appointment_date
+        if 'notes' in data:
+            appointment.notes = sanitize_string(data['notes'], max_length=1000) if data['notes'] else None
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise ConflictError("Time slot already booked")
+        
+        log_user_action(user.id, "APPOINTMENT_UPDATED", f"Appointment {appointment.id} rescheduled",
+                        record_id=appointment.id)
+        
+        return create_response(
+            message="Appointment rescheduled successfully",
+            data={'appointment': appointment.to_dict()}
+        )
+    
+    except (ValidationError, ConflictError, NotFoundError, BusinessLogicError,
+            AuthenticationError, AuthorizationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Reschedule appointment error: {str(e)}")
+        db.session.rollback()
+        return create_response(error="Failed to reschedule appointment", status_code=500)
+
+
+@appointment_bp.route('/appointments/<int:appointment_id>/cancel', methods=['POST'])
+@jwt_required()
+@require_role('patient', 'professional', 'admin')
+def cancel_appointment(appointment_id):
+    """Cancel an appointment, releasing its slot"""
+    try:
+        user = get_current_user()
+        appointment = _get_appointment_for_user(appointment_id, user)
+        
+        if appointment.status != AppointmentStatus.AGENDADA:
+            raise BusinessLogicError("Only scheduled appointments can be cancelled")
+        
+        appointment.status = AppointmentStatus.CANCELADA
+        db.session.commit()
+        
+        log_user_action(user.id, "APPOINTMENT_CANCELLED", f"Appointment {appointment.id} cancelled",
+                        record_id=appointment.id)
+        
+        return create_response(
+            message="Appointment cancelled successfully",
+            data={'appointment': appointment.to_dict()}
+        )
+    
+    except (NotFoundError, BusinessLogicError, AuthenticationError, AuthorizationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Cancel appointment error: {str(e)}")
+        db.session.rollback()
+        return create_response(error="Failed to cancel appointment", status_code=500)
+
+
+def _parse_search_day(value: str, field: str) -> date:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValidationError(f"Invalid {field} format. Use YYYY-MM-DD")
+
+
+@appointment_bp.route('/availability', methods=['GET'])
+@jwt_required()
+def get_availability():
+    """List free appointment slots for a professional or a whole specialty"""
+    try:
+        get_current_user()
+        
+        professional_id = request.args.get('professional_id', type=int)
+        specialty = sanitize_string(request.args.get('specialty', ''))
+        if not professional_id and not specialty:
+            raise ValidationError("professional_id or specialty is required")
+        
+        # Clinic-local clock, the same one appointment dates are validated against
+        now = clinic_now()
+        today = now.date()
+        start_day = _parse_search_day(request.args['start'], 'start') if request.args.get('start') else today
+        end_day = (_parse_search_day(request.args['end'], 'end') if request.args.get('end')
+                   else start_day + timedelta(days=APPOINTMENTS['default_search_days'] - 1))
+        if end_day < start_day:
+            raise ValidationError("end must not be before start")
+        if (end_day - start_day).days + 1 > APPOINTMENTS['max_search_days']:
+            raise ValidationError(f"Search range cannot exceed {APPOINTMENTS['max_search_days']} days")
+        
+        slot_minutes = APPOINTMENTS['slot_minutes']
+        
+        # One query for the professionals...
+        professionals_query = db.session.query(
+            Professional.id, Professional.full_name, Professional.specialty,
+            Professional.work_schedule, Professional.updated_at
+        ).filter(Professional.is_available == True)
+        if professional_id:
+            professionals_query = professionals_query.filter(Professional.id == professional_id)
+        if specialty:
+            professionals_query = professionals_query.filter(Professional.specialty == specialty)
+        professionals = professionals_query.order_by(Professional.id).all()
+        
+        if professional_id and not professionals:
+            raise NotFoundError("Professional not found")
+        
+        # ...and one for all their booked slots in the range, already sorted for the merge
+        range_start = datetime(start_day.year, start_day.month, start_day.day) - timedelta(minutes=slot_minutes)
+        range_end = datetime(end_day.year, end_day.month, end_day.day) + timedelta(days=1)
+        booked = {}
+        if professionals:
+            appointments = db.session.query(Appointment.professional_id, Appointment.appointment_date).filter(
+                Appointment.professional_id.in_(professionals_query.with_entities(Professional.id).subquery().select()),
+                Appointment.appointment_date > range_start,
+                Appointment.appointment_date < range_end,
+                Appointment.status != AppointmentStatus.CANCELADA
+            ).order_by(Appointment.professional_id, Appointment.appointment_date)
+            for owner_id, appointment_date in appointments:
+                booked.setdefault(owner_id, []).append(appointment_date)
+        
+        results = []
+        for pro_id, full_name, pro_specialty, work_schedule, updated_at in professionals:
+            compiled = get_compiled_schedule(pro_id, updated_at, work_schedule, slot_minutes)
+            results.append({
+                'professional_id': pro_id,
+                'full_name': full_name,
+                'specialty': pro_specialty,
+                'slots': free_slots(compiled, booked.get(pro_id, []), start_day, end_day, slot_minutes, not_before=now)
+            })
+        
+        return create_response(data={
+            'start': start_day.isoformat(),
+            'end': end_day.isoformat(),
+            'slot_minutes': slot_minutes,
+            'professionals': results
+        })
+        
+    except (ValidationError, NotFoundError, AuthenticationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Availability search error: {str(e)}")
+        return create_response(error="Failed to search availability", status_code=500)
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, create_refresh_token
+from flask_jwt_extended import (create_access_token, jwt_required, get_jwt_identity, create_refresh_token,
+                                get_jwt, decode_token)
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import ExpiredSignatureError, PyJWTError
 from src.models.user import db, User, UserRole
 from src.models.patient import Patient
 from src.models.professional import Professional
@@ -12,12 +15,17 @@ from src.utils import (
     create_response,
     get_current_user,
     log_user_action,
+    revocation_list,
+    compute_etag,
+    etag_headers,
+    not_modified,
     ValidationError,
     AuthenticationError,
     AuthorizationError,
     NotFoundError,
     ConflictError,
-    DatabaseError
+    DatabaseError,
+    ServiceUnavailableError
 )
 from datetime import timedelta
 import logging
@@ -81,6 +89,10 @@ def register():
         
     except (ValidationError, ConflictError) as e:
         return create_response(error=e.message, status_code=e.status_code)
+    except ServiceUnavailableError as e:
+        db.session.rollback()
+        return create_response(error=e.message, status_code=e.status_code,
+                               headers={'Retry-After': str(e.retry_after)})
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         db.session.rollback()
@@ -119,6 +131,15 @@ def login():
             log_user_action(user.id, "LOGIN_BLOCKED", "Login attempt on deactivated account")
             raise AuthenticationError("Account is deactivated")
         
+        # Upgrade/downgrade hash cost transparently after a successful check
+        if user.needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Password rehash skipped for user {user.id}: {str(e)}")
+        
         # Create tokens
         access_token = create_access_token(
             identity=str(user.id),
@@ -143,6 +164,9 @@ def login():
         
     except (ValidationError, AuthenticationError) as e:
         return create_response(error=e.message, status_code=e.status_code)
+    except ServiceUnavailableError as e:
+        return create_response(error=e.message, status_code=e.status_code,
+                               headers={'Retry-After': str(e.retry_after)})
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         return create_response(error="Login failed", status_code=500)
@@ -189,16 +213,29 @@ def get_current_user_info():
     try:
         user = get_current_user()
         
+        profile = None
+        age = None
+        if user.role == UserRole.PATIENT:
+            profile = user.patient
+            age = profile.get_age() if profile else None
+        elif user.role == UserRole.PROFESSIONAL:
+            profile = user.professional
+        
+        # Conditional GET: 304 before building the payload
+        etag = compute_etag(user, profile, extra=(age,))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         user_data = user.to_dict()
         
         # Add profile data based on role
-        if user.role == UserRole.PATIENT and user.patient:
-            user_data['profile'] = user.patient.to_dict()
-            user_data['profile']['age'] = user.patient.get_age()
-        elif user.role == UserRole.PROFESSIONAL and user.professional:
-            user_data['profile'] = user.professional.to_dict()
+        if profile is not None:
+            user_data['profile'] = profile.to_dict()
+            if user.role == UserRole.PATIENT:
+                user_data['profile']['age'] = age
         
-        return create_response(data={'user': user_data})
+        return create_response(data={'user': user_data}, headers=etag_headers(etag))
         
     except (AuthenticationError, NotFoundError) as e:
         return create_response(error=e.message, status_code=e.status_code)
@@ -210,14 +247,38 @@ def get_current_user_info():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    """Logout user with audit logging"""
+    """Logout user: revoke the access token (and the refresh token, if sent) with audit logging"""
     try:
-        user = get_current_user()
-        log_user_action(user.id, "LOGOUT", "User logged out")
+        claims = get_jwt()
+        user_id = int(claims['sub'])
+        
+        # Optional {"refresh_token": "..."}: must belong to the same user
+        refresh_claims = None
+        data = request.get_json(silent=True) or {}
+        if data.get('refresh_token'):
+            try:
+                refresh_claims = decode_token(data['refresh_token'])
+            except ExpiredSignatureError:
+                refresh_claims = None  # Already unusable
+            except (PyJWTError, JWTExtendedException):
+                raise ValidationError("Invalid refresh token")
+            if refresh_claims is not None and (refresh_claims.get('type') != 'refresh'
+                                               or refresh_claims.get('sub') != claims['sub']):
+                raise ValidationError("Invalid refresh token")
+        
+        revocation_list.revoke(db.session, claims['jti'], claims['type'], claims['exp'], user_id)
+        if refresh_claims is not None:
+            revocation_list.revoke(db.session, refresh_claims['jti'], 'refresh', refresh_claims['exp'], user_id)
+        
+        log_user_action(user_id, "LOGOUT", "User logged out")
         
         return create_response(message="Logout successful")
         
+    except ValidationError as e:
+        return create_response(error=e.message, status_code=e.status_code)
     except Exception as e:
+        # Tokens would remain valid: report the failure instead of a false success
+        db.session.rollback()
         logger.error(f"Logout error: {str(e)}")
-        return create_response(message="Logout successful")  # Always return success for logout
+        return create_response(error="Logout failed", status_code=500)
 
@@ -1,8 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import contains_eager
 from src.models.user import db, User, UserRole
 from src.models.patient import Patient
+from src.models.appointment import Appointment
 from src.utils import (
+    validate_email,
     validate_cpf,
     validate_phone,
     validate_birth_date,
@@ -11,22 +14,142 @@ from src.utils import (
     create_response,
     get_current_user,
     require_role,
+    paginate_query,
     log_user_action,
     format_cpf,
     format_phone,
     calculate_age,
+    compute_etag,
+    etag_headers,
+    not_modified,
+    require_if_match,
     ValidationError,
     AuthenticationError,
     AuthorizationError,
     NotFoundError,
     ConflictError,
-    BusinessLogicError
+    BusinessLogicError,
+    PreconditionFailedError
 )
+from src.constants import BULK_IMPORT, EXPORT, SEARCH, PAGINATION
+from src.utils.search import search_patient_ids
+from src.utils.timeline import timeline_page
+from datetime import datetime, timedelta
+import csv
+import io
+import json
 import logging
+import time
 
 patient_bp = Blueprint('patient', __name__)
 logger = logging.getLogger('sghss')
 
+def _parse_patient_data(data: dict) -> dict:
+    """
+    Validate and sanitize patient fields from a request payload
+    
+    Args:
+        data (dict): Raw patient data
+        
+    Returns:
+        dict: Patient column values (CPF without formatting)
+        
+    Raises:
+        ValidationError: If any field is invalid
+    """
+    # Validate required fields
+    is_valid, error_msg = validate_required_fields(data, ['full_name', 'cpf', 'birth_date'])
+    if not is_valid:
+        raise ValidationError(error_msg)
+    
+    # Validate and sanitize data
+    full_name = sanitize_string(data['full_name'], max_length=255)
+    if not full_name:
+        raise ValidationError("Full name cannot be empty")
+    
+    # Validate CPF
+    cpf = data['cpf']
+    if not validate_cpf(cpf):
+        raise ValidationError("Invalid CPF format")
+    
+    # Validate birth date
+    is_valid, birth_date, error_msg = validate_birth_date(data['birth_date'])
+    if not is_valid:
+        raise ValidationError(error_msg)
+    
+    # Validate optional fields
+    phone = data.get('phone')
+    if phone and not validate_phone(phone):
+        raise ValidationError("Invalid phone format")
+    
+    # Same rule as update_my_patient_profile (the CSV export joins these lists with ';')
+    allergies = data.get('allergies') or []
+    if not isinstance(allergies, list):
+        raise ValidationError("Allergies must be a list")
+    
+    medications = data.get('current_medications') or []
+    if not isinstance(medications, list):
+        raise ValidationError("Current medications must be a list")
+    
+    return {
+        'full_name': full_name,
+        # Remove formatting from CPF for storage
+        'cpf': ''.join(filter(str.isdigit, cpf)),
+        'birth_date': birth_date,
+        'phone': sanitize_string(phone) if phone else None,
+        'address': sanitize_string(data.get('address'), max_length=500) if data.get('address') else None,
+        'allergies': allergies,
+        'current_medications': medications,
+        'medical_history': sanitize_string(data.get('medical_history'), max_length=2000) if data.get('medical_history') else None
+    }
+
+
+def _format_patient(patient: Patient) -> dict:
+    """Serialize a patient with display formatting for CPF, phone and age"""
+    patient_data = patient.to_dict()
+    patient_data['cpf'] = format_cpf(patient.cpf)
+    patient_data['phone'] = format_phone(patient.phone) if patient.phone else None
+    patient_data['age'] = calculate_age(patient.birth_date)
+    return patient_data
+
+
+def _patient_etag(patient: Patient) -> str:
+    """ETag of the patient profile representation (age changes without a row update)"""
+    return compute_etag(patient, extra=(calculate_age(patient.birth_date),))
+
+
+def _update_if_version(patient: Patient, version: datetime) -> None:
+    """
+    Write the patient's pending changes only if the row is still at ``version``
+    
+    One UPDATE ... WHERE updated_at = :version; if a concurrent request committed
+    first no row matches and the change is discarded.
+    
+    Raises:
+        PreconditionFailedError: If the row is no longer at ``version``
+    """
+    state = db.inspect(patient)
+    values = {attr.key: state.attrs[attr.key].value for attr in state.mapper.column_attrs
+              if state.attrs[attr.key].history.has_changes()}
+    # Strictly increasing, so the new ETag differs even within the same microsecond
+    values['updated_at'] = max(datetime.utcnow(), version + timedelta(microseconds=1))
+    
+    # No autoflush: it would write the changes with a plain UPDATE ... WHERE id
+    with db.session.no_autoflush:
+        result = db.session.execute(
+            db.update(Patient)
+            .where(Patient.id == patient.id, Patient.updated_at == version)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    if result.rowcount != 1:
+        db.session.rollback()
+        raise PreconditionFailedError("Resource was modified by another request")
+    
+    # Already written: drop the pending changes; attributes reload after commit
+    db.session.expire(patient)
+
+
 @patient_bp.route('/patients', methods=['POST'])
 @jwt_required()
 @require_role('patient')
@@ -43,56 +166,22 @@ def create_patient():
         if not data:
             raise ValidationError("Request body is required")
         
-        # Validate required fields
-        is_valid, error_msg = validate_required_fields(data, ['full_name', 'cpf', 'birth_date'])
-        if not is_valid:
-            raise ValidationError(error_msg)
-        
-        # Validate and sanitize data
-        full_name = sanitize_string(data['full_name'], max_length=255)
-        if not full_name:
-            raise ValidationError("Full name cannot be empty")
-        
-        # Validate CPF
-        cpf = data['cpf']
-        if not validate_cpf(cpf):
-            raise ValidationError("Invalid CPF format")
-        
-        # Remove formatting from CPF for storage
-        clean_cpf = ''.join(filter(str.isdigit, cpf))
+        fields = _parse_patient_data(data)
+        full_name = fields['full_name']
         
         # Check if CPF is already registered
-        existing_patient = Patient.query.filter_by(cpf=clean_cpf).first()
+        existing_patient = Patient.query.filter_by(cpf=fields['cpf']).first()
         if existing_patient:
             raise ConflictError("CPF already registered")
         
-        # Validate birth date
-        is_valid, birth_date, error_msg = validate_birth_date(data['birth_date'])
-        if not is_valid:
-            raise ValidationError(error_msg)
-        
-        # Validate optional fields
-        phone = data.get('phone')
-        if phone and not validate_phone(phone):
-            raise ValidationError("Invalid phone format")
-        
         # Create patient
-        patient = Patient(
-            user_id=user.id,
-            full_name=full_name,
-            cpf=clean_cpf,
-            birth_date=birth_date,
-            phone=sanitize_string(phone) if phone else None,
-            address=sanitize_string(data.get('address'), max_length=500) if data.get('address') else None,
-            allergies=data.get('allergies', []),
-            current_medications=data.get('current_medications', []),
-            medical_history=sanitize_string(data.get('medical_history'), max_length=2000) if data.get('medical_history') else None
-        )
+        patient = Patient(user_id=user.id, **fields)
         
         db.session.add(patient)
         db.session.commit()
         
-        log_user_action(user.id, "PATIENT_PROFILE_CREATED", f"Patient profile created for {full_name}")
+        log_user_action(user.id, "PATIENT_PROFILE_CREATED", f"Patient profile created for {full_name}",
+                        record_id=patient.id)
         
         # Prepare response with formatted data
         patient_data = patient.to_dict()
@@ -124,13 +213,13 @@ def get_my_patient_profile():
         if not user.patient:
             raise NotFoundError("Patient profile not found")
         
-        # Prepare response with formatted data
-        patient_data = user.patient.to_dict()
-        patient_data['cpf'] = format_cpf(user.patient.cpf)
-        patient_data['phone'] = format_phone(user.patient.phone) if user.patient.phone else None
-        patient_data['age'] = calculate_age(user.patient.birth_date)
+        # Conditional GET: 304 before building the payload
+        etag = _patient_etag(user.patient)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        return create_response(data={'patient': patient_data})
+        return create_response(data={'patient': _format_patient(user.patient)}, headers=etag_headers(etag))
         
     except (AuthenticationError, NotFoundError) as e:
         return create_response(error=e.message, status_code=e.status_code)
@@ -156,6 +245,12 @@ def update_my_patient_profile():
         
         patient = user.patient
         
+        # Optimistic concurrency: If-Match must match the current version, and the UPDATE
+        # is conditioned on that version so a concurrent write fails with 412.
+        # Without If-Match the update is last-write-wins
+        require_if_match(_patient_etag(patient))
+        version = patient.updated_at if request.if_match and not request.if_match.star_tag else None
+        
         # Update allowed fields with validation
         if 'full_name' in data:
             full_name = sanitize_string(data['full_name'], max_length=255)
@@ -196,22 +291,19 @@ def update_my_patient_profile():
                 raise ValidationError(error_msg)
             patient.birth_date = birth_date
         
+        if version is not None:
+            _update_if_version(patient, version)
         db.session.commit()
         
-        log_user_action(user.id, "PATIENT_PROFILE_UPDATED", "Patient profile updated")
-        
-        # Prepare response with formatted data
-        patient_data = patient.to_dict()
-        patient_data['cpf'] = format_cpf(patient.cpf)
-        patient_data['phone'] = format_phone(patient.phone) if patient.phone else None
-        patient_data['age'] = calculate_age(patient.birth_date)
+        log_user_action(user.id, "PATIENT_PROFILE_UPDATED", "Patient profile updated", record_id=patient.id)
         
         return create_response(
             message="Patient profile updated successfully",
-            data={'patient': patient_data}
+            data={'patient': _format_patient(patient)},
+            headers=etag_headers(_patient_etag(patient))
         )
         
-    except (ValidationError, AuthenticationError, NotFoundError) as e:
+    except (ValidationError, AuthenticationError, NotFoundError, PreconditionFailedError) as e:
         return create_response(error=e.message, status_code=e.status_code)
     except Exception as e:
         logger.error(f"Update patient profile error: {str(e)}")
@@ -227,12 +319,48 @@ def list_patients():
         # Query parameters for pagination
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor = request.args.get('cursor')
         
         # Limit per_page to prevent abuse
         per_page = min(per_page, 100)
         
+        # The join that filters active users also fills Patient.user: no per-row SELECT for the email
+        patients_query = Patient.query.join(User).filter(User.is_active == True).options(contains_eager(Patient.user))
+        
+        def format_patient(patient):
+            patient_data = _format_patient(patient)
+            # Include user email for admin view
+            patient_data['email'] = patient.user.email
+            return patient_data
+        
+        # Cursor (keyset) mode: no OFFSET scan, total only on request
+        if cursor is not None:
+            include_total = request.args.get('include_total', 'false').lower() in ('1', 'true', 'yes')
+            result = paginate_query(
+                patients_query,
+                per_page=per_page,
+                cursor=cursor,
+                order_by=(Patient.created_at, Patient.id),
+                include_total=include_total,
+                serializer=format_patient
+            )
+            
+            pagination = {
+                'per_page': result['per_page'],
+                'has_next': result['has_next'],
+                'next_cursor': result['next_cursor']
+            }
+            if include_total:
+                pagination['total'] = result['total']
+            
+            return create_response(
+                data={
+                    'patients': result['items'],
+                    'pagination': pagination
+                }
+            )
+        
         # Get patients with pagination
-        patients_query = Patient.query.join(User).filter(User.is_active == True)
         patients_paginated = patients_query.paginate(
             page=page, 
             per_page=per_page, 
@@ -240,15 +368,7 @@ def list_patients():
         )
         
         # Format patient data
-        patients_data = []
-        for patient in patients_paginated.items:
-            patient_data = patient.to_dict()
-            patient_data['cpf'] = format_cpf(patient.cpf)
-            patient_data['phone'] = format_phone(patient.phone) if patient.phone else None
-            patient_data['age'] = calculate_age(patient.birth_date)
-            # Include user email for admin view
-            patient_data['email'] = patient.user.email
-            patients_data.append(patient_data)
+        patients_data = [format_patient(patient) for patient in patients_paginated.items]
         
         return create_response(
             data={
@@ -264,8 +384,398 @@ def list_patients():
             }
         )
         
-    except (AuthenticationError, AuthorizationError) as e:
+    except (ValidationError, AuthenticationError, AuthorizationError) as e:
         return create_response(error=e.message, status_code=e.status_code)
     except Exception as e:
         logger.error(f"List patients error: {str(e)}")
         return create_response(error="Failed to list patients", status_code=500)
+
+@patient_bp.route('/patients/search', methods=['GET'])
+@jwt_required()
+@require_role('admin', 'professional')
+def search_patients():
+    """Search active patients by name prefix, CPF or phone digits, most relevant first"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValidationError("Query parameter q is required")
+        
+        limit = request.args.get('limit', SEARCH['default_limit'], type=int)
+        limit = max(1, min(limit, SEARCH['max_limit']))
+        
+        patient_ids = search_patient_ids(db.session, query, limit=limit,
+                                         min_token_length=SEARCH['min_token_length'])
+        
+        # One query for the matched rows, returned in ranking order
+        patients = {p.id: p for p in Patient.query.filter(Patient.id.in_(patient_ids))} if patient_ids else {}
+        results = []
+        for patient_id in patient_ids:
+            patient = patients.get(patient_id)
+            if patient:
+                results.append({
+                    'id': patient.id,
+                    'full_name': patient.full_name,
+                    'cpf': format_cpf(patient.cpf),
+                    'phone': format_phone(patient.phone) if patient.phone else None,
+                    'birth_date': patient.birth_date.isoformat(),
+                    'age': calculate_age(patient.birth_date)
+                })
+        
+        return create_response(data={'patients': results, 'count': len(results)})
+    
+    except (ValidationError, AuthenticationError, AuthorizationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Search patients error: {str(e)}")
+        return create_response(error="Failed to search patients", status_code=500)
+
+@patient_bp.route('/patients/me/timeline', methods=['GET'], defaults={'patient_id': None})
+@patient_bp.route('/patients/<int:patient_id>/timeline', methods=['GET'])
+@jwt_required()
+@require_role('patient', 'professional', 'admin')
+def get_patient_timeline(patient_id):
+    """Clinical timeline (appointments, medical records, prescriptions) with a fixed query count"""
+    try:
+        user = get_current_user()
+        
+        if user.role == UserRole.PATIENT:
+            if not user.patient:
+                raise NotFoundError("Patient profile not found")
+            if patient_id is not None and patient_id != user.patient.id:
+                raise AuthorizationError("Access denied")
+            patient_id = user.patient.id
+        else:
+            if patient_id is None:
+                raise NotFoundError("Patient profile not found")
+            if not db.session.query(Patient.query.filter(Patient.id == patient_id).exists()).scalar():
+                raise NotFoundError("Patient not found")
+            # Professionals only see patients they have attended
+            if user.role == UserRole.PROFESSIONAL:
+                attended = user.professional is not None and db.session.query(
+                    Appointment.query.filter(
+                        Appointment.patient_id == patient_id,
+                        Appointment.professional_id == user.professional.id
+                    ).exists()
+                ).scalar()
+                if not attended:
+                    raise AuthorizationError("Access denied")
+        
+        per_page = request.args.get('per_page', PAGINATION['default_per_page'], type=int)
+        per_page = max(PAGINATION['min_per_page'], min(per_page, PAGINATION['max_per_page']))
+        order = request.args.get('order', 'desc').lower()
+        if order not in ('asc', 'desc'):
+            raise ValidationError("order must be asc or desc")
+        
+        result = timeline_page(db.session, patient_id, per_page,
+                               cursor=request.args.get('cursor'), ascending=order == 'asc')
+        
+        return create_response(
+            data={
+                'patient_id': patient_id,
+                'events': result['items'],
+                'pagination': {
+                    'per_page': result['per_page'],
+                    'has_next': result['has_next'],
+                    'next_cursor': result['next_cursor']
+                }
+            }
+        )
+    
+    except (ValidationError, AuthenticationError, AuthorizationError, NotFoundError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Patient timeline error: {str(e)}")
+        return create_response(error="Failed to load patient timeline", status_code=500)
+
+IMPORT_MIMETYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv'
+}
+
+# Marker for accounts created by bulk import: no password can match it
+UNUSABLE_PASSWORD = '!'
+
+def _iter_import_rows(stream, fmt: str):
+    """
+    Yield (row_number, data, error) tuples from an NDJSON or CSV stream
+    
+    Args:
+        stream: Binary request stream
+        fmt (str): 'ndjson' or 'csv'
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Lists are semicolon separated in CSV
+            for field in ('allergies', 'current_medications'):
+                value = row.get(field)
+                row[field] = [item.strip() for item in value.split(';') if item.strip()] if value else []
+            yield reader.line_num, row, None
+        return
+    
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Row must be a JSON object"
+            continue
+        yield line_number, data, None
+
+
+def _import_patient_chunk(rows: list) -> tuple:
+    """
+    Validate and insert one chunk of import rows with set-based conflict checks
+    
+    Args:
+        rows (list): (row_number, data, error) tuples
+        
+    Returns:
+        tuple: (imported_count, [{'row': n, 'error': msg}, ...])
+    """
+    errors = []
+    candidates = []
+    chunk_cpfs = set()
+    chunk_emails = set()
+    
+    for row_number, data, error in rows:
+        if error:
+            errors.append({'row': row_number, 'error': error})
+            continue
+        try:
+            email = sanitize_string(str(data.get('email') or '').lower())
+            if not validate_email(email):
+                raise ValidationError("Invalid email format")
+            
+            fields = _parse_patient_data(data)
+            
+            if fields['cpf'] in chunk_cpfs:
+                raise ConflictError("Duplicate CPF in import")
+            if email in chunk_emails:
+                raise ConflictError("Duplicate email in import")
+        except (ValidationError, ConflictError) as e:
+            errors.append({'row': row_number, 'error': e.message})
+            continue
+        
+        chunk_cpfs.add(fields['cpf'])
+        chunk_emails.add(email)
+        candidates.append((row_number, email, fields))
+    
+    if not candidates:
+        return 0, errors
+    
+    # One query per chunk for CPF conflicts and one for existing accounts
+    existing_cpfs = {
+        cpf for (cpf,) in db.session.query(Patient.cpf).filter(Patient.cpf.in_(chunk_cpfs))
+    }
+    existing_users = {
+        email: (user_id, role, patient_id)
+        for email, user_id, role, patient_id in db.session.query(User.email, User.id, User.role, Patient.id)
+        .outerjoin(Patient, Patient.user_id == User.id)
+        .filter(User.email.in_(chunk_emails))
+    }
+    
+    accepted = []
+    for row_number, email, fields in candidates:
+        if fields['cpf'] in existing_cpfs:
+            errors.append({'row': row_number, 'error': "CPF already registered"})
+            continue
+        
+        existing = existing_users.get(email)
+        if existing:
+            user_id, role, patient_id = existing
+            if role != UserRole.PATIENT:
+                errors.append({'row': row_number, 'error': "Email belongs to a non-patient account"})
+                continue
+            if patient_id is not None:
+                errors.append({'row': row_number, 'error': "Patient profile already exists"})
+                continue
+        accepted.append((row_number, email, fields, existing[0] if existing else None))
+    
+    if not accepted:
+        return 0, errors
+    
+    try:
+        new_users = {
+            email: User(email=email, role=UserRole.PATIENT, password_hash=UNUSABLE_PASSWORD)
+            for _, email, _, user_id in accepted if user_id is None
+        }
+        db.session.add_all(new_users.values())
+        db.session.flush()
+        
+        db.session.add_all([
+            Patient(user_id=user_id if user_id is not None else new_users[email].id, **fields)
+            for _, email, fields, user_id in accepted
+        ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk import chunk error: {str(e)}")
+        errors.extend({'row': row_number, 'error': "Failed to import row"} for row_number, _, _, _ in accepted)
+        return 0, errors
+    finally:
+        # Keep the identity map from growing with the import
+        db.session.expunge_all()
+    
+    return len(accepted), errors
+
+
+@patient_bp.route('/patients/import', methods=['POST'])
+@jwt_required()
+@require_role('admin')
+def import_patients():
+    """Bulk import patients from a streamed NDJSON or CSV body (admin only)"""
+    try:
+        user = get_current_user()
+        admin_id = user.id
+        
+        fmt = IMPORT_MIMETYPES.get(request.mimetype)
+        if fmt is None:
+            raise ValidationError("Content-Type must be application/x-ndjson or text/csv")
+        
+        chunk_size = request.args.get('chunk_size', BULK_IMPORT['chunk_size'], type=int)
+        chunk_size = max(1, min(chunk_size, BULK_IMPORT['max_chunk_size']))
+        
+        imported = 0
+        failed = 0
+        errors = []
+        chunk = []
+        
+        def process(rows):
+            nonlocal imported, failed
+            chunk_imported, chunk_errors = _import_patient_chunk(rows)
+            imported += chunk_imported
+            failed += len(chunk_errors)
+            remaining = BULK_IMPORT['max_errors_reported'] - len(errors)
+            if remaining > 0:
+                errors.extend(chunk_errors[:remaining])
+        
+        # Body is read incrementally: only one chunk is held in memory
+        for row in _iter_import_rows(request.stream, fmt):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                process(chunk)
+                chunk = []
+        if chunk:
+            process(chunk)
+        
+        log_user_action(admin_id, "PATIENT_BULK_IMPORT", f"Imported {imported} patients, {failed} rows failed")
+        
+        return create_response(
+            message="Patient import finished",
+            data={
+                'imported': imported,
+                'failed': failed,
+                'errors': sorted(errors, key=lambda item: item['row']),
+                'errors_truncated': failed > len(errors)
+            },
+            status_code=201 if imported else 200
+        )
+        
+    except (ValidationError, AuthenticationError, AuthorizationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return create_response(error="Import body must be UTF-8 encoded", status_code=400)
+    except Exception as e:
+        logger.error(f"Import patients error: {str(e)}")
+        db.session.rollback()
+        return create_response(error="Failed to import patients", status_code=500)
+
+
+EXPORT_CSV_COLUMNS = [
+    'id', 'user_id', 'email', 'full_name', 'cpf', 'birth_date', 'age', 'phone', 'address',
+    'allergies', 'current_medications', 'medical_history', 'created_at', 'updated_at'
+]
+
+def _export_rows(fmt: str, batch_size: int):
+    """
+    Stream active patients as NDJSON or CSV text chunks
+    
+    Rows are fetched with ``yield_per`` so memory stays flat regardless
+    of table size; output is emitted once per batch.
+    
+    Args:
+        fmt (str): 'ndjson' or 'csv'
+        batch_size (int): Rows fetched and emitted per batch
+    """
+    started = time.perf_counter()
+    count = 0
+    buffer = io.StringIO()
+    writer = None
+    
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+    
+    rows = (
+        db.session.query(Patient, User.email)
+        .join(User, Patient.user_id == User.id)
+        .filter(User.is_active == True)
+        .order_by(Patient.id)
+        .yield_per(batch_size)
+    )
+    
+    try:
+        for patient, email in rows:
+            patient_data = _format_patient(patient)
+            patient_data['email'] = email
+            
+            if writer is not None:
+                patient_data['allergies'] = ';'.join(map(str, patient_data['allergies']))
+                patient_data['current_medications'] = ';'.join(map(str, patient_data['current_medications']))
+                writer.writerow(patient_data)
+            else:
+                buffer.write(json.dumps(patient_data))
+                buffer.write('\n')
+            
+            count += 1
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Patient export (%s): %d rows in %.2fs (%.0f rows/s)",
+            fmt, count, elapsed, count / elapsed if elapsed else 0,
+            extra={'export': {'format': fmt, 'rows': count, 'seconds': round(elapsed, 3)}}
+        )
+
+
+@patient_bp.route('/patients/export', methods=['GET'])
+@jwt_required()
+@require_role('admin')
+def export_patients():
+    """Stream every active patient as NDJSON or CSV (admin only)"""
+    try:
+        user = get_current_user()
+        
+        fmt = request.args.get('format', 'ndjson').lower()
+        if fmt not in EXPORT['mimetypes']:
+            raise ValidationError("Format must be ndjson or csv")
+        
+        log_user_action(user.id, "PATIENT_EXPORT", f"Patient export started ({fmt})")
+        
+        return Response(
+            stream_with_context(_export_rows(fmt, EXPORT['batch_size'])),
+            mimetype=EXPORT['mimetypes'][fmt],
+            headers={'Content-Disposition': f'attachment; filename=patients.{fmt}'}
+        )
+        
+    except (ValidationError, AuthenticationError, AuthorizationError) as e:
+        return create_response(error=e.message, status_code=e.status_code)
+    except Exception as e:
+        logger.error(f"Export patients error: {str(e)}")
+        return create_response(error="Failed to export patients", status_code=500)
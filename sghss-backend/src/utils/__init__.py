@@ -8,6 +8,7 @@ from .validators import (
     validate_cpf,
     validate_phone,
     validate_birth_date,
+    validate_appointment_datetime,
     validate_user_role,
     sanitize_string,
     validate_required_fields
@@ -21,7 +22,9 @@ from .exceptions import (
     NotFoundError,
     ConflictError,
     DatabaseError,
-    BusinessLogicError
+    BusinessLogicError,
+    ServiceUnavailableError,
+    PreconditionFailedError
 )
 
 from .helpers import (
@@ -30,6 +33,8 @@ from .helpers import (
     require_role,
     get_current_user,
     paginate_query,
+    encode_cursor,
+    decode_cursor,
     format_cpf,
     format_phone,
     calculate_age,
@@ -37,6 +42,22 @@ from .helpers import (
     mask_sensitive_data
 )
 
+from .cache import TTLCache, identity_cache
+
+from .hashing import PasswordHasher, password_hasher, hash_rounds, calibrate_rounds
+
+from .audit import AuditWriter, audit_writer
+
+from .compression import ResponseCompressor, response_compressor
+
+from .conditional import compute_etag, etag_headers, not_modified, require_if_match
+
+from .profiling import RequestProfiler, request_profiler
+
+from .metrics import MetricsRegistry, metrics_registry
+
+from .revocation import BloomFilter, TokenRevocationList, revocation_list
+
 __all__ = [
     # Validators
     'validate_email',
@@ -44,6 +65,7 @@ __all__ = [
     'validate_cpf',
     'validate_phone',
     'validate_birth_date',
+    'validate_appointment_datetime',
     'validate_user_role',
     'sanitize_string',
     'validate_required_fields',
@@ -57,6 +79,8 @@ __all__ = [
     'ConflictError',
     'DatabaseError',
     'BusinessLogicError',
+    'ServiceUnavailableError',
+    'PreconditionFailedError',
     
     # Helpers
     'setup_logging',
@@ -64,9 +88,48 @@ __all__ = [
     'require_role',
     'get_current_user',
     'paginate_query',
+    'encode_cursor',
+    'decode_cursor',
     'format_cpf',
     'format_phone',
     'calculate_age',
     'log_user_action',
-    'mask_sensitive_data'
+    'mask_sensitive_data',
+    
+    # Cache
+    'TTLCache',
+    'identity_cache',
+    
+    # Hashing
+    'PasswordHasher',
+    'password_hasher',
+    'hash_rounds',
+    'calibrate_rounds',
+    
+    # Auditoria
+    'AuditWriter',
+    'audit_writer',
+    
+    # Compressão
+    'ResponseCompressor',
+    'response_compressor',
+    
+    # Requisições condicionais
+    'compute_etag',
+    'etag_headers',
+    'not_modified',
+    'require_if_match',
+    
+    # Perfil por requisição
+    'RequestProfiler',
+    'request_profiler',
+    
+    # Métricas
+    'MetricsRegistry',
+    'metrics_registry',
+    
+    # Revogação de tokens
+    'BloomFilter',
+    'TokenRevocationList',
+    'revocation_list'
 ]
@@ -0,0 +1,201 @@
+"""
+Persistência assíncrona em lote dos eventos de auditoria (AuditLog)
+
+Os eventos são enfileirados na thread da requisição e gravados por uma
+thread de fundo em inserts em lote, disparados por tamanho do lote ou por
+intervalo de tempo. A fila é limitada: quando cheia, o produtor espera um
+curto intervalo (backpressure) e, persistindo a saturação, o evento é
+descartado e contabilizado.
+"""
+from typing import Any, Dict, List, Optional
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from src.models.user import db
+from src.models.audit_log import AuditLog
+
+
+class AuditWriter:
+    """
+    Gravador em lote de eventos de auditoria
+    
+    Com ``async_enabled = False`` cada evento é gravado imediatamente
+    (útil em testes com banco em memória).
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_queue_size: int = 10000, enqueue_timeout: float = 0.05,
+                 async_enabled: bool = True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.async_enabled = async_enabled
+        self.app = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+        self._batches = 0
+    
+    def init_app(self, app) -> None:
+        """
+        Configura o gravador a partir da configuração da aplicação
+        
+        Args:
+            app: Aplicação Flask
+        """
+        self.app = app
+        self.batch_size = app.config['AUDIT_BATCH_SIZE']
+        self.flush_interval = app.config['AUDIT_FLUSH_INTERVAL_SECONDS']
+        self.enqueue_timeout = app.config['AUDIT_ENQUEUE_TIMEOUT_SECONDS']
+        self.async_enabled = app.config['AUDIT_ASYNC']
+        
+        if app.config['AUDIT_QUEUE_SIZE'] != self.max_queue_size:
+            self.shutdown()
+            self.max_queue_size = app.config['AUDIT_QUEUE_SIZE']
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+        
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+    
+    def record(self, event: Dict[str, Any]) -> bool:
+        """
+        Enfileira um evento de auditoria
+        
+        Args:
+            event (Dict[str, Any]): Colunas do AuditLog
+        
+        Returns:
+            bool: False se o evento foi descartado por saturação
+        """
+        if not self.async_enabled:
+            self._write([event])
+            return True
+        
+        self._ensure_thread()
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            logging.getLogger('sghss').warning("Audit queue full, event dropped: %s", event.get('action'))
+            return False
+        
+        with self._lock:
+            self._enqueued += 1
+        return True
+    
+    def flush(self) -> None:
+        """Grava imediatamente todos os eventos pendentes na fila"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+    
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Encerra a thread de gravação após gravar os eventos pendentes
+        
+        Args:
+            timeout (float): Tempo máximo de espera pela thread (segundos)
+        """
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._thread_pid == os.getpid():
+            try:
+                self._queue.put(self._STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout)
+        self._thread = None
+        self.flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas do gravador de auditoria
+        
+        Returns:
+            Dict[str, Any]: Profundidade da fila e contadores
+        """
+        with self._lock:
+            return {
+                'async': self.async_enabled,
+                'queue_depth': self._queue.qsize(),
+                'enqueued': self._enqueued,
+                'written': self._written,
+                'dropped': self._dropped,
+                'failed': self._failed,
+                'batches': self._batches
+            }
+    
+    def _ensure_thread(self) -> None:
+        # Iniciada sob demanda e recriada após fork (ex.: workers do gunicorn)
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='sghss-audit-writer', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+    
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            
+            stop = item is self._STOP
+            if item is not None and not stop:
+                batch.append(item)
+            
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            
+            if stop:
+                return
+            
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+    
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self.app is None:
+            return
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(AuditLog.__table__.insert(), batch)
+            with self._lock:
+                self._written += len(batch)
+                self._batches += 1
+        except Exception as e:
+            with self._lock:
+                self._failed += len(batch)
+            logging.getLogger('sghss').error(f"Audit batch write failed ({len(batch)} events): {str(e)}")
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,109 @@
+"""
+Cache em memória com expiração (TTL) para o SGHSS Backend
+"""
+from typing import Any, Dict, Hashable, Optional, Tuple
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Cache chave/valor em processo com expiração por tempo
+    
+    Thread-safe e com limite de tamanho. Mantém contadores de acertos e
+    falhas para acompanhamento da taxa de acerto.
+    """
+    
+    def __init__(self, ttl: float = 30, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        """Cache desativado quando TTL <= 0"""
+        return self.ttl > 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Obtém valor do cache
+        
+        Args:
+            key (Hashable): Chave
+        
+        Returns:
+            Optional[Any]: Valor ou None se ausente/expirado
+        """
+        if not self.enabled:
+            return None
+        
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Armazena valor no cache
+        
+        Args:
+            key (Hashable): Chave
+            value (Any): Valor
+        """
+        if not self.enabled:
+            return
+        
+        with self._lock:
+            if len(self._data) >= self.max_size and key not in self._data:
+                self._evict_expired()
+                if len(self._data) >= self.max_size:
+                    # Remove a entrada mais antiga (ordem de inserção)
+                    self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Remove uma chave do cache"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove todas as entradas e zera os contadores"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estatísticas de uso do cache
+        
+        Returns:
+            Dict[str, Any]: Tamanho, acertos, falhas e taxa de acerto
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+            del self._data[key]
+
+
+# Cache de identidade: user_id -> (role, is_active)
+identity_cache = TTLCache()
@@ -0,0 +1,172 @@
+"""
+Compressão de respostas negociada por Accept-Encoding (gzip e brotli)
+
+Respostas dinâmicas (JSON, HTML) acima de um tamanho mínimo são
+comprimidas no after_request com o melhor algoritmo aceito pelo cliente;
+brotli só é oferecido quando o pacote está instalado. Arquivos estáticos
+são comprimidos uma única vez, no nível máximo, pelo manifesto de
+estáticos (static_assets.py). Respostas em streaming e as que já têm
+Content-Encoding passam intactas.
+
+ETags fortes recebem o sufixo da codificação ("abc-gzip"), pois cada
+codificação é uma representação diferente; as verificações de
+If-None-Match/If-Match aceitam as variantes (ver conditional.py).
+"""
+from typing import Any, Dict, Optional, Tuple
+import gzip
+import threading
+import time
+from flask import Response, request
+from src.constants import COMPRESSION
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+# Codificações em ordem de preferência do servidor
+CONTENT_CODINGS = ('br', 'gzip')
+
+
+def encoded_etag(tag: str, encoding: str) -> str:
+    """ETag (sem aspas) da representação codificada"""
+    return f'{tag}-{encoding}'
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Comprime o corpo com a codificação informada
+    
+    Args:
+        data (bytes): Corpo original
+        encoding (str): 'br' ou 'gzip'
+        level (int): Nível gzip (1-9) ou qualidade brotli (0-11)
+    
+    Returns:
+        bytes: Corpo comprimido
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    # mtime fixo: mesmo conteúdo gera sempre os mesmos bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class ResponseCompressor:
+    """
+    Compressão de respostas dinâmicas
+    
+    Mantém contadores de bytes economizados e do tempo de CPU gasto na
+    compressão, expostos em ``stats()`` (health check).
+    """
+    
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, enabled: bool = True):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enabled = enabled
+        self.mimetypes = frozenset(COMPRESSION['mimetypes'])
+        self._lock = threading.Lock()
+        self._compressed = 0
+        self._skipped = 0
+        self._bytes_in = 0
+        self._bytes_out = 0
+        self._cpu_seconds = 0.0
+    
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Codificações disponíveis neste processo, em ordem de preferência"""
+        return CONTENT_CODINGS if brotli is not None else ('gzip',)
+    
+    def init_app(self, app) -> None:
+        """
+        Configura a compressão e registra o after_request
+        
+        Args:
+            app: Aplicação Flask
+        """
+        self.enabled = app.config['COMPRESSION_ENABLED']
+        self.min_size = app.config['COMPRESSION_MIN_SIZE']
+        self.gzip_level = app.config['COMPRESSION_GZIP_LEVEL']
+        self.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+        app.after_request(self.after_request)
+    
+    def negotiate(self) -> Optional[str]:
+        """
+        Escolhe a codificação pelo Accept-Encoding da requisição
+        
+        Returns:
+            Optional[str]: 'br', 'gzip' ou None (sem compressão)
+        """
+        return request.accept_encodings.best_match(self.encodings)
+    
+    def _level(self, encoding: str) -> int:
+        return self.brotli_quality if encoding == 'br' else self.gzip_level
+    
+    def after_request(self, response: Response) -> Response:
+        """Comprime a resposta quando elegível"""
+        if not self.enabled or not self._eligible(response):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+        
+        started = time.thread_time()
+        body = compress(data, encoding, self._level(encoding))
+        elapsed = time.thread_time() - started
+        
+        with self._lock:
+            self._cpu_seconds += elapsed
+            if len(body) >= len(data):
+                self._skipped += 1
+                return response
+            self._compressed += 1
+            self._bytes_in += len(data)
+            self._bytes_out += len(body)
+        
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            response.set_etag(encoded_etag(tag, encoding))
+        return response
+    
+    def _eligible(self, response: Response) -> bool:
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+            return False
+        if response.direct_passthrough or response.is_streamed:
+            return False
+        if 'Content-Encoding' in response.headers or 'no-transform' in response.cache_control:
+            return False
+        return response.mimetype in self.mimetypes
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas de compressão
+        
+        Returns:
+            Dict[str, Any]: Bytes economizados e custo de CPU por resposta
+        """
+        with self._lock:
+            attempts = self._compressed + self._skipped
+            return {
+                'enabled': self.enabled,
+                'encodings': list(self.encodings),
+                'min_size': self.min_size,
+                'compressed': self._compressed,
+                'not_smaller': self._skipped,
+                'bytes_in': self._bytes_in,
+                'bytes_out': self._bytes_out,
+                'bytes_saved': self._bytes_in - self._bytes_out,
+                'cpu_ms_per_response': round(self._cpu_seconds * 1000 / attempts, 3) if attempts else 0.0
+            }
+
+
+# Instância global usada pela aplicação
+response_compressor = ResponseCompressor()
@@ -0,0 +1,102 @@
+"""
+Requisições condicionais (ETag, If-None-Match, If-Match) para o SGHSS Backend
+
+O ETag é forte e calculado a partir de (tabela, id, updated_at) de cada
+registro que compõe a resposta, sem serializar o payload: um GET com
+If-None-Match correspondente responde 304 antes de qualquer to_dict().
+Valores derivados que mudam sem alterar o registro (ex.: idade) entram
+como partes extras. Respostas comprimidas levam o ETag com o sufixo da
+codificação ("abc-gzip"); as comparações aceitam qualquer variante.
+"""
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+import hashlib
+from flask import request
+from src.utils.exceptions import PreconditionFailedError
+from src.utils.compression import CONTENT_CODINGS, encoded_etag
+
+# Incrementar quando o formato das respostas condicionais mudar
+ETAG_VERSION = 1
+
+# Respostas de perfil: privadas e sempre revalidadas com o servidor
+CACHE_CONTROL = 'private, no-cache'
+
+
+def compute_etag(*records: Any, extra: tuple = ()) -> str:
+    """
+    Calcula um ETag forte a partir das versões dos registros
+    
+    Args:
+        *records (Any): Instâncias de modelo (None é aceito e entra como ausente)
+        extra (tuple): Valores derivados que também afetam o payload
+    
+    Returns:
+        str: ETag entre aspas (ex.: "3f2a...")
+    """
+    parts = [str(ETAG_VERSION)]
+    for record in records:
+        if record is None:
+            parts.append('-')
+        else:
+            parts.append(f"{record.__tablename__}:{record.id}:{record.updated_at.isoformat()}")
+    for value in extra:
+        parts.append(value.isoformat() if isinstance(value, (datetime, date)) else repr(value))
+    
+    digest = hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """
+    Cabeçalhos de validação enviados com a resposta
+    
+    Args:
+        etag (str): ETag da representação
+    
+    Returns:
+        Dict[str, str]: ETag e Cache-Control
+    """
+    return {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+
+
+def _variants(etag: str) -> List[str]:
+    """ETag sem aspas e suas variantes por codificação (gzip, br)"""
+    tag = etag.strip('"')
+    return [tag] + [encoded_etag(tag, encoding) for encoding in CONTENT_CODINGS]
+
+
+def not_modified(etag: str) -> Optional[tuple]:
+    """
+    Responde 304 se o If-None-Match do cliente corresponder ao ETag
+    
+    Usa comparação fraca (RFC 9110, seção 13.1.2) e aceita ``*``.
+    
+    Args:
+        etag (str): ETag atual da representação
+    
+    Returns:
+        Optional[tuple]: Resposta 304 (sem corpo) ou None para seguir com o GET
+    """
+    if request.if_none_match:
+        for tag in _variants(etag):
+            if request.if_none_match.contains_weak(tag):
+                # Devolve a variante que o cliente tem em cache
+                return '', 304, etag_headers(f'"{tag}"')
+    return None
+
+
+def require_if_match(etag: str) -> None:
+    """
+    Valida o If-Match (concorrência otimista) antes de uma alteração
+    
+    Sem If-Match a alteração segue normalmente. Usa comparação forte e
+    aceita ``*`` (recurso existente).
+    
+    Args:
+        etag (str): ETag atual da representação
+    
+    Raises:
+        PreconditionFailedError: Se o recurso mudou desde o ETag enviado
+    """
+    if request.if_match and not any(request.if_match.contains(tag) for tag in _variants(etag)):
+        raise PreconditionFailedError("Resource was modified by another request")
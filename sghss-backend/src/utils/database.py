@@ -0,0 +1,155 @@
+"""
+Perfil dos engines do banco de dados (PRAGMAs do SQLite por conexão)
+
+Cada conexão SQLite aberta pelo pool recebe os PRAGMAs de SQLITE_PRAGMAS:
+WAL (leitores não bloqueiam o escritor), synchronous=NORMAL (sem fsync a
+cada commit em WAL), busy_timeout (espera pelo lock em vez de falhar com
+"database is locked"), cache de páginas e mmap. As opções de pool vêm de
+SQLALCHEMY_ENGINE_OPTIONS, definidas por ambiente em config.py.
+
+Em um worker criado por fork (gunicorn com --preload), a primeira
+requisição atendida descarta as conexões herdadas do pai e abre as do
+worker em segundo plano. Outros filhos (ex.: o pool de hashing) não
+atendem requisições e não tocam nos engines.
+"""
+from typing import Any, Dict, List
+import logging
+import os
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Ordem de aplicação: journal_mode primeiro (synchronous depende dele)
+_PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+
+def _ordered(pragmas: Dict[str, Any]):
+    rank = {name: i for i, name in enumerate(_PRAGMA_ORDER)}
+    return sorted(pragmas.items(), key=lambda item: rank.get(item[0], len(rank)))
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Registra os PRAGMAs para toda nova conexão do engine
+    
+    Engines de outros bancos são ignorados.
+    
+    Args:
+        engine (Engine): Engine do SQLAlchemy
+        pragmas (Dict[str, Any]): Nome e valor de cada PRAGMA
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    
+    statements = [f"PRAGMA {name}={value}" for name, value in _ordered(pragmas)]
+    
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def configure_engines(app, db) -> None:
+    """
+    Aplica o perfil de conexão a todos os engines (bind padrão e adicionais)
+    
+    Args:
+        app: Aplicação Flask
+        db: Instância do Flask-SQLAlchemy já inicializada
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+
+
+def sqlite_pragmas(engine: Engine) -> Dict[str, Any]:
+    """
+    Valores efetivos dos PRAGMAs em uma conexão do engine
+    
+    Args:
+        engine (Engine): Engine do SQLAlchemy
+    
+    Returns:
+        Dict[str, Any]: PRAGMA -> valor (vazio para outros bancos)
+    """
+    if engine.dialect.name != 'sqlite':
+        return {}
+    with engine.connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in _PRAGMA_ORDER
+        }
+
+
+def prewarm_connections(engines: List[Engine], count: int) -> None:
+    """
+    Abre conexões antecipadamente e as devolve ao pool
+    
+    A primeira requisição do worker não paga a conexão nem os PRAGMAs.
+    
+    Args:
+        engines (List[Engine]): Engines a aquecer
+        count (int): Conexões por engine (limitado ao tamanho do pool)
+    """
+    for engine in engines:
+        size = getattr(engine.pool, 'size', None)
+        total = min(count, size()) if callable(size) else min(count, 1)
+        connections = []
+        try:
+            for _ in range(total):
+                connections.append(engine.connect())
+        except Exception as e:
+            logging.getLogger('sghss').warning(f"Connection pre-warm failed: {str(e)}")
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+_prewarm_state: Dict[str, Any] = {'pid': None, 'count': 0, 'engines': []}
+_prewarm_lock = threading.Lock()
+
+
+def prewarm_pool(app, db) -> None:
+    """
+    Aquece o pool agora e registra o aquecimento dos workers criados por fork
+    
+    Args:
+        app: Aplicação Flask
+        db: Instância do Flask-SQLAlchemy já inicializada
+    """
+    count = app.config['DB_PREWARM_CONNECTIONS']
+    if count <= 0:
+        return
+    
+    with app.app_context():
+        engines = list(db.engines.values())
+    prewarm_connections(engines, count)
+    
+    _prewarm_state.update(pid=os.getpid(), count=count, engines=engines)
+    app.before_request(_prewarm_forked_worker)
+
+
+def _prewarm_forked_worker() -> None:
+    """
+    Na primeira requisição de um processo filho, troca as conexões herdadas
+    
+    As conexões do pai são descartadas sem fechar (``dispose(close=False)``)
+    e novas conexões são abertas em segundo plano.
+    """
+    if _prewarm_state['pid'] == os.getpid():
+        return
+    with _prewarm_lock:
+        if _prewarm_state['pid'] == os.getpid():
+            return
+        _prewarm_state['pid'] = os.getpid()
+        engines = list(_prewarm_state['engines'])
+        for engine in engines:
+            engine.dispose(close=False)
+    threading.Thread(
+        target=prewarm_connections, args=(engines, _prewarm_state['count']),
+        name='sghss-db-prewarm', daemon=True
+    ).start()
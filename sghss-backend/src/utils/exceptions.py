@@ -51,3 +51,16 @@ class BusinessLogicError(SGHSSBaseException):
     """Exceção para erros de regra de negócio"""
     def __init__(self, message: str):
         super().__init__(message, 422)
+
+
+class ServiceUnavailableError(SGHSSBaseException):
+    """Exceção para serviço temporariamente indisponível (sobrecarga)"""
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(message, 503)
+
+
+class PreconditionFailedError(SGHSSBaseException):
+    """Exceção para pré-condição (If-Match) não atendida"""
+    def __init__(self, message: str = "Precondition failed"):
+        super().__init__(message, 412)
@@ -0,0 +1,307 @@
+"""
+Executor dedicado para hashing de senhas (bcrypt) do SGHSS Backend
+
+O bcrypt é propositalmente lento; executá-lo na thread da requisição
+bloqueia os workers durante picos de login. Este módulo despacha o
+trabalho para um pool de processos com fila limitada: quando a fila está
+cheia, a requisição é rejeitada imediatamente com 503 e Retry-After.
+"""
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+import os
+import threading
+import time
+import bcrypt
+from src.utils.exceptions import ServiceUnavailableError
+from src.utils.profiling import request_profiler
+
+
+def _hash_password(password: bytes, rounds: Optional[int] = None) -> bytes:
+    """Gera o hash bcrypt (executado no processo do pool)"""
+    salt = bcrypt.gensalt(rounds) if rounds else bcrypt.gensalt()
+    return bcrypt.hashpw(password, salt)
+
+
+def _check_password(password: bytes, hashed: bytes) -> bool:
+    """Verifica a senha contra o hash bcrypt (executado no processo do pool)"""
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except (ValueError, TypeError):
+        return False
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """
+    Extrai o custo (work factor) de um hash bcrypt
+    
+    Args:
+        hashed (str): Hash bcrypt ($2b$<custo>$<salt+hash>)
+    
+    Returns:
+        Optional[int]: Custo ou None se o formato for inválido
+    """
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 4, max_rounds: int = 16,
+                     samples: int = 3) -> Dict[str, Any]:
+    """
+    Mede o tempo de verificação bcrypt nesta máquina para cada custo
+    
+    Args:
+        target_ms (float): Latência alvo de verificação em milissegundos
+        min_rounds (int): Menor custo testado
+        max_rounds (int): Maior custo testado
+        samples (int): Medições por custo (usa a mediana)
+    
+    Returns:
+        Dict[str, Any]: Tempos medidos por custo e custo recomendado
+            (o maior cujo tempo não excede o alvo)
+    """
+    password = b'calibration-password-1!'
+    timings = {}
+    recommended = min_rounds
+    
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        measured = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.checkpw(password, hashed)
+            measured.append((time.perf_counter() - started) * 1000)
+        
+        median_ms = sorted(measured)[len(measured) // 2]
+        timings[rounds] = round(median_ms, 2)
+        
+        if median_ms <= target_ms:
+            recommended = rounds
+        else:
+            # Cada incremento dobra o custo; não há por que continuar
+            break
+    
+    return {'target_ms': target_ms, 'timings_ms': timings, 'recommended_rounds': recommended}
+
+
+class PasswordHasher:
+    """
+    Pool de processos para bcrypt com controle de admissão
+    
+    Admite no máximo ``workers + queue_size`` operações simultâneas; as
+    demais recebem ``ServiceUnavailableError``. Com ``workers = 0`` o
+    hashing é executado na própria thread (útil em testes).
+    """
+    
+    def __init__(self, workers: int = 0, queue_size: int = 0,
+                 timeout: float = 10, retry_after: int = 1, rounds: Optional[int] = None):
+        self.workers = workers
+        self.rounds = rounds
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._slots = self._make_slots(workers, queue_size)
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=1024)
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+    
+    def configure(self, workers: int, queue_size: int,
+                  timeout: float = 10, retry_after: int = 1, rounds: Optional[int] = None) -> None:
+        """
+        Reconfigura o pool (encerra o executor atual, se houver)
+        
+        Args:
+            workers (int): Número de processos (0 executa inline)
+            queue_size (int): Operações aguardando além das em execução
+            timeout (float): Tempo máximo de espera por operação (segundos)
+            retry_after (int): Valor do cabeçalho Retry-After quando saturado
+            rounds (Optional[int]): Custo do bcrypt para novos hashes
+        """
+        self.shutdown()
+        with self._lock:
+            self.workers = workers
+            self.rounds = rounds
+            self.queue_size = queue_size
+            self.timeout = timeout
+            self.retry_after = retry_after
+            self._slots = self._make_slots(workers, queue_size)
+    
+    @request_profiler.timed('hash')
+    def hash_password(self, password: str, rounds: Optional[int] = None) -> str:
+        """
+        Gera hash bcrypt da senha
+        
+        Args:
+            password (str): Senha em texto plano
+            rounds (Optional[int]): Custo do bcrypt (padrão: o configurado)
+        
+        Returns:
+            str: Hash bcrypt
+        
+        Raises:
+            ServiceUnavailableError: Se o pool estiver saturado
+        """
+        hashed = self._run(_hash_password, password.encode('utf-8'), rounds or self.rounds)
+        return hashed.decode('utf-8')
+    
+    @request_profiler.timed('hash')
+    def check_password(self, password: str, hashed: str) -> bool:
+        """
+        Verifica senha contra hash bcrypt
+        
+        Args:
+            password (str): Senha em texto plano
+            hashed (str): Hash armazenado
+        
+        Returns:
+            bool: True se a senha confere
+        
+        Raises:
+            ServiceUnavailableError: Se o pool estiver saturado
+        """
+        return self._run(_check_password, password.encode('utf-8'), hashed.encode('utf-8'))
+    
+    def needs_rehash(self, hashed: str) -> bool:
+        """
+        Indica se o hash foi gerado com custo diferente do configurado
+        
+        Args:
+            hashed (str): Hash bcrypt armazenado (formato $2b$<custo>$...)
+        
+        Returns:
+            bool: True se o hash deve ser regenerado
+        """
+        if not self.rounds or not hashed:
+            return False
+        return hash_rounds(hashed) != self.rounds
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas do pool de hashing
+        
+        Returns:
+            Dict[str, Any]: Profundidade da fila, contadores e latências (ms) das operações concluídas
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            completed = self._completed
+            return {
+                'rounds': self.rounds,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'in_flight': self._in_flight,
+                'queue_depth': max(self._in_flight - self.workers, 0),
+                'completed': completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'latency_ms': {
+                    'avg': round(self._latency_total / completed * 1000, 2) if completed else 0.0,
+                    'p50': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else 0.0,
+                    'p95': round(latencies[int(len(latencies) * 0.95)] * 1000, 2) if latencies else 0.0,
+                    'max': round(self._latency_max * 1000, 2)
+                }
+            }
+    
+    def shutdown(self) -> None:
+        """Encerra o executor de processos"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self._executor_pid = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _make_slots(workers: int, queue_size: int) -> Optional[threading.BoundedSemaphore]:
+        # Sem limite de admissão no modo inline
+        return threading.BoundedSemaphore(workers + queue_size) if workers > 0 else None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda e recriado após fork (ex.: workers do gunicorn)
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Descarta um executor quebrado (processo do pool morto); o próximo uso cria outro"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self._executor_pid = None
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _run(self, func: Callable, *args):
+        slots = self._slots
+        if slots is not None and not slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ServiceUnavailableError(
+                "Authentication service is busy, please retry",
+                retry_after=self.retry_after
+            )
+        
+        with self._lock:
+            self._in_flight += 1
+        
+        def release(_future=None):
+            with self._lock:
+                self._in_flight -= 1
+            if slots is not None:
+                slots.release()
+        
+        started = time.perf_counter()
+        future = None
+        succeeded = False
+        try:
+            if self.workers <= 0:
+                result = func(*args)
+            else:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(func, *args)
+                    # A vaga só volta quando o job termina: cancel() não interrompe um bcrypt já em execução
+                    future.add_done_callback(release)
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    future.cancel()
+                    raise ServiceUnavailableError(
+                        "Authentication service timed out, please retry",
+                        retry_after=self.retry_after
+                    )
+                except BrokenProcessPool:
+                    # Um processo do pool morreu (ex.: OOM): o executor não aceita mais jobs
+                    self._discard_executor(executor)
+                    raise ServiceUnavailableError(
+                        "Authentication service is restarting, please retry",
+                        retry_after=self.retry_after
+                    )
+            succeeded = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                if succeeded:
+                    self._completed += 1
+                    self._latencies.append(elapsed)
+                    self._latency_total += elapsed
+                    self._latency_max = max(self._latency_max, elapsed)
+                else:
+                    self._failed += 1
+            if future is None:
+                # Modo inline ou submit falhou: nada ficou no pool
+                release()
+
+
+password_hasher = PasswordHasher()
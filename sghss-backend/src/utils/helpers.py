@@ -1,45 +1,69 @@
 """
 Utilitários gerais para o SGHSS Backend
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, List, Tuple, Callable
 from datetime import datetime, date, timedelta
+import base64
+import binascii
+import json
 import logging
 import os
+import threading
+import time
 from functools import wraps
-from flask import jsonify, request
+from flask import jsonify, request, g
 from flask_jwt_extended import get_jwt_identity
-from src.models.user import User
-from src.utils.exceptions import AuthenticationError, AuthorizationError
+from sqlalchemy import event, tuple_
+from sqlalchemy.orm import Session, object_session
+from src.constants import PAGINATION, LOG_LEVELS, LOGGING
+from src.models.user import User, db
+from src.utils.exceptions import AuthenticationError, AuthorizationError, ValidationError
+from src.utils.cache import identity_cache
+from src.utils.audit import audit_writer
+from src.utils.profiling import request_profiler
+from src.utils.metrics import metrics_registry
+from src.utils.structured_logging import start_logging_pipeline
 
 
-def setup_logging() -> logging.Logger:
+def setup_logging(env: Optional[str] = None) -> logging.Logger:
     """
     Configura logging para a aplicação
     
+    Os registros são enfileirados e gravados por uma thread dedicada em
+    JSON lines (logs/sghss.log), com rotação por tamanho e por tempo, de
+    modo que lentidão no disco não afeta a latência das requisições.
+    
+    Args:
+        env (Optional[str]): Ambiente (padrão: FLASK_ENV); define o nível via LOG_LEVELS
+    
     Returns:
         logging.Logger: Logger configurado
     """
+    if env is None:
+        env = os.environ.get('FLASK_ENV', 'development')
+    
     # Criar diretório logs se não existir
-    logs_dir = 'logs'
+    logs_dir = os.environ.get('LOG_DIR', LOGGING['dir'])
     if not os.path.exists(logs_dir):
         os.makedirs(logs_dir)
     
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/sghss.log'),
-            logging.StreamHandler()
-        ]
+    start_logging_pipeline(
+        level=os.environ.get('LOG_LEVEL') or LOG_LEVELS.get(env, 'INFO'),
+        log_file=os.path.join(logs_dir, LOGGING['file_name']),
+        max_bytes=int(os.environ.get('LOG_MAX_BYTES', LOGGING['max_bytes'])),
+        backup_count=int(os.environ.get('LOG_BACKUP_COUNT', LOGGING['backup_count'])),
+        when=os.environ.get('LOG_ROTATE_WHEN', LOGGING['rotate_when'])
     )
     return logging.getLogger('sghss')
 
 
+@request_profiler.timed('serialize')
 def create_response(
     message: str = None,
     data: Any = None,
     error: str = None,
-    status_code: int = 200
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
 ) -> tuple:
     """
     Cria resposta padronizada da API
@@ -49,9 +73,10 @@ def create_response(
         data (Any): Dados da resposta
         error (str): Mensagem de erro
         status_code (int): Código de status HTTP
+        headers (Optional[Dict[str, str]]): Cabeçalhos HTTP adicionais
     
     Returns:
-        tuple: (response_dict, status_code)
+        tuple: (response_dict, status_code) ou (response_dict, status_code, headers)
     """
     response = {}
     
@@ -67,13 +92,84 @@ def create_response(
     if error:
         response['error'] = error
     
+    if headers:
+        return jsonify(response), status_code, headers
+    
     return jsonify(response), status_code
 
 
+# Incrementado a cada invalidação confirmada: leitura iniciada antes dela não volta ao cache
+_identity_state = {'generation': 0}
+
+
+def _load_user(user_id: int) -> User:
+    """
+    Carrega o usuário uma única vez por requisição (armazenado em ``g``)
+    
+    Args:
+        user_id (int): ID do usuário autenticado
+    
+    Returns:
+        User: Usuário carregado
+    
+    Raises:
+        AuthenticationError: Se usuário não encontrado
+    """
+    user = g.get('current_user')
+    if user is None or user.id != user_id:
+        generation = _identity_state['generation']
+        # Sempre do primário: na réplica, um usuário recém-desativado seguiria ativo até a próxima sincronização
+        user = db.session.get(User, user_id, bind_arguments={'bind': db.engine})
+        
+        if not user:
+            raise AuthenticationError("User not found")
+        
+        g.current_user = user
+        if generation == _identity_state['generation']:
+            identity_cache.set(user_id, (user.role.value, user.is_active))
+    
+    return user
+
+
+def _invalidate_identity(user_ids) -> None:
+    _identity_state['generation'] += 1
+    for user_id in user_ids:
+        identity_cache.invalidate(user_id)
+
+
+@event.listens_for(User.is_active, 'set')
+@event.listens_for(User.role, 'set')
+def _mark_identity_changed(target, value, oldvalue, initiator):
+    """Marca o usuário cujo role/is_active mudou (ex.: deactivate/activate) para invalidar após o commit"""
+    if target.id is None:
+        return
+    session = object_session(target)
+    if session is None:
+        _invalidate_identity((target.id,))
+    else:
+        session.info.setdefault('identity_changed', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_identity_after_commit(session):
+    # Invalidar antes do commit deixaria outra requisição recolocar o valor antigo no cache
+    changed = session.info.pop('identity_changed', None)
+    if changed:
+        _invalidate_identity(changed)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_identity_changes(session, previous_transaction):
+    session.info.pop('identity_changed', None)
+
+
 def require_role(*allowed_roles):
     """
     Decorator para verificar roles de usuário
     
+    A verificação usa o cache de identidade (role, is_active) quando
+    disponível, sem acessar o banco de dados.
+    
     Args:
         *allowed_roles: Roles permitidas
     """
@@ -82,15 +178,19 @@ def require_role(*allowed_roles):
         def decorated_function(*args, **kwargs):
             try:
                 current_user_id = int(get_jwt_identity())
-                user = User.query.get(current_user_id)
+                identity = identity_cache.get(current_user_id)
+                
+                if identity is None:
+                    user = _load_user(current_user_id)
+                    identity = (user.role.value, user.is_active)
                 
-                if not user:
-                    raise AuthenticationError("User not found")
+                role, is_active = identity
                 
-                if not user.is_active:
+                if not is_active:
                     raise AuthenticationError("Account is deactivated")
                 
-                if user.role.value not in allowed_roles:
+                if role not in allowed_roles:
+                    metrics_registry.inc('sghss_auth_failures_total', status=403, reason='insufficient_role')
                     raise AuthorizationError(f"Required role: {', '.join(allowed_roles)}")
                 
                 return f(*args, **kwargs)
@@ -114,10 +214,7 @@ def get_current_user() -> User:
     """
     try:
         current_user_id = int(get_jwt_identity())
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            raise AuthenticationError("User not found")
+        user = _load_user(current_user_id)
         
         if not user.is_active:
             raise AuthenticationError("Account is deactivated")
@@ -128,23 +225,168 @@ def get_current_user() -> User:
         raise AuthenticationError("Invalid token")
 
 
-def paginate_query(query, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica os valores de ordenação do último item em um cursor opaco
+    
+    Args:
+        values (Sequence[Any]): Valores das colunas de ordenação
+    
+    Returns:
+        str: Cursor em base64 url-safe
+    """
+    payload = [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodifica um cursor opaco nos valores das colunas de ordenação
+    
+    Args:
+        cursor (str): Cursor recebido do cliente
+        columns (Sequence[Any]): Colunas de ordenação (define tipos esperados)
+    
+    Returns:
+        List[Any]: Valores convertidos para o tipo de cada coluna
+    
+    Raises:
+        ValidationError: Se o cursor for inválido
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor size mismatch")
+        
+        values = []
+        for column, value in zip(columns, payload):
+            python_type = column.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                value = python_type(value)
+            values.append(value)
+        return values
+    except (ValueError, TypeError, binascii.Error, UnicodeError, NotImplementedError):
+        raise ValidationError("Invalid cursor")
+
+
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+_count_cache_lock = threading.Lock()
+
+
+def cached_count(query, ttl: Optional[float] = None) -> int:
+    """
+    Conta os registros de uma query reaproveitando o resultado por alguns segundos
+    
+    Args:
+        query: Query do SQLAlchemy
+        ttl (Optional[float]): Validade do cache em segundos
+    
+    Returns:
+        int: Total (possivelmente aproximado) de registros
+    """
+    if ttl is None:
+        ttl = PAGINATION['count_cache_ttl_seconds']
+    
+    compiled = query.statement.compile()
+    key = (str(compiled), tuple(sorted((k, repr(v)) for k, v in compiled.params.items())))
+    now = time.monotonic()
+    
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+    
+    total = query.order_by(None).count()
+    
+    with _count_cache_lock:
+        _count_cache[key] = (now + ttl, total)
+    
+    return total
+
+
+def _keyset_filter(columns: Sequence[Any], values: Sequence[Any]):
+    """
+    Monta o predicado (c1, c2, ...) > (v1, v2, ...) como comparação de tuplas
+    
+    A forma expandida ``c1 > v1 OR (c1 = v1 AND c2 > v2)`` faz o SQLite
+    percorrer o índice desde o início (SCAN); com row values ele posiciona
+    no cursor (SEARCH ... (created_at>?)).
+    """
+    return tuple_(*columns) > tuple_(*values)
+
+
+def paginate_query(
+    query,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: Optional[str] = None,
+    order_by: Optional[Sequence[Any]] = None,
+    include_total: bool = True,
+    serializer: Optional[Callable[[Any], Any]] = None
+) -> Dict[str, Any]:
     """
     Pagina uma query do SQLAlchemy
     
+    Por padrão usa paginação por página (OFFSET). Quando ``cursor`` é
+    informado (string vazia para a primeira página), usa paginação por
+    cursor (keyset) ordenada por ``order_by`` — por padrão
+    ``(created_at, id)`` do modelo consultado —, que não faz OFFSET e só
+    conta o total quando ``include_total`` é verdadeiro (contagem em cache).
+    
     Args:
         query: Query do SQLAlchemy
         page (int): Número da página
         per_page (int): Items por página
+        cursor (Optional[str]): Cursor opaco retornado em ``next_cursor``
+        order_by (Optional[Sequence]): Colunas de ordenação do modo cursor
+        include_total (bool): Se deve incluir o total no modo cursor
+        serializer (Optional[Callable]): Função de serialização de cada item
     
     Returns:
         Dict[str, Any]: Dados paginados
     """
+    if serializer is None:
+        serializer = lambda item: item.to_dict() if hasattr(item, 'to_dict') else item
+    
     if page < 1:
         page = 1
     
-    if per_page < 1 or per_page > 100:
-        per_page = 20
+    if per_page < PAGINATION['min_per_page'] or per_page > PAGINATION['max_per_page']:
+        per_page = PAGINATION['default_per_page']
+    
+    if cursor is not None:
+        if order_by is None:
+            model = query.column_descriptions[0]['entity']
+            order_by = (model.created_at, model.id)
+        
+        keyset_query = query
+        if cursor:
+            keyset_query = keyset_query.filter(_keyset_filter(order_by, decode_cursor(cursor, order_by)))
+        
+        rows = keyset_query.order_by(*order_by).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        
+        next_cursor = None
+        if has_next:
+            last = items[-1]
+            next_cursor = encode_cursor([getattr(last, column.key) for column in order_by])
+        
+        result = {
+            'items': [serializer(item) for item in items],
+            'per_page': per_page,
+            'has_next': has_next,
+            'next_cursor': next_cursor
+        }
+        if include_total:
+            result['total'] = cached_count(query)
+        return result
     
     paginated = query.paginate(
         page=page,
@@ -153,7 +395,7 @@ def paginate_query(query, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
     )
     
     return {
-        'items': [item.to_dict() if hasattr(item, 'to_dict') else item for item in paginated.items],
+        'items': [serializer(item) for item in paginated.items],
         'total': paginated.total,
         'pages': paginated.pages,
         'current_page': paginated.page,
@@ -222,29 +464,75 @@ def calculate_age(birth_date: date) -> Optional[int]:
     return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
 
-def log_user_action(user_id: int, action: str, details: str = None):
+_AUDIT_TABLES = (
+    ('PATIENT_', 'patients'),
+    ('PROFESSIONAL_', 'professionals'),
+    ('APPOINTMENT_', 'appointments'),
+    ('MEDICAL_RECORD_', 'medical_records'),
+    ('PRESCRIPTION_', 'prescriptions')
+)
+
+
+@request_profiler.timed('log')
+def log_user_action(
+    user_id: int,
+    action: str,
+    details: str = None,
+    table_name: Optional[str] = None,
+    record_id: Optional[int] = None
+):
     """
     Registra ação do usuário para auditoria
     
+    O evento é enviado ao logger e enfileirado para gravação em lote na
+    tabela audit_logs, sem commit síncrono no caminho da requisição.
+    
     Args:
-        user_id (int): ID do usuário
+        user_id (int): ID do usuário (0 para usuário desconhecido)
         action (str): Ação realizada
         details (str): Detalhes adicionais
+        table_name (Optional[str]): Tabela afetada (inferida pela ação se omitida)
+        record_id (Optional[int]): ID do registro afetado (nas ações sobre ``users``,
+            o próprio usuário quando omitido; nas demais, NULL quando omitido)
     """
     logger = logging.getLogger('sghss')
     
+    now = datetime.utcnow()
+    ip_address = request.remote_addr
+    user_agent = request.headers.get('User-Agent')
+    
     log_data = {
         'user_id': user_id,
         'action': action,
-        'ip': request.remote_addr,
-        'user_agent': request.headers.get('User-Agent'),
-        'timestamp': datetime.utcnow().isoformat()
+        'ip': ip_address,
+        'user_agent': user_agent,
+        'timestamp': now.isoformat()
     }
     
     if details:
         log_data['details'] = details
     
-    logger.info(f"User action: {log_data}")
+    # Formatação adiada: não custa nada quando INFO está desabilitado
+    logger.info("User action: %s", log_data, extra={'audit': log_data})
+    
+    if table_name is None:
+        table_name = next((table for prefix, table in _AUDIT_TABLES if action.startswith(prefix)), 'users')
+    
+    # O user_id só identifica o registro quando a tabela é users (ex.: patients tem ids próprios)
+    if record_id is None and table_name == 'users':
+        record_id = user_id or None
+    
+    audit_writer.record({
+        'user_id': user_id or None,
+        'action': action,
+        'table_name': table_name,
+        'record_id': record_id,
+        'old_values': None,
+        'new_values': {'details': details} if details else None,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'created_at': now
+    })
 
 
 def mask_sensitive_data(data: str, mask_char: str = '*', visible_chars: int = 4) -> str:
@@ -0,0 +1,45 @@
+"""
+Serialização JSON das respostas com orjson
+
+O provedor substitui app.json (JSON_ENCODER=orjson, o padrão) e gera as
+respostas compactas com o orjson: chaves ordenadas, texto em UTF-8 (sem
+escapes \\uXXXX) e quebra de linha no final. Datas passam pelo mesmo
+``default`` do provedor padrão do Flask. O que o orjson não serializa
+(inteiros acima de 64 bits, chaves não textuais) é gerado pela stdlib, e
+o modo indentado (debug) mantém o comportamento padrão.
+"""
+from typing import Any
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provedor JSON do Flask com as respostas compactas geradas pelo orjson"""
+    
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """
+        Serializa em modo compacto
+        
+        Args:
+            obj (Any): Objeto a serializar
+        
+        Returns:
+            bytes: Documento JSON em UTF-8 (sem quebra de linha final)
+        """
+        # Datas vão para o default do Flask (mesmo formato do provedor padrão)
+        options = orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=self.default, option=options)
+        except orjson.JSONEncodeError:
+            return self.dumps(obj, separators=(',', ':')).encode('utf-8')
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        
+        # Modo indentado (debug) mantém o comportamento padrão
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(obj)
+        
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,391 @@
+"""
+Métricas no formato texto do Prometheus (GET /api/metrics)
+
+Cada processo acumula em memória contadores, histogramas de latência por
+endpoint e gauges (requisições em andamento, conexões do pool). Com
+METRICS_DIR definido (vários workers no mesmo host), cada processo grava
+seu estado em ``METRICS_DIR/<pid>-<token>.json`` a cada
+METRICS_FLUSH_INTERVAL_SECONDS e a cada coleta; o worker que atende a
+coleta soma os arquivos de todos. Contadores e histogramas de workers
+encerrados continuam somando (como no Prometheus, só crescem); gauges
+contam apenas processos vivos. A coleta que encontra arquivos de processos
+encerrados os incorpora a ``archive.json`` (só contadores e histogramas) e
+os apaga, para que reinícios de workers não acumulem arquivos. Limpe o
+diretório ao iniciar o servidor.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import atexit
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from flask import g, request
+from src.constants import METRICS
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem arquivamento (um único processo)
+    fcntl = None
+
+ARCHIVE_FILE = 'archive.json'
+# Nomes já incorporados ao arquivamento são lembrados por este tempo depois de apagados
+ARCHIVE_FOLDED_TTL_SECONDS = 3600
+
+# Nome -> (tipo, descrição)
+METRIC_DEFINITIONS = {
+    'sghss_http_requests_total': ('counter', 'HTTP requests by endpoint, method and status code'),
+    'sghss_http_request_duration_seconds': ('histogram', 'HTTP request latency by endpoint'),
+    'sghss_http_requests_in_flight': ('gauge', 'HTTP requests currently being served by endpoint'),
+    'sghss_auth_failures_total': ('counter', 'Rejected requests (401/403) by reason'),
+    'sghss_db_pool_size': ('gauge', 'Configured connection pool size by bind'),
+    'sghss_db_pool_checked_out': ('gauge', 'Connections checked out of the pool by bind'),
+    'sghss_db_pool_overflow': ('gauge', 'Overflow connections currently open by bind'),
+    'sghss_metrics_processes': ('gauge', 'Worker processes currently reporting metrics')
+}
+
+
+def _labels(**labels: Any) -> str:
+    """Rótulos no formato de exposição (valores escapados, ordem fixa)"""
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in sorted(labels.items())
+    )
+    return ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def _merge(total: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Soma contadores, gauges e histogramas de ``state`` em ``total``"""
+    for kind in ('counters', 'gauges'):
+        for name, series in state[kind].items():
+            merged = total[kind].setdefault(name, {})
+            for key, value in series.items():
+                merged[key] = merged.get(key, 0.0) + value
+    for name, series in state['histograms'].items():
+        merged = total['histograms'].setdefault(name, {})
+        for key, values in series.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = list(values)
+            elif len(current) == len(values):
+                # Arquivos com outros buckets (versão anterior) são ignorados
+                merged[key] = [a + b for a, b in zip(current, values)]
+
+
+def _read(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Arquivo removido ou de outra versão: ignora
+        return None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    """
+    Registro de métricas do processo, agregável entre workers via arquivos
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = METRICS['latency_buckets']):
+        self.buckets = tuple(buckets)
+        self.directory: Optional[str] = None
+        self.flush_interval = 5.0
+        self._engines: List[Tuple[str, Any]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._fork_registered = False
+        self._atexit_registered = False
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._token = uuid.uuid4().hex[:8]
+        self._counters: Dict[str, Dict[str, float]] = {}
+        self._histograms: Dict[str, Dict[str, List[float]]] = {}
+        self._gauges: Dict[str, Dict[str, float]] = {}
+    
+    def init_app(self, app, db) -> None:
+        """
+        Registra os hooks de requisição e os engines cujo pool é reportado
+        
+        Args:
+            app: Aplicação Flask
+            db: Instância do Flask-SQLAlchemy já inicializada
+        """
+        self.directory = app.config['METRICS_DIR'] or None
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL_SECONDS']
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        with app.app_context():
+            self._engines = [(bind or 'default', engine) for bind, engine in db.engines.items()]
+        
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        
+        if not self._fork_registered and hasattr(os, 'register_at_fork'):
+            # Filhos criados por fork começam com registro vazio e arquivo próprio
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_registered = True
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+    
+    def inc(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        """Incrementa um contador"""
+        key = _labels(**labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+    
+    def add(self, name: str, amount: float, **labels: Any) -> None:
+        """Soma (ou subtrai) de um gauge"""
+        key = _labels(**labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+    
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Registra uma observação no histograma (buckets, soma e contagem)"""
+        key = _labels(**labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+                    break
+            values[-2] += value
+            values[-1] += 1
+    
+    def _before_request(self) -> None:
+        endpoint = request.endpoint or 'unmatched'
+        g.metrics_request = (endpoint, time.perf_counter())
+        self.add('sghss_http_requests_in_flight', 1, endpoint=endpoint)
+        self._ensure_thread()
+    
+    def _after_request(self, response):
+        started = g.get('metrics_request')
+        if started is not None:
+            endpoint, t0 = started
+            self.observe('sghss_http_request_duration_seconds', time.perf_counter() - t0, endpoint=endpoint)
+            self.inc('sghss_http_requests_total', endpoint=endpoint, method=request.method,
+                     status=response.status_code)
+        return response
+    
+    def _teardown_request(self, exc) -> None:
+        # Também roda quando a requisição termina com exceção
+        started = g.pop('metrics_request', None)
+        if started is not None:
+            self.add('sghss_http_requests_in_flight', -1, endpoint=started[0])
+    
+    def _pool_gauges(self) -> Dict[str, Dict[str, float]]:
+        gauges: Dict[str, Dict[str, float]] = {
+            'sghss_db_pool_size': {}, 'sghss_db_pool_checked_out': {}, 'sghss_db_pool_overflow': {}
+        }
+        for bind, engine in self._engines:
+            pool = engine.pool
+            key = _labels(bind=bind)
+            for name, method in (('sghss_db_pool_size', 'size'), ('sghss_db_pool_checked_out', 'checkedout'),
+                                 ('sghss_db_pool_overflow', 'overflow')):
+                # Pools sem fila (ex.: SQLite em memória) não expõem esses números
+                getter = getattr(pool, method, None)
+                if callable(getter):
+                    gauges[name][key] = float(max(getter(), 0))
+        return gauges
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            gauges = {name: dict(series) for name, series in self._gauges.items()}
+            state = {
+                'pid': os.getpid(),
+                'counters': {name: dict(series) for name, series in self._counters.items()},
+                'histograms': {name: {key: list(values) for key, values in series.items()}
+                               for name, series in self._histograms.items()},
+            }
+        gauges.update(self._pool_gauges())
+        gauges['sghss_metrics_processes'] = {'': 1.0}
+        state['gauges'] = gauges
+        return state
+    
+    def _path(self) -> str:
+        return os.path.join(self.directory, f'{os.getpid()}-{self._token}.json')
+    
+    def _write(self, path: str, state: Dict[str, Any]) -> None:
+        """Grava o estado em ``path`` (escrita atômica)"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    
+    def flush(self) -> None:
+        """Grava o estado deste processo em METRICS_DIR"""
+        if not self.directory:
+            return
+        try:
+            self._write(self._path(), self._snapshot())
+        except OSError as e:
+            logging.getLogger('sghss').warning(f"Metrics flush failed: {str(e)}")
+    
+    def _collect(self) -> List[Dict[str, Any]]:
+        if not self.directory:
+            return [self._snapshot()]
+        
+        self.flush()
+        archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+        states = []
+        dead = []
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            if path == archive_path:
+                continue
+            state = _read(path)
+            if state is None:
+                continue
+            if not _alive(state['pid']):
+                state['gauges'] = {}
+                dead.append(path)
+            states.append((os.path.basename(path), state))
+        if dead:
+            self._archive(dead)
+        
+        # Lido por último: arquivos que ele já incorporou (e que ainda não foram apagados) não contam de novo
+        archive = _read(archive_path)
+        if archive is None:
+            return [state for _, state in states]
+        return [archive] + [state for name, state in states if name not in archive['folded']]
+    
+    def _archive(self, paths: List[str]) -> None:
+        """
+        Incorpora os arquivos de processos encerrados ao arquivamento e os apaga
+        
+        Só um worker arquiva por vez; os demais seguem a coleta sem esperar.
+        
+        Args:
+            paths (List[str]): Arquivos de processos encerrados
+        """
+        if fcntl is None:
+            return
+        try:
+            with open(os.path.join(self.directory, '.archive.lock'), 'a') as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+                
+                archive_path = os.path.join(self.directory, ARCHIVE_FILE)
+                archive = _read(archive_path) or {'pid': None, 'counters': {}, 'histograms': {}, 'gauges': {},
+                                                  'folded': {}}
+                now = time.time()
+                folded = {
+                    name: folded_at for name, folded_at in archive['folded'].items()
+                    if now - folded_at < ARCHIVE_FOLDED_TTL_SECONDS
+                    or os.path.exists(os.path.join(self.directory, name))
+                }
+                for path in paths:
+                    name = os.path.basename(path)
+                    state = None if name in folded else _read(path)
+                    if state is None:
+                        # Já incorporado (apagado sem sucesso antes) ou removido por outro worker
+                        continue
+                    state['gauges'] = {}
+                    _merge(archive, state)
+                    folded[name] = now
+                archive['folded'] = folded
+                self._write(archive_path, archive)
+                
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+        except OSError as e:
+            logging.getLogger('sghss').warning(f"Metrics archive failed: {str(e)}")
+    
+    def render(self) -> str:
+        """
+        Métricas agregadas de todos os processos no formato texto do Prometheus
+        
+        Returns:
+            str: Corpo da resposta de GET /api/metrics
+        """
+        total: Dict[str, Dict[str, Any]] = {'counters': {}, 'gauges': {}, 'histograms': {}}
+        for state in self._collect():
+            _merge(total, state)
+        counters, gauges, histograms = total['counters'], total['gauges'], total['histograms']
+        
+        lines = []
+        for name, (kind, description) in METRIC_DEFINITIONS.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'histogram':
+                for key, values in sorted(histograms.get(name, {}).items()):
+                    prefix = f'{key},' if key else ''
+                    suffix = f'{{{key}}}' if key else ''
+                    cumulative = 0.0
+                    for bound, count in zip(self.buckets, values):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative:g}')
+                    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {values[-1]:g}')
+                    lines.append(f'{name}_sum{suffix} {values[-2]:.6f}')
+                    lines.append(f'{name}_count{suffix} {values[-1]:g}')
+            else:
+                series = (counters if kind == 'counter' else gauges).get(name, {})
+                for key, value in sorted(series.items()):
+                    lines.append(f'{name}{{{key}}} {value:g}' if key else f'{name} {value:g}')
+        return '\n'.join(lines) + '\n'
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estado do registro
+        
+        Returns:
+            Dict[str, Any]: Modo de agregação e séries em memória
+        """
+        with self._lock:
+            return {
+                'multiprocess': self.directory is not None,
+                'flush_interval_seconds': self.flush_interval,
+                'series': sum(len(series) for group in (self._counters, self._histograms, self._gauges)
+                              for series in group.values())
+            }
+    
+    def _ensure_thread(self) -> None:
+        # Gravação periódica iniciada sob demanda e recriada após fork
+        if not self.directory or self.flush_interval <= 0:
+            return
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='sghss-metrics', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+    
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._thread = None
+        self._reset()
+
+
+# Instância global usada pela aplicação
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,178 @@
+"""
+Perfil por requisição exposto no cabeçalho Server-Timing
+
+Opcional (PROFILING_ENABLED). Para cada requisição são acumulados: número
+e tempo das consultas SQL (eventos do engine), tempo de hashing de senha,
+de serialização da resposta (create_response) e de log/auditoria
+(log_user_action). Os totais vão no cabeçalho ``Server-Timing`` e uma
+amostra (PROFILING_SAMPLE_RATE) é guardada num buffer circular consultado
+por GET /api/admin/profiles.
+
+Os tempos podem se sobrepor: com auditoria síncrona, o INSERT feito por
+log_user_action conta em ``log`` e em ``sql``.
+"""
+from collections import deque
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+import random
+import threading
+import time
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Métricas de tempo acumuladas por requisição (ordem do cabeçalho)
+TIMED_METRICS = ('sql', 'hash', 'serialize', 'log')
+
+
+def _profile() -> Optional[Dict[str, float]]:
+    """Perfil da requisição atual (None fora de requisição ou se desativado)"""
+    if not has_request_context():
+        return None
+    return g.get('profile')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # No contexto da execução, e não em conn.info: se a consulta falhar, o início some com ele
+    if context is not None and _profile() is not None:
+        context.profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile()
+    started = getattr(context, 'profile_started', None)
+    if profile is not None and started is not None:
+        profile['sql'] += time.perf_counter() - started
+        profile['sql_count'] += 1
+
+
+class RequestProfiler:
+    """
+    Instrumentação opcional de requisições
+    
+    Desativado, o custo por chamada instrumentada é uma checagem de atributo.
+    """
+    
+    def __init__(self, buffer_size: int = 500, sample_rate: float = 1.0):
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self._samples: deque = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._sampled = 0
+    
+    def init_app(self, app, db) -> None:
+        """
+        Registra os hooks da aplicação e dos engines quando PROFILING_ENABLED
+        
+        Args:
+            app: Aplicação Flask
+            db: Instância do Flask-SQLAlchemy já inicializada
+        """
+        self.enabled = app.config['PROFILING_ENABLED']
+        self.sample_rate = app.config['PROFILING_SAMPLE_RATE']
+        if app.config['PROFILING_BUFFER_SIZE'] != self._samples.maxlen:
+            self._samples = deque(maxlen=app.config['PROFILING_BUFFER_SIZE'])
+        if not self.enabled:
+            return
+        
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        with app.app_context():
+            for engine in db.engines.values():
+                if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    
+    def timed(self, metric: str) -> Callable:
+        """
+        Decorator que soma a duração da função na métrica da requisição
+        
+        Args:
+            metric (str): Uma de TIMED_METRICS
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = _profile() if self.enabled else None
+                if profile is None:
+                    return func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profile[metric] += time.perf_counter() - started
+            return wrapper
+        return decorator
+    
+    def _start(self) -> None:
+        if self.enabled:
+            profile = dict.fromkeys(TIMED_METRICS, 0.0)
+            profile['sql_count'] = 0
+            profile['started'] = time.perf_counter()
+            g.profile = profile
+    
+    def _finish(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        
+        total = time.perf_counter() - profile['started']
+        timings = [
+            f'sql;dur={profile["sql"] * 1000:.3f};desc="{profile["sql_count"]} queries"'
+        ] + [
+            f'{metric};dur={profile[metric] * 1000:.3f}' for metric in TIMED_METRICS[1:]
+        ] + [f'total;dur={total * 1000:.3f}']
+        response.headers.add('Server-Timing', ', '.join(timings))
+        
+        sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        with self._lock:
+            self._requests += 1
+            if sampled:
+                self._sampled += 1
+        if sampled:
+            sample = {
+                'timestamp': datetime.utcnow().isoformat(),
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 3),
+                'sql_count': profile['sql_count']
+            }
+            sample.update({f'{metric}_ms': round(profile[metric] * 1000, 3) for metric in TIMED_METRICS})
+            self._samples.append(sample)
+        return response
+    
+    def samples(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Amostras do buffer circular, mais recentes primeiro
+        
+        Args:
+            limit (Optional[int]): Máximo de amostras retornadas
+        
+        Returns:
+            List[Dict[str, Any]]: Perfis das requisições amostradas
+        """
+        recent = list(self._samples)[::-1]
+        return recent[:limit] if limit is not None else recent
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas do profiler
+        
+        Returns:
+            Dict[str, Any]: Estado, taxa de amostragem e contadores
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'sample_rate': self.sample_rate,
+                'requests': self._requests,
+                'sampled': self._sampled,
+                'buffered': len(self._samples)
+            }
+
+
+# Instância global usada pela aplicação
+request_profiler = RequestProfiler()
@@ -0,0 +1,82 @@
+"""
+Orçamento de consultas SQL por endpoint
+
+Guardas reutilizáveis para testes e verificações: contam as instruções SQL
+emitidas em um bloco e falham se passarem do limite. Usadas por
+``benchmarks/query_counts.py`` com os limites de QUERY_BUDGETS
+(src/constants.py), para que um campo novo que dispare uma consulta por
+linha (N+1) não passe despercebido.
+
+A contagem inclui tudo que passa pelos engines durante o bloco, inclusive
+de outras threads; use AUDIT_ASYNC = False (configuração de testes).
+"""
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Union
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Bloco emitiu mais instruções SQL do que o orçamento permite"""
+    
+    def __init__(self, label: str, limit: int, statements: List[str]):
+        self.label = label
+        self.limit = limit
+        self.statements = statements
+        listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(statements, start=1))
+        super().__init__(f"{label or 'block'} issued {len(statements)} SQL statements (budget {limit}):\n{listing}")
+
+
+class QueryCounter:
+    """
+    Conta as instruções SQL emitidas nos engines enquanto ativo
+    
+    Uso::
+        
+        with QueryCounter(db.engines.values()) as counter:
+            client.get('/api/patients')
+        counter.count
+    """
+    
+    def __init__(self, engines: Union[Engine, Iterable[Engine]]):
+        self.engines = [engines] if isinstance(engines, Engine) else list(engines)
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements.append(' '.join(statement.split()))
+    
+    def __enter__(self) -> 'QueryCounter':
+        for engine in self.engines:
+            event.listen(engine, 'before_cursor_execute', self._record)
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        for engine in self.engines:
+            event.remove(engine, 'before_cursor_execute', self._record)
+
+
+@contextmanager
+def assert_max_queries(engines: Union[Engine, Iterable[Engine]], limit: int,
+                       label: str = '') -> Iterator[QueryCounter]:
+    """
+    Falha se o bloco emitir mais de ``limit`` instruções SQL
+    
+    Args:
+        engines: Engine ou engines observados (ex.: db.engines.values())
+        limit (int): Máximo de instruções permitidas
+        label (str): Nome do bloco na mensagem de erro (ex.: o endpoint)
+    
+    Raises:
+        QueryBudgetExceeded: Com a lista das instruções emitidas
+    """
+    with QueryCounter(engines) as counter:
+        yield counter
+    if counter.count > limit:
+        raise QueryBudgetExceeded(label, limit, counter.statements)
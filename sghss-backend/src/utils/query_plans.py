@@ -0,0 +1,91 @@
+"""
+Verificação de planos de execução (EXPLAIN QUERY PLAN) das consultas críticas
+
+Usado pelo comando ``flask check-query-plans`` para detectar consultas que
+voltaram a percorrer tabelas inteiras depois de mudanças de modelo ou de
+índices. Suportado apenas em SQLite.
+"""
+from typing import Any, Dict, Iterable, List
+import re
+from sqlalchemy import event
+
+# Varredura completa: "SCAN tabela" sem índice (ex.: "SCAN users")
+_FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+# Índice percorrido desde o início em vez de posicionado (ex.: "SCAN patients USING INDEX ix_...")
+_INDEX_SCAN = re.compile(r'^SCAN (\w+) USING (COVERING )?INDEX ')
+
+
+def explain_query_plan(session, statement: Any) -> List[str]:
+    """
+    Obtém o plano de execução de uma consulta no SQLite
+    
+    A consulta é executada pela própria sessão, com seus parâmetros reais,
+    apenas prefixada por EXPLAIN QUERY PLAN; assim o planejador vê os mesmos
+    valores (relevante para índices parciais) que veria em produção.
+    
+    Args:
+        session: Sessão SQLAlchemy (db.session)
+        statement: Query ORM ou instrução SELECT
+    
+    Returns:
+        List[str]: Linhas do plano (coluna "detail")
+    """
+    statement = getattr(statement, 'statement', statement)
+    connection = session.connection()
+    
+    def prefix_explain(conn, cursor, sql, parameters, context, executemany):
+        return 'EXPLAIN QUERY PLAN ' + sql, parameters
+    
+    event.listen(connection, 'before_cursor_execute', prefix_explain, retval=True)
+    try:
+        result = connection.execute(statement)
+        rows = result.cursor.fetchall()
+        result.close()
+    finally:
+        event.remove(connection, 'before_cursor_execute', prefix_explain)
+    
+    return [row[-1] for row in rows]
+
+
+def find_plan_regressions(plan: List[str], allow_temp_sort: bool = False, require_seek: bool = False) -> List[str]:
+    """
+    Lista os passos do plano que indicam regressão
+    
+    Args:
+        plan (List[str]): Linhas retornadas por explain_query_plan
+        allow_temp_sort (bool): Aceita ordenação em árvore temporária
+        require_seek (bool): Também falha com índice percorrido do início
+            (paginação por cursor deve posicionar no índice: SEARCH)
+    
+    Returns:
+        List[str]: Varreduras completas e ordenações temporárias encontradas
+    """
+    problems = []
+    for step in plan:
+        step = step.strip()
+        if _FULL_SCAN.match(step) or (require_seek and _INDEX_SCAN.match(step)):
+            problems.append(step)
+        elif not allow_temp_sort and step.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append(step)
+    return problems
+
+
+def check_query_plans(session, queries: Dict[str, Any],
+                      seek: Iterable[str] = ()) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Executa EXPLAIN QUERY PLAN em cada consulta e aponta regressões
+    
+    Args:
+        session: Sessão SQLAlchemy (db.session)
+        queries (Dict[str, Any]): Nome -> consulta
+        seek (Iterable[str]): Consultas que devem posicionar no índice (require_seek)
+    
+    Returns:
+        Dict[str, Dict[str, List[str]]]: Nome -> {'plan': [...], 'problems': [...]}
+    """
+    seek = set(seek)
+    report = {}
+    for name, statement in queries.items():
+        plan = explain_query_plan(session, statement)
+        report[name] = {'plan': plan, 'problems': find_plan_regressions(plan, require_seek=name in seek)}
+    return report
@@ -0,0 +1,139 @@
+"""
+Replicador substituto para desenvolvimento com réplica de leitura SQLite
+
+Em produção a réplica é mantida pelo próprio banco (ex.: streaming
+replication do PostgreSQL). Localmente, com dois arquivos SQLite, uma
+thread de fundo copia o primário para a réplica pela API de backup do
+SQLite a cada REPLICA_SYNC_INTERVAL_SECONDS, o que reproduz o atraso de
+replicação que o read-your-writes precisa cobrir.
+"""
+from typing import Any, Dict, Optional
+import logging
+import os
+import sqlite3
+import threading
+import time
+from src.models.routing import REPLICA_BIND
+
+
+def _sqlite_path(engine) -> Optional[str]:
+    """Caminho do arquivo de um engine SQLite (None para outros bancos ou :memory:)"""
+    if engine is None or engine.dialect.name != 'sqlite':
+        return None
+    database = engine.url.database
+    if not database or database == ':memory:':
+        return None
+    return database
+
+
+class SQLiteReplicator:
+    """
+    Copia periodicamente o banco primário para o arquivo da réplica
+    """
+    
+    def __init__(self, interval: float = 1.0, busy_timeout: float = 5.0):
+        self.interval = interval
+        self.busy_timeout = busy_timeout
+        self.primary_path: Optional[str] = None
+        self.replica_path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._syncs = 0
+        self._failures = 0
+        self._last_sync: Optional[float] = None
+        self._last_duration = 0.0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.primary_path is not None and self.replica_path is not None
+    
+    def init_app(self, app, db) -> None:
+        """
+        Ativa o replicador quando primário e réplica são arquivos SQLite
+        
+        Faz uma cópia inicial (a réplica passa a ter o schema) e, com
+        intervalo > 0, inicia a thread de sincronização.
+        
+        Args:
+            app: Aplicação Flask
+            db: Instância do Flask-SQLAlchemy (engines com caminhos já resolvidos)
+        """
+        self.stop()
+        self.interval = app.config['REPLICA_SYNC_INTERVAL_SECONDS']
+        with app.app_context():
+            self.primary_path = _sqlite_path(db.engines.get(None))
+            self.replica_path = _sqlite_path(db.engines.get(REPLICA_BIND))
+        if not self.enabled or self.interval <= 0:
+            return
+        
+        self.sync()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sghss-replicator', daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+    
+    def sync(self) -> bool:
+        """
+        Copia o primário para a réplica imediatamente
+        
+        Returns:
+            bool: False se a cópia falhou (a réplica continua com a versão anterior)
+        """
+        if not self.enabled:
+            return False
+        
+        started = time.perf_counter()
+        try:
+            source = sqlite3.connect(self.primary_path, timeout=self.busy_timeout)
+            target = sqlite3.connect(self.replica_path, timeout=self.busy_timeout)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+        except sqlite3.Error as e:
+            with self._lock:
+                self._failures += 1
+            logging.getLogger('sghss').warning(f"Replica sync failed: {str(e)}")
+            return False
+        
+        with self._lock:
+            self._syncs += 1
+            self._last_sync = time.time()
+            self._last_duration = time.perf_counter() - started
+        return True
+    
+    def stop(self) -> None:
+        """Interrompe a thread de sincronização"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._thread_pid == os.getpid():
+            thread.join(self.interval + self.busy_timeout)
+        self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sync()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas do replicador
+        
+        Returns:
+            Dict[str, Any]: Cópias feitas, falhas e atraso desde a última cópia
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled and self.interval > 0,
+                'interval_seconds': self.interval,
+                'syncs': self._syncs,
+                'failures': self._failures,
+                'lag_seconds': round(time.time() - self._last_sync, 3) if self._last_sync else None,
+                'last_sync_ms': round(self._last_duration * 1000, 3)
+            }
+
+
+# Instância global usada pela aplicação
+replicator = SQLiteReplicator()
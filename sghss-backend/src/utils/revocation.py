@@ -0,0 +1,320 @@
+"""
+Revogação de tokens JWT (logout) verificada em memória
+
+O logout grava o ``jti`` do token na tabela ``revoked_tokens`` (armazenamento
+durável) e o adiciona à lista do processo. A verificação feita em toda
+requisição com ``@jwt_required`` (``token_in_blocklist_loader``) não
+consulta o banco:
+
+    1. filtro de Bloom: a grande maioria dos tokens (não revogados) sai aqui,
+       sem lock e sem tocar no dicionário;
+    2. dicionário exato ``jti -> exp``: confirma os positivos e elimina os
+       falsos positivos do filtro.
+
+Cada entrada vale até a expiração do token (depois disso o próprio JWT é
+recusado): a cada sincronização as vencidas são descartadas, e o filtro é
+reconstruído só com as vigentes quando os bits de tokens vencidos passam a
+predominar ou quando ele enche. Na inicialização do worker a lista é reconstruída a partir
+da tabela (linhas vencidas são apagadas). Com vários workers, uma thread em
+cada processo lê a cada REVOCATION_SYNC_INTERVAL_SECONDS as linhas novas
+(por id crescente) do banco primário: um logout feito em outro worker vale
+aqui após no máximo esse intervalo.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from sqlalchemy import delete, exc, select
+from src.models.revoked_token import RevokedToken
+
+logger = logging.getLogger('sghss')
+
+
+def _timestamp(value: datetime) -> float:
+    """Datetime UTC ingênuo (como gravado no banco) para segundos desde a época"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _utc(timestamp: float) -> datetime:
+    """Segundos desde a época para datetime UTC ingênuo"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre um bytearray
+    
+    Sem falsos negativos; a taxa de falsos positivos fica perto de
+    ``error_rate`` enquanto o número de chaves não passar de ``capacity``.
+    As posições vêm de um único BLAKE2b de 128 bits (hash duplo).
+    """
+    
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def _hashes(self, key: str) -> Tuple[int, int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+    
+    def add(self, key: str) -> None:
+        h1, h2 = self._hashes(key)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % self.size
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, key: str) -> bool:
+        # Para no primeiro bit zerado: o caso comum (token não revogado) costuma sair na primeira posição
+        h1, h2 = self._hashes(key)
+        bits, size = self._bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class TokenRevocationList:
+    """
+    Lista de tokens revogados do processo, reconstruída do banco
+    """
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = 2.0
+        self._engine = None
+        self._entries: Dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._watermark = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._fork_registered = False
+        # Contadores sem lock (aproximados sob concorrência), para não pesar na verificação
+        self.checks = 0
+        self.filter_positives = 0
+        self.false_positives = 0
+        self._syncs = 0
+        self._sync_failures = 0
+        self._last_sync: Optional[float] = None
+    
+    def init_app(self, app, db) -> None:
+        """
+        Configura a lista e a reconstrói a partir da tabela revoked_tokens
+        
+        Deve rodar depois da criação do schema, dentro do contexto da aplicação.
+        
+        Args:
+            app: Aplicação Flask
+            db: Instância do Flask-SQLAlchemy já inicializada
+        """
+        self.capacity = app.config['REVOCATION_FILTER_CAPACITY']
+        self.error_rate = app.config['REVOCATION_FILTER_ERROR_RATE']
+        self.sync_interval = app.config['REVOCATION_SYNC_INTERVAL_SECONDS']
+        # Sempre o primário: a réplica pode não ter o logout mais recente
+        self._engine = db.engines[None]
+        self.load()
+        
+        if not self._fork_registered and hasattr(os, 'register_at_fork'):
+            # O filho herda a lista do pai e sincroniza na sua própria thread
+            os.register_at_fork(after_in_child=self._after_fork)
+            self._fork_registered = True
+    
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Verifica se o token foi revogado (sem acesso ao banco)
+        
+        Args:
+            jti (str): Identificador único do token (claim ``jti``)
+        
+        Returns:
+            bool: True se o token foi revogado e ainda não expirou
+        """
+        self._ensure_thread()
+        self.checks += 1
+        if jti not in self._filter:
+            return False
+        self.filter_positives += 1
+        expires = self._entries.get(jti)
+        if expires is None:
+            self.false_positives += 1
+            return False
+        return expires > time.time()
+    
+    def revoke(self, session, jti: str, token_type: str, expires: float,
+               user_id: Optional[int] = None) -> bool:
+        """
+        Revoga um token: grava no banco e adiciona à lista do processo
+        
+        Args:
+            session: Sessão SQLAlchemy (db.session); a revogação é confirmada aqui
+            jti (str): Identificador único do token
+            token_type (str): 'access' ou 'refresh'
+            expires (float): Claim ``exp`` do token (segundos desde a época)
+            user_id (Optional[int]): Dono do token
+        
+        Returns:
+            bool: False se o token já estava revogado
+        """
+        if self._entries.get(jti) is not None:
+            return False
+        
+        session.add(RevokedToken(jti=jti, token_type=token_type, user_id=user_id, expires_at=_utc(expires)))
+        try:
+            session.commit()
+        except exc.IntegrityError:
+            # Revogado em outro worker antes da sincronização
+            session.rollback()
+            self._add(jti, expires)
+            return False
+        
+        self._add(jti, expires)
+        return True
+    
+    def _add(self, jti: str, expires: float) -> None:
+        with self._lock:
+            if jti in self._entries:
+                return
+            # Dicionário antes do filtro: quem passar pelo filtro encontra a entrada
+            self._entries[jti] = expires
+            if self._filter.count < self.capacity:
+                self._filter.add(jti)
+                return
+            # Filtro cheio: o novo filtro (após a limpeza ou do tamanho certo) já inclui o jti
+            self._prune(time.time())
+            if self._filter.count >= self.capacity:
+                self._rebuild()
+    
+    def _prune(self, now: float) -> None:
+        """Descarta entradas vencidas (com o lock)"""
+        expired = [jti for jti, expires in self._entries.items() if expires <= now]
+        for jti in expired:
+            del self._entries[jti]
+        # Bits de tokens vencidos só elevam os falsos positivos; reconstrói quando passam das entradas vigentes
+        if self._filter.count - len(self._entries) > len(self._entries):
+            self._rebuild()
+    
+    def _rebuild(self) -> None:
+        """Troca o filtro por um novo só com as entradas vigentes (com o lock)"""
+        # Mais revogações vigentes que a capacidade: dobra para manter a taxa de falsos positivos
+        while len(self._entries) >= self.capacity:
+            self.capacity *= 2
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._entries:
+            bloom.add(jti)
+        self._filter = bloom
+    
+    def load(self) -> int:
+        """
+        Reconstrói a lista a partir da tabela, apagando as linhas vencidas
+        
+        Returns:
+            int: Revogações vigentes carregadas
+        """
+        now = time.time()
+        table = RevokedToken.__table__
+        with self._engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.expires_at <= _utc(now)))
+            rows = connection.execute(
+                select(table.c.id, table.c.jti, table.c.expires_at).where(table.c.expires_at > _utc(now))
+            ).all()
+        
+        with self._lock:
+            self._entries = {row.jti: _timestamp(row.expires_at) for row in rows}
+            self._watermark = max((row.id for row in rows), default=0)
+            self._rebuild()
+        self._last_sync = time.monotonic()
+        return len(rows)
+    
+    def sync(self) -> int:
+        """
+        Adiciona as revogações gravadas (por qualquer worker) desde a última leitura
+        
+        Returns:
+            int: Linhas novas lidas
+        """
+        now = time.time()
+        table = RevokedToken.__table__
+        try:
+            with self._engine.connect() as connection:
+                rows = connection.execute(
+                    select(table.c.id, table.c.jti, table.c.expires_at)
+                    .where(table.c.id > self._watermark, table.c.expires_at > _utc(now))
+                    .order_by(table.c.id)
+                ).all()
+        except exc.SQLAlchemyError as e:
+            self._sync_failures += 1
+            logger.warning(f"Token revocation sync failed: {str(e)}")
+            return 0
+        
+        # Inclui também as revogações deste processo (já presentes, ignoradas)
+        for row in rows:
+            self._add(row.jti, _timestamp(row.expires_at))
+        with self._lock:
+            if rows:
+                self._watermark = max(self._watermark, rows[-1].id)
+            self._prune(now)
+        self._syncs += 1
+        self._last_sync = time.monotonic()
+        return len(rows)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Estado da lista de revogação
+        
+        Returns:
+            Dict[str, Any]: Entradas vigentes, tamanho do filtro, contadores e sincronização
+        """
+        bloom = self._filter
+        return {
+            'entries': len(self._entries),
+            'capacity': self.capacity,
+            'filter_bytes': bloom.nbytes,
+            'filter_hashes': bloom.hashes,
+            'checks': self.checks,
+            'filter_positives': self.filter_positives,
+            'false_positives': self.false_positives,
+            'sync_interval_seconds': self.sync_interval,
+            'syncs': self._syncs,
+            'sync_failures': self._sync_failures,
+            'seconds_since_sync': (round(time.monotonic() - self._last_sync, 3)
+                                   if self._last_sync is not None else None)
+        }
+    
+    def _ensure_thread(self) -> None:
+        # Sincronização iniciada sob demanda e recriada após fork
+        if self._engine is None or self.sync_interval <= 0:
+            return
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name='sghss-revocation', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            self.sync()
+            time.sleep(self.sync_interval)
+    
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._thread = None
+
+
+# Instância global usada pela aplicação
+revocation_list = TokenRevocationList()
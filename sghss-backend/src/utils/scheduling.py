@@ -0,0 +1,202 @@
+"""
+Cálculo de horários livres a partir de Professional.work_schedule
+
+Formato de work_schedule (chaves por dia da semana, em inglês ou
+português, ou o número do dia com segunda = 0):
+
+    {
+        "monday": [["08:00", "12:00"], ["14:00", "18:00"]],
+        "quarta": [{"start": "08:00", "end": "12:00"}]
+    }
+
+Cada agenda é compilada uma vez em horários (minuto do dia e rótulo HH:MM)
+por dia da semana e mantida em cache até o perfil mudar (updated_at).
+
+Horários de work_schedule e datas de consulta são horas locais da clínica,
+sem fuso: ``clinic_now()`` é o relógio usado para compará-los
+(CLINIC_TIMEZONE, ou o horário local do servidor).
+"""
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+import threading
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6,
+    'segunda': 0, 'terca': 1, 'terça': 1, 'quarta': 2, 'quinta': 3, 'sexta': 4, 'sabado': 5, 'sábado': 5,
+    'domingo': 6
+}
+
+# Rótulos HH:MM pré-calculados para cada minuto do dia
+_MINUTE_LABELS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+
+CompiledSchedule = Tuple[Tuple[Tuple[int, str], ...], ...]
+
+_schedule_cache: Dict[int, Tuple[Any, int, CompiledSchedule]] = {}
+_schedule_cache_lock = threading.Lock()
+
+_clinic: Dict[str, Optional[tzinfo]] = {'timezone': None}
+
+
+def set_clinic_timezone(name: Optional[str]) -> None:
+    """
+    Define o fuso da clínica usado por ``clinic_now()``
+    
+    Args:
+        name (Optional[str]): Nome IANA (ex.: 'America/Sao_Paulo'); vazio usa o horário local do servidor
+    
+    Raises:
+        ZoneInfoNotFoundError: Se o fuso não existir
+    """
+    _clinic['timezone'] = ZoneInfo(name) if name else None
+
+
+def clinic_now() -> datetime:
+    """Data/hora atual da clínica, sem fuso (mesmo relógio de work_schedule e das consultas)"""
+    timezone = _clinic['timezone']
+    return datetime.now(timezone).replace(tzinfo=None) if timezone else datetime.now()
+
+
+def _parse_minutes(value: str) -> int:
+    hours, minutes = str(value).strip().split(':')[:2]
+    total = int(hours) * 60 + int(minutes)
+    if not 0 <= total <= 24 * 60:
+        raise ValueError(f"Invalid time: {value}")
+    return total
+
+
+def compile_work_schedule(schedule: Optional[dict], slot_minutes: int) -> CompiledSchedule:
+    """
+    Compila a agenda em horários (minuto, 'HH:MM') por dia da semana
+    
+    Intervalos sobrepostos são unidos e os horários são alinhados à grade
+    de ``slot_minutes``. Entradas inválidas são ignoradas.
+    
+    Args:
+        schedule (Optional[dict]): Valor de Professional.work_schedule
+        slot_minutes (int): Duração de cada horário
+    
+    Returns:
+        CompiledSchedule: 7 tuplas (segunda..domingo) de (minuto do dia, rótulo)
+    """
+    intervals: List[List[Tuple[int, int]]] = [[] for _ in range(7)]
+    
+    for key, ranges in (schedule or {}).items():
+        key = str(key).strip().lower()
+        weekday = int(key) if key.isdigit() else WEEKDAYS.get(key)
+        if weekday is None or not 0 <= weekday <= 6 or not isinstance(ranges, list):
+            continue
+        
+        for item in ranges:
+            try:
+                if isinstance(item, dict):
+                    start, end = _parse_minutes(item['start']), _parse_minutes(item['end'])
+                else:
+                    start, end = _parse_minutes(item[0]), _parse_minutes(item[1])
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+            if start < end:
+                intervals[weekday].append((start, end))
+    
+    compiled = []
+    for day_intervals in intervals:
+        slots = set()
+        for start, end in day_intervals:
+            first = -(-start // slot_minutes) * slot_minutes
+            slots.update(range(first, end - slot_minutes + 1, slot_minutes))
+        compiled.append(tuple((minute, _MINUTE_LABELS[minute]) for minute in sorted(slots)))
+    
+    return tuple(compiled)
+
+
+def get_compiled_schedule(professional_id: int, updated_at: Any, schedule: Optional[dict],
+                          slot_minutes: int) -> CompiledSchedule:
+    """
+    Obtém a agenda compilada do cache, recompilando se o perfil mudou
+    
+    Args:
+        professional_id (int): ID do profissional
+        updated_at (Any): Professional.updated_at (versão do perfil)
+        schedule (Optional[dict]): Professional.work_schedule
+        slot_minutes (int): Duração de cada horário
+    
+    Returns:
+        CompiledSchedule: Agenda compilada
+    """
+    with _schedule_cache_lock:
+        cached = _schedule_cache.get(professional_id)
+    if cached and cached[0] == updated_at and cached[1] == slot_minutes:
+        return cached[2]
+    
+    compiled = compile_work_schedule(schedule, slot_minutes)
+    with _schedule_cache_lock:
+        _schedule_cache[professional_id] = (updated_at, slot_minutes, compiled)
+    return compiled
+
+
+def invalidate_schedule(professional_id: Optional[int] = None) -> None:
+    """Remove do cache a agenda de um profissional (ou todas)"""
+    with _schedule_cache_lock:
+        if professional_id is None:
+            _schedule_cache.clear()
+        else:
+            _schedule_cache.pop(professional_id, None)
+
+
+def free_slots(compiled: CompiledSchedule, booked: Sequence[datetime], start_day: date, end_day: date,
+               slot_minutes: int, not_before: Optional[datetime] = None) -> List[str]:
+    """
+    Subtrai as consultas marcadas dos horários da agenda (merge ordenado)
+    
+    Args:
+        compiled (CompiledSchedule): Agenda compilada
+        booked (Sequence[datetime]): Inícios das consultas ativas, em ordem crescente
+        start_day (date): Primeiro dia (inclusive)
+        end_day (date): Último dia (inclusive)
+        slot_minutes (int): Duração de cada horário
+        not_before (Optional[datetime]): Ignora horários que começam antes deste instante
+    
+    Returns:
+        List[str]: Inícios livres no formato YYYY-MM-DDTHH:MM
+    """
+    result = []
+    position = 0
+    total = len(booked)
+    day = start_day
+    one_day = timedelta(days=1)
+    lookbehind = timedelta(minutes=slot_minutes)
+    
+    while day <= end_day:
+        day_slots = compiled[day.weekday()]
+        day_start = datetime(day.year, day.month, day.day)
+        day_end = day_start + one_day
+        
+        # Avança o ponteiro até as consultas que podem tocar este dia
+        while position < total and booked[position] <= day_start - lookbehind:
+            position += 1
+        
+        # Horários da grade bloqueados por consultas que se sobrepõem a eles
+        blocked = set()
+        scan = position
+        while scan < total and booked[scan] < day_end:
+            delta = booked[scan] - day_start
+            minute = delta.days * 1440 + delta.seconds // 60
+            first = (minute - slot_minutes) // slot_minutes * slot_minutes + slot_minutes
+            blocked.update(range(first, minute + slot_minutes, slot_minutes))
+            scan += 1
+        
+        minimum = -1
+        if not_before is not None and not_before >= day_start:
+            delta = not_before - day_start
+            minimum = delta.seconds // 60 if delta.days == 0 else 1440
+        
+        prefix = day.isoformat() + 'T'
+        if not blocked and minimum < 0:
+            result.extend([prefix + label for _, label in day_slots])
+        elif minimum < 1440:
+            result.extend([prefix + label for minute, label in day_slots
+                           if minute > minimum and minute not in blocked])
+        
+        day += one_day
+    
+    return result
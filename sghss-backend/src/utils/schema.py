@@ -0,0 +1,94 @@
+"""
+Criação do schema na inicialização, com carimbo de versão
+
+O schema esperado (DDL de tabelas e índices do metadata, mais o índice de
+busca) é resumido em um número de 31 bits gravado em ``PRAGMA
+user_version`` do SQLite. Na inicialização, se o carimbo do banco
+coincide, create_all, a criação de índices e a verificação do índice de
+busca são puladas: o worker só lê um PRAGMA. Em outros bancos o caminho
+completo roda sempre.
+"""
+from typing import Optional
+import hashlib
+import logging
+import os
+from sqlalchemy import exc
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from src.utils.search import SEARCH_TABLE, ensure_search_index, enable_search_engine
+
+# Incrementar ao mudar o que ensure_schema cria fora do metadata
+SCHEMA_EXTRAS_VERSION = 1
+
+
+def schema_fingerprint(metadata) -> int:
+    """
+    Resumo do schema declarado nos modelos
+    
+    Args:
+        metadata: MetaData do SQLAlchemy (db.metadata)
+    
+    Returns:
+        int: Valor positivo de 31 bits (cabe em PRAGMA user_version)
+    """
+    dialect = sqlite.dialect()
+    statements = [f"extras:{SCHEMA_EXTRAS_VERSION}:{SEARCH_TABLE}"]
+    for table in metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=dialect)))
+        statements.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda index: index.name or '')
+        )
+    digest = hashlib.blake2b('\n'.join(statements).encode('utf-8'), digest_size=4).digest()
+    return int.from_bytes(digest, 'big') & 0x7FFFFFFF
+
+
+def _stamp(engine) -> Optional[int]:
+    if engine.dialect.name != 'sqlite':
+        return None
+    try:
+        with engine.connect() as connection:
+            return connection.exec_driver_sql("PRAGMA user_version").scalar()
+    except exc.OperationalError:
+        # Diretório do banco ainda não existe
+        return None
+
+
+def ensure_schema(db, database_dir: str) -> bool:
+    """
+    Garante o schema do banco padrão, pulando o trabalho se o carimbo coincidir
+    
+    Deve ser chamado dentro do app context.
+    
+    Args:
+        db: Instância do Flask-SQLAlchemy
+        database_dir (str): Diretório dos arquivos SQLite locais
+    
+    Returns:
+        bool: True se o schema foi (re)criado, False se o carimbo já coincidia
+    """
+    logger = logging.getLogger('sghss')
+    engine = db.engine
+    fingerprint = schema_fingerprint(db.metadata)
+    
+    if _stamp(engine) == fingerprint:
+        enable_search_engine(engine)
+        logger.debug("Schema stamp %d matches, skipping create_all", fingerprint)
+        return False
+    
+    if not os.path.exists(database_dir):
+        os.makedirs(database_dir)
+    
+    db.create_all()
+    # create_all skips existing tables; add indexes introduced after they were created
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Sem FTS5 não há carimbo: a verificação completa roda a cada inicialização
+    if not ensure_search_index(engine):
+        logger.warning("Patient search index unavailable: database does not support FTS5")
+    elif engine.dialect.name == 'sqlite':
+        with engine.begin() as connection:
+            connection.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+    logger.info("Database tables created successfully")
+    return True
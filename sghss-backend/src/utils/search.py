@@ -0,0 +1,282 @@
+"""
+Busca de pacientes por nome, CPF e telefone (SQLite FTS5)
+
+A tabela virtual ``patients_fts`` guarda, com rowid = patients.id, o nome
+completo (sem acentos na tokenização), o CPF e o telefone apenas com
+dígitos. Ela é mantida em sincronia por um evento ``after_flush`` da
+sessão, que aplica em lote as inserções, alterações e exclusões de
+pacientes de cada flush.
+
+Nomes são buscados por prefixo de palavra; CPF e telefone por prefixo de
+dígitos. A relevância é dada por faixas, da mais à menos específica
+(termos exatos começando pelo primeiro nome, termos exatos, prefixo do
+primeiro nome, prefixos em qualquer posição). Cada faixa é uma consulta
+FTS5 lida em ordem de rowid com LIMIT, então o custo não cresce com o
+número de pacientes que casam com um prefixo curto, ao contrário de
+ordenar todos os resultados por bm25.
+"""
+from typing import List, Optional, Tuple
+import re
+import weakref
+from sqlalchemy import event, inspect, or_, text
+from sqlalchemy.orm import Session
+from src.models.user import User
+from src.models.patient import Patient
+
+SEARCH_TABLE = 'patients_fts'
+
+_CREATE_TABLE = text(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "full_name, cpf, phone, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+_INSERT = text(f"INSERT INTO {SEARCH_TABLE} (rowid, full_name, cpf, phone) VALUES (:id, :full_name, :cpf, :phone)")
+_DELETE = text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id")
+# CROSS JOIN mantém a tabela FTS no laço externo: a leitura para no LIMIT
+_SEARCH = text(
+    f"SELECT {SEARCH_TABLE}.rowid FROM {SEARCH_TABLE} "
+    f"CROSS JOIN patients ON patients.id = {SEARCH_TABLE}.rowid "
+    "CROSS JOIN users ON users.id = patients.user_id "
+    f"WHERE {SEARCH_TABLE} MATCH :match AND users.is_active = 1 "
+    f"ORDER BY {SEARCH_TABLE}.rowid LIMIT :limit"
+)
+
+_SEARCHED_FIELDS = ('full_name', 'cpf', 'phone')
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+# Engines com a tabela de busca criada (a sincronização só ocorre nelas)
+_enabled_engines = weakref.WeakSet()
+
+
+def _digits(value: Optional[str]) -> str:
+    return ''.join(filter(str.isdigit, value or ''))
+
+
+def _index_row(patient: Patient) -> dict:
+    return {
+        'id': patient.id,
+        'full_name': patient.full_name,
+        'cpf': _digits(patient.cpf),
+        'phone': _digits(patient.phone)
+    }
+
+
+def ensure_search_index(engine) -> bool:
+    """
+    Cria a tabela de busca (se necessário) e habilita a sincronização
+    
+    Quando a tabela é criada agora, ela é preenchida com os pacientes
+    existentes.
+    
+    Args:
+        engine: Engine SQLAlchemy da aplicação
+    
+    Returns:
+        bool: False se o banco não suporta FTS5 (busca indisponível)
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': SEARCH_TABLE}
+        ).first()
+        if not exists:
+            connection.execute(_CREATE_TABLE)
+            _backfill(connection)
+    
+    _enabled_engines.add(engine)
+    return True
+
+
+def enable_search_engine(engine) -> None:
+    """
+    Habilita a busca FTS5 em um engine cuja tabela de busca já existe
+    
+    Usado quando o schema já está carimbado (sem verificação na
+    inicialização) e em réplicas de leitura, que recebem a tabela pela
+    replicação e nunca são escritas.
+    
+    Args:
+        engine: Engine SQLAlchemy
+    """
+    if engine.dialect.name == 'sqlite':
+        _enabled_engines.add(engine)
+
+
+def _backfill(connection) -> int:
+    rows = connection.execute(text("SELECT id, full_name, cpf, phone FROM patients")).mappings()
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append({'id': row['id'], 'full_name': row['full_name'],
+                      'cpf': _digits(row['cpf']), 'phone': _digits(row['phone'])})
+        if len(batch) >= 5000:
+            connection.execute(_INSERT, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        connection.execute(_INSERT, batch)
+        total += len(batch)
+    return total
+
+
+def rebuild_search_index(engine) -> int:
+    """
+    Recria o conteúdo da tabela de busca a partir de patients
+    
+    Necessário apenas após cargas feitas fora do ORM (SQL direto).
+    
+    Args:
+        engine: Engine SQLAlchemy da aplicação
+    
+    Returns:
+        int: Número de pacientes indexados
+    """
+    if not ensure_search_index(engine):
+        return 0
+    
+    with engine.begin() as connection:
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        total = _backfill(connection)
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+    return total
+
+
+def parse_search_terms(query: str, min_token_length: int = 2) -> Tuple[List[str], List[str]]:
+    """
+    Separa o texto digitado em palavras do nome e grupos de dígitos
+    
+    Sem letras, o texto todo é tratado como um único número (CPF ou
+    telefone formatado, ex.: "529.982" ou "(11) 9876-5").
+    
+    Args:
+        query (str): Texto da busca
+        min_token_length (int): Tamanho mínimo de cada termo
+    
+    Returns:
+        Tuple[List[str], List[str]]: (palavras, grupos de dígitos)
+    """
+    query = (query or '').strip()
+    
+    if not any(char.isalpha() for char in query):
+        digits = _digits(query)
+        return [], [digits] if len(digits) >= min_token_length else []
+    
+    words, numbers = [], []
+    for chunk in query.split():
+        if any(char.isalpha() for char in chunk):
+            words.extend(word for word in _WORD.findall(chunk) if len(word) >= min_token_length)
+        else:
+            digits = _digits(chunk)
+            if len(digits) >= min_token_length:
+                numbers.append(digits)
+    return words, numbers
+
+
+def build_match_expression(words: List[str], numbers: List[str], exact: bool = False,
+                           initial: bool = False) -> Optional[str]:
+    """
+    Monta a expressão MATCH do FTS5 (todos os termos obrigatórios)
+    
+    Args:
+        words (List[str]): Palavras do nome
+        numbers (List[str]): Grupos de dígitos (CPF ou telefone)
+        exact (bool): Termos inteiros em vez de prefixos
+        initial (bool): A primeira palavra deve iniciar o nome
+    
+    Returns:
+        Optional[str]: Expressão MATCH, ou None se não houver termos
+    """
+    star = '' if exact else '*'
+    terms = [
+        f'full_name : {"^" if initial and i == 0 else ""}"{word}"{star}' for i, word in enumerate(words)
+    ]
+    terms += [f'{{cpf phone}} : "{digits}"{star}' for digits in numbers]
+    return ' AND '.join(terms) if terms else None
+
+
+def ranked_match_expressions(words: List[str], numbers: List[str]) -> List[str]:
+    """
+    Lista as expressões MATCH de cada faixa de relevância, da melhor para a pior
+    
+    Args:
+        words (List[str]): Palavras do nome
+        numbers (List[str]): Grupos de dígitos
+    
+    Returns:
+        List[str]: Expressões distintas, em ordem de relevância
+    """
+    expressions = []
+    for exact, initial in ((True, True), (True, False), (False, True), (False, False)):
+        expression = build_match_expression(words, numbers, exact=exact, initial=initial and bool(words))
+        if expression and expression not in expressions:
+            expressions.append(expression)
+    return expressions
+
+
+def search_patient_ids(session, query: str, limit: int = 20, min_token_length: int = 2) -> List[int]:
+    """
+    Busca pacientes ativos por nome, CPF ou telefone
+    
+    Sem FTS5 (ex.: PostgreSQL) usa LIKE por prefixo, ordenado por nome.
+    
+    Args:
+        session: Sessão SQLAlchemy (db.session)
+        query (str): Texto da busca
+        limit (int): Máximo de resultados
+        min_token_length (int): Tamanho mínimo de cada termo
+    
+    Returns:
+        List[int]: IDs de pacientes, do mais ao menos relevante
+    """
+    words, numbers = parse_search_terms(query, min_token_length)
+    if not words and not numbers:
+        return []
+    
+    if session.get_bind() not in _enabled_engines:
+        return _search_with_like(session, words, numbers, limit)
+    
+    # Cada faixa inclui as anteriores; busca o suficiente para completar o limite
+    results: List[int] = []
+    seen = set()
+    for match in ranked_match_expressions(words, numbers):
+        for (patient_id,) in session.execute(_SEARCH, {'match': match, 'limit': limit + len(seen)}):
+            if patient_id not in seen:
+                seen.add(patient_id)
+                results.append(patient_id)
+                if len(results) >= limit:
+                    return results
+    return results
+
+
+def _search_with_like(session, words: List[str], numbers: List[str], limit: int) -> List[int]:
+    query = session.query(Patient.id).join(User, User.id == Patient.user_id).filter(User.is_active == True)
+    for word in words:
+        query = query.filter(or_(Patient.full_name.ilike(f'{word}%'), Patient.full_name.ilike(f'% {word}%')))
+    for digits in numbers:
+        query = query.filter(or_(Patient.cpf.like(f'{digits}%'), Patient.phone.like(f'%{digits}%')))
+    return [patient_id for (patient_id,) in query.order_by(Patient.full_name, Patient.id).limit(limit)]
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    """Aplica na tabela de busca as mudanças de pacientes do flush"""
+    deleted = [{'id': obj.id} for obj in session.deleted if isinstance(obj, Patient)]
+    changed = [
+        obj for obj in session.new if isinstance(obj, Patient)
+    ] + [
+        obj for obj in session.dirty if isinstance(obj, Patient)
+        and any(inspect(obj).attrs[field].history.has_changes() for field in _SEARCHED_FIELDS)
+    ]
+    if not deleted and not changed:
+        return
+    
+    connection = session.connection()
+    if connection.engine not in _enabled_engines:
+        return
+    
+    stale = deleted + [{'id': obj.id} for obj in changed if obj not in session.new]
+    if stale:
+        connection.execute(_DELETE, stale)
+    if changed:
+        connection.execute(_INSERT, [_index_row(obj) for obj in changed])
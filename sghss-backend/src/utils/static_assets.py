@@ -0,0 +1,192 @@
+"""
+Manifesto dos arquivos estáticos do SPA
+
+A pasta de estáticos é percorrida uma única vez na inicialização: para
+cada arquivo ficam em memória caminho, tamanho, data de modificação, tipo
+MIME, hash do conteúdo (ETag forte) e, quando elegíveis, as variantes
+pré-comprimidas (gzip/brotli). A rota catch-all consulta só o manifesto,
+sem acessar o sistema de arquivos para decidir o que servir.
+
+Arquivos com hash no nome (ex.: app.3f2a9c1d.js) são servidos com
+``Cache-Control: immutable``; os demais (index.html) são revalidados pelo
+ETag. O manifesto só é reconstruído sob sinal explícito (SIGHUP por
+padrão) ou chamada a ``reload()``.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import signal
+import threading
+from flask import Response, request, send_file
+from src.constants import COMPRESSION, STATIC_ASSETS
+from src.utils.compression import compress, encoded_etag, response_compressor
+
+_HASHED_NAME = re.compile(STATIC_ASSETS['hashed_name_pattern'])
+
+
+class StaticManifest:
+    """
+    Índice em memória dos arquivos estáticos, com ETag e variantes comprimidas
+    """
+    
+    def __init__(self, folder: Optional[str] = None):
+        self.folder = folder
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._signal_registered = False
+        self._reloads = 0
+        self._hits = 0
+        self._compressed_hits = 0
+        self._bytes_saved = 0
+    
+    def init_app(self, app) -> None:
+        """
+        Monta o manifesto da pasta de estáticos e registra o sinal de recarga
+        
+        Args:
+            app: Aplicação Flask
+        """
+        self.folder = app.static_folder
+        self.reload()
+        self._register_signal()
+    
+    def reload(self) -> int:
+        """
+        Reconstrói o manifesto a partir da pasta de estáticos
+        
+        Returns:
+            int: Quantidade de arquivos indexados
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        if self.folder and os.path.isdir(self.folder):
+            for root, _dirs, files in os.walk(self.folder):
+                for name in files:
+                    path = os.path.join(root, name)
+                    entries[os.path.relpath(path, self.folder).replace(os.sep, '/')] = self._build_entry(path)
+        
+        with self._lock:
+            self._entries = entries
+            self._reloads += 1
+        logging.getLogger('sghss').info("Static manifest built: %d files", len(entries))
+        return len(entries)
+    
+    def _build_entry(self, path: str) -> Dict[str, Any]:
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        
+        # Pré-compressão no nível máximo (feita uma vez, aqui)
+        variants = {}
+        if (response_compressor.enabled and mimetype in response_compressor.mimetypes
+                and len(data) >= response_compressor.min_size):
+            levels = {'br': COMPRESSION['static_brotli_quality'], 'gzip': COMPRESSION['static_gzip_level']}
+            for encoding in response_compressor.encodings:
+                body = compress(data, encoding, levels[encoding])
+                if len(body) < len(data):
+                    variants[encoding] = body
+        
+        return {
+            'path': path,
+            'size': len(data),
+            'mtime': os.path.getmtime(path),
+            'mimetype': mimetype,
+            'etag': hashlib.blake2b(data, digest_size=16).hexdigest(),
+            'immutable': bool(_HASHED_NAME.search(os.path.basename(path))),
+            'variants': variants
+        }
+    
+    def _register_signal(self) -> None:
+        signum = getattr(signal, STATIC_ASSETS['reload_signal'], None)
+        if self._signal_registered or signum is None or threading.current_thread() is not threading.main_thread():
+            return
+        
+        previous = signal.getsignal(signum)
+        
+        def handler(received, frame):
+            # Recarga fora do handler para não bloquear a thread principal
+            threading.Thread(target=self.reload, name='sghss-static-reload', daemon=True).start()
+            if callable(previous):
+                previous(received, frame)
+        
+        signal.signal(signum, handler)
+        self._signal_registered = True
+    
+    def get(self, relative_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Entrada do manifesto para um caminho relativo
+        
+        Args:
+            relative_path (str): Caminho relativo à pasta de estáticos
+        
+        Returns:
+            Optional[Dict[str, Any]]: Entrada ou None se o arquivo não existe
+        """
+        return self._entries.get(relative_path)
+    
+    def response(self, entry: Dict[str, Any]) -> Response:
+        """
+        Resposta para uma entrada do manifesto
+        
+        Usa a variante pré-comprimida aceita pelo cliente ou, sem ela, envia
+        o arquivo via wsgi.file_wrapper (sendfile no gunicorn). Responde 304
+        quando o If-None-Match corresponde.
+        
+        Args:
+            entry (Dict[str, Any]): Entrada retornada por ``get``
+        
+        Returns:
+            Response: Resposta com ETag e Cache-Control
+        """
+        encoding = None
+        if entry['variants']:
+            encoding = request.accept_encodings.best_match(tuple(entry['variants']))
+        
+        if encoding is not None:
+            body = entry['variants'][encoding]
+            response = Response(body, mimetype=entry['mimetype'])
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(encoded_etag(entry['etag'], encoding))
+            response.last_modified = entry['mtime']
+            response = response.make_conditional(request)
+        else:
+            response = send_file(entry['path'], mimetype=entry['mimetype'], etag=entry['etag'],
+                                 last_modified=entry['mtime'], conditional=True)
+        
+        if entry['variants']:
+            response.vary.add('Accept-Encoding')
+        if entry['immutable']:
+            response.headers['Cache-Control'] = f"public, max-age={STATIC_ASSETS['immutable_max_age']}, immutable"
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        
+        with self._lock:
+            self._hits += 1
+            if encoding is not None and response.status_code == 200:
+                self._compressed_hits += 1
+                self._bytes_saved += entry['size'] - len(entry['variants'][encoding])
+        return response
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Métricas do manifesto de estáticos
+        
+        Returns:
+            Dict[str, Any]: Arquivos indexados e contadores de acesso
+        """
+        with self._lock:
+            return {
+                'files': len(self._entries),
+                'precompressed': sum(1 for entry in self._entries.values() if entry['variants']),
+                'reloads': self._reloads,
+                'hits': self._hits,
+                'compressed_hits': self._compressed_hits,
+                'bytes_saved': self._bytes_saved
+            }
+
+
+# Instância global usada pela aplicação
+static_manifest = StaticManifest()
@@ -0,0 +1,138 @@
+"""
+Pipeline de logging não bloqueante do SGHSS Backend
+
+As threads de requisição apenas enfileiram os registros (QueueHandler);
+uma thread ouvinte (QueueListener) faz a escrita em disco em JSON lines,
+com rotação por tamanho e por tempo, e no console.
+"""
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from datetime import datetime, timezone
+from typing import Optional
+import atexit
+import json
+import logging
+import queue
+
+# Atributos padrão de LogRecord (não são copiados como campos extras)
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        
+        # Campos estruturados passados via extra={...}
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """Rotaciona o arquivo por tempo (``when``) ou ao atingir ``max_bytes``"""
+    
+    def __init__(self, filename: str, max_bytes: int = 0, **kwargs):
+        self.max_bytes = max_bytes
+        super().__init__(filename, **kwargs)
+    
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if super().shouldRollover(record):
+            return 1
+        
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.seek(0, 2)
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return 1
+        
+        return 0
+
+
+class _StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler que apenas resolve mensagem e exceção antes de enfileirar
+    
+    A formatação final (JSON/texto) fica a cargo da thread ouvinte.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def start_logging_pipeline(level: str, log_file: str, max_bytes: int, backup_count: int,
+                           when: str, console: bool = True) -> QueueListener:
+    """
+    Substitui os handlers do logger raiz por um QueueHandler e inicia o ouvinte
+    
+    Args:
+        level (str): Nível de log (ex.: 'INFO')
+        log_file (str): Caminho do arquivo JSON lines
+        max_bytes (int): Tamanho máximo do arquivo antes da rotação (0 desativa)
+        backup_count (int): Número de arquivos rotacionados mantidos
+        when (str): Intervalo de rotação por tempo (ex.: 'midnight')
+        console (bool): Se deve também escrever no console
+    
+    Returns:
+        QueueListener: Ouvinte em execução
+    """
+    global _listener
+    stop_logging_pipeline()
+    
+    file_handler = SizedTimedRotatingFileHandler(
+        log_file, max_bytes=max_bytes, when=when, backupCount=backup_count, encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        handlers.append(stream_handler)
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_StructuredQueueHandler(log_queue))
+    root.setLevel(level)
+    
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging_pipeline() -> None:
+    """Esvazia a fila de logs e encerra a thread ouvinte"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging_pipeline)
@@ -0,0 +1,131 @@
+"""
+Linha do tempo clínica do paciente
+
+Intercala consultas (pela data da consulta), prontuários e prescrições
+(pela data de criação) em ordem cronológica, paginada por cursor. O número
+de consultas SQL é fixo, qualquer que seja o tamanho do histórico:
+
+    1. uma consulta UNION ALL com as chaves (tipo, id, data) da página: cada
+       ramo lê no máximo ``per_page + 1`` linhas pelo índice do paciente;
+    2. até três consultas ``IN`` que carregam as linhas da página, uma por tipo.
+
+Os relacionamentos ``lazy='dynamic'`` (Patient.appointments,
+Patient.medical_records, MedicalRecord.prescriptions) não são usados: eles
+fariam uma consulta por prontuário.
+"""
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, literal, or_, select, union_all
+from src.models.appointment import Appointment
+from src.models.medical_record import MedicalRecord
+from src.models.prescription import Prescription
+from src.utils.helpers import encode_cursor, decode_cursor
+
+# Tipos de evento; a posição desempata eventos no mesmo instante
+EVENT_TYPES = ('appointment', 'medical_record', 'prescription')
+_MODELS = {'appointment': Appointment, 'medical_record': MedicalRecord, 'prescription': Prescription}
+
+
+def _branches(patient_id: int):
+    """Chaves (kind, id, occurred_at) de cada tipo de evento do paciente"""
+    return [
+        (0, Appointment.id, Appointment.appointment_date,
+         select(literal(0).label('kind'), Appointment.id.label('id'),
+                Appointment.appointment_date.label('occurred_at'))
+         .where(Appointment.patient_id == patient_id)),
+        (1, MedicalRecord.id, MedicalRecord.created_at,
+         select(literal(1).label('kind'), MedicalRecord.id.label('id'),
+                MedicalRecord.created_at.label('occurred_at'))
+         .where(MedicalRecord.patient_id == patient_id)),
+        (2, Prescription.id, Prescription.created_at,
+         select(literal(2).label('kind'), Prescription.id.label('id'),
+                Prescription.created_at.label('occurred_at'))
+         .join(MedicalRecord, Prescription.medical_record_id == MedicalRecord.id)
+         .where(MedicalRecord.patient_id == patient_id))
+    ]
+
+
+def _after(kind: int, id_column, time_column, position: List[Any], ascending: bool):
+    """
+    Predicado "depois do cursor" para um ramo de tipo fixo
+    
+    A ordem é (occurred_at, kind, id); como ``kind`` é constante no ramo,
+    a comparação de tupla se reduz a comparações de data e id.
+    """
+    occurred_at, cursor_kind, cursor_id = position
+    later = (lambda a, b: a > b) if ascending else (lambda a, b: a < b)
+    if later(kind, cursor_kind):
+        return time_column >= occurred_at if ascending else time_column <= occurred_at
+    if kind == cursor_kind:
+        return or_(later(time_column, occurred_at), and_(time_column == occurred_at, later(id_column, cursor_id)))
+    return later(time_column, occurred_at)
+
+
+def timeline_page(session, patient_id: int, per_page: int, cursor: Optional[str] = None,
+                  ascending: bool = False) -> Dict[str, Any]:
+    """
+    Uma página da linha do tempo do paciente
+    
+    Args:
+        session: Sessão SQLAlchemy (db.session)
+        patient_id (int): ID do paciente
+        per_page (int): Eventos por página
+        cursor (Optional[str]): ``next_cursor`` da página anterior
+        ascending (bool): Mais antigos primeiro (padrão: mais recentes primeiro)
+    
+    Returns:
+        Dict[str, Any]: items (type, occurred_at, data), per_page, has_next, next_cursor
+    
+    Raises:
+        ValidationError: Se o cursor for inválido
+    """
+    # Tipos das chaves do cursor: datetime, int, int
+    position = decode_cursor(cursor, (Appointment.appointment_date, Appointment.id, Appointment.id)) if cursor else None
+    
+    branches = []
+    for kind, id_column, time_column, branch in _branches(patient_id):
+        if position is not None:
+            branch = branch.where(_after(kind, id_column, time_column, position, ascending))
+        order = (time_column, id_column) if ascending else (time_column.desc(), id_column.desc())
+        branches.append(select(branch.order_by(*order).limit(per_page + 1).subquery()))
+    
+    timeline = union_all(*branches).subquery('timeline')
+    columns = (timeline.c.occurred_at, timeline.c.kind, timeline.c.id)
+    rows = session.execute(
+        select(timeline.c.kind, timeline.c.id, timeline.c.occurred_at)
+        .order_by(*(columns if ascending else [column.desc() for column in columns]))
+        .limit(per_page + 1)
+    ).all()
+    
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    # Uma consulta por tipo presente na página
+    loaded = {}
+    for kind, event_type in enumerate(EVENT_TYPES):
+        ids = [row.id for row in rows if row.kind == kind]
+        if ids:
+            model = _MODELS[event_type]
+            loaded[kind] = {item.id: item for item in session.query(model).filter(model.id.in_(ids))}
+    
+    items = []
+    for row in rows:
+        # Removido entre as duas consultas: omitido da página
+        item = loaded[row.kind].get(row.id)
+        if item is not None:
+            items.append({
+                'type': EVENT_TYPES[row.kind],
+                'occurred_at': row.occurred_at.isoformat(),
+                'data': item.to_dict()
+            })
+    
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor([last.occurred_at, last.kind, last.id])
+    
+    return {
+        'items': items,
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': next_cursor
+    }
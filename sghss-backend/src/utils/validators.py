@@ -4,7 +4,8 @@ Contém funções de validação reutilizáveis
 """
 import re
 from typing import Tuple, Optional
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from src.utils.scheduling import clinic_now
 
 
 def validate_email(email: str) -> bool:
@@ -148,6 +149,48 @@ def validate_birth_date(birth_date_str: str) -> Tuple[bool, Optional[date], str]
         return False, None, "Invalid birth date format. Use YYYY-MM-DD"
 
 
+def validate_appointment_datetime(
+    value: str,
+    slot_minutes: int = 30,
+    max_days_ahead: int = 365
+) -> Tuple[bool, Optional[datetime], str]:
+    """
+    Valida e converte data/hora de consulta
+    
+    Args:
+        value (str): Data/hora ISO 8601 (YYYY-MM-DDTHH:MM)
+        slot_minutes (int): Duração do horário; o início deve ser múltiplo dela
+        max_days_ahead (int): Antecedência máxima em dias
+    
+    Returns:
+        Tuple[bool, Optional[datetime], str]: (é_válida, data_convertida, mensagem)
+    """
+    if not value or not isinstance(value, str):
+        return False, None, "Appointment date is required"
+    
+    try:
+        appointment_date = datetime.fromisoformat(value)
+    except ValueError:
+        return False, None, "Invalid appointment date format. Use YYYY-MM-DDTHH:MM"
+    
+    if appointment_date.tzinfo is not None:
+        return False, None, "Appointment date must not include a timezone"
+    
+    # Hora local da clínica, como appointment_date e os horários de work_schedule
+    now = clinic_now()
+    if appointment_date <= now:
+        return False, None, "Appointment date must be in the future"
+    
+    if appointment_date > now + timedelta(days=max_days_ahead):
+        return False, None, f"Appointment date cannot be more than {max_days_ahead} days ahead"
+    
+    minutes = appointment_date.hour * 60 + appointment_date.minute
+    if minutes % slot_minutes or appointment_date.second or appointment_date.microsecond:
+        return False, None, f"Appointment must start on a {slot_minutes}-minute slot boundary"
+    
+    return True, appointment_date, "Valid appointment date"
+
+
 def validate_user_role(role: str) -> bool:
     """
     Valida role de usuário